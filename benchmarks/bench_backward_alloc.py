@@ -0,0 +1,94 @@
+"""
+Bytes allocated and time per backward pass.
+
+Runs forward + backward on a small MLP (dense -> relu -> dense -> tanh ->
+dense -> mean) and measures, with tracemalloc, the peak memory allocated
+while `backward()` runs on top of what the graph already holds. "first"
+is the first step, when parameter grads are created; "steady" are the
+following steps, with parameter grads zeroed in place. The activation-grad
+bytes of a step are the lower bound: one grad buffer per graph node.
+
+    python benchmarks/bench_backward_alloc.py --batch 256 --width 512
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from deriv.Array.backend import set_backend
+
+
+def build(batch, width, seed=0):
+    import numpy as np
+    from deriv import array, ReLU, Tanh
+    from deriv.nn.layers.linear import dense
+
+    np.random.seed(seed)
+    layers = [dense(width, width), dense(width, width), dense(width, 1)]
+    relu, tanh = ReLU(), Tanh()
+    x = array(np.random.randn(batch, width))
+
+    def step():
+        h = relu(layers[0](x))
+        h = tanh(layers[1](h))
+        return layers[2](h).mean()
+
+    params = [p for layer in layers for p in (layer.w.data, layer.b.data)]
+    return step, params
+
+
+def measure(step, params, repeats):
+    results = []
+    for i in range(repeats + 1):
+        for p in params:
+            if p.grad is not None:
+                p.grad.fill(0)
+        loss = step()
+        activation_bytes = sum(n.data.nbytes for n in loss.topo() if n.parents)
+        gc.collect()
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        loss.backward()
+        peak = tracemalloc.get_traced_memory()[1] - base
+        tracemalloc.stop()
+
+        t0 = time.perf_counter()
+        loss = step()
+        t1 = time.perf_counter()
+        loss.backward()
+        t2 = time.perf_counter()
+        results.append({"peak_bytes": peak, "activation_grad_bytes": activation_bytes,
+                        "backward_ms": (t2 - t1) * 1e3})
+    first, steady = results[0], results[1:]
+    return {
+        "first": first,
+        "steady": {
+            "peak_bytes": min(r["peak_bytes"] for r in steady),
+            "activation_grad_bytes": steady[0]["activation_grad_bytes"],
+            "backward_ms": min(r["backward_ms"] for r in steady),
+        },
+    }
+
+
+def run(batch=256, width=512, repeats=5):
+    step, params = build(batch, width)
+    return measure(step, params, repeats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--width", type=int, default=512)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    set_backend("cpu")
+    print(f"{'step':<8} {'peak MB':>9} {'act-grad MB':>12} {'overhead':>9} {'ms':>8}")
+    for name, r in run(args.batch, args.width, args.repeats).items():
+        overhead = r["peak_bytes"] / max(r["activation_grad_bytes"], 1)
+        print(f"{name:<8} {r['peak_bytes'] / 1e6:>9.2f} {r['activation_grad_bytes'] / 1e6:>12.2f}"
+              f" {overhead:>8.2f}x {r['backward_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
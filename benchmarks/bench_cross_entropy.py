@@ -0,0 +1,74 @@
+"""
+Softmax cross-entropy at large class counts.
+
+Times forward + backward of `SoftmaxCrossEntropy` on `batch x classes`
+logits with integer class targets and with one-hot targets, and the same
+loss composed from individual ops (max, exp, sum, divide, log, multiply,
+sum, mean) for reference. Best of `repeats`, in milliseconds.
+
+    python benchmarks/bench_cross_entropy.py --classes 10 1000 10000 50000
+"""
+import argparse
+import time
+
+from deriv.Array.backend import set_backend
+
+
+def _composed(logits, targets):
+    from deriv import exp, log, mean
+
+    shift = logits.max(axis=-1, keepdims=True)
+    exps = exp(logits - shift)
+    softmax = exps / exps.sum(axis=-1, keepdims=True)
+    return mean(-(targets * log(softmax + 1e-9)).sum(axis=-1))
+
+
+def _best(loss_fn, logits_data, targets, repeats):
+    from deriv import array
+
+    best = float("inf")
+    for _ in range(repeats):
+        logits = array(logits_data, need_grad=True)
+        t0 = time.perf_counter()
+        loss_fn(logits, targets).backward()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e3
+
+
+def measure(batch, classes, repeats):
+    import numpy as np
+    from deriv import array
+    from deriv.loss_funcs import SoftmaxCrossEntropy
+
+    rng = np.random.default_rng(0)
+    logits = rng.standard_normal((batch, classes))
+    index = rng.integers(0, classes, batch)
+    onehot = np.zeros((batch, classes))
+    onehot[np.arange(batch), index] = 1.0
+    ce = SoftmaxCrossEntropy()
+    return {
+        "index_ms": _best(ce, logits, array(index), repeats),
+        "onehot_ms": _best(ce, logits, array(onehot), repeats),
+        "composed_ms": _best(_composed, logits, array(onehot), repeats),
+    }
+
+
+def run(batch=256, classes=(10, 1000, 10000), repeats=5):
+    return {f"classes={c}": measure(batch, c, repeats) for c in classes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--classes", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    set_backend("cpu")
+    print(f"{'classes':>8} {'index ms':>10} {'one-hot ms':>11} {'composed ms':>12}")
+    for name, r in run(args.batch, args.classes, args.repeats).items():
+        print(f"{name.split('=')[1]:>8} {r['index_ms']:>10.2f} {r['onehot_ms']:>11.2f} {r['composed_ms']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
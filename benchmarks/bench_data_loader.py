@@ -0,0 +1,86 @@
+"""
+Input pipeline throughput in samples/s.
+
+Writes a float32 `.npy` dataset to a temporary directory and reads it in
+shuffled mini-batches, with a simulated training step (a matmul) per batch.
+"inline" slices the memory-mapped arrays and wraps them in `deriv.array`
+on the main thread, like a hand-written loop. The `DataLoader` rows read
+through the prefetching ring with 0 (same thread) or more worker threads.
+
+    python benchmarks/bench_data_loader.py --samples 200000 --features 512
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from deriv.Array.backend import set_backend
+
+
+def _write(directory, samples, features):
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    x = np.lib.format.open_memmap(os.path.join(directory, "x.npy"), mode="w+", dtype=np.float32,
+                                  shape=(samples, features))
+    for start in range(0, samples, 65536):
+        stop = min(start + 65536, samples)
+        x[start:stop] = rng.standard_normal((stop - start, features), dtype=np.float32)
+    x.flush()
+    np.save(os.path.join(directory, "y.npy"), rng.integers(0, 10, samples))
+    return os.path.join(directory, "x.npy"), os.path.join(directory, "y.npy")
+
+
+def _inline(paths, batch_size):
+    import numpy as np
+    from deriv import array
+
+    x, y = (np.load(p, mmap_mode="r") for p in paths)
+    order = np.random.default_rng(0).permutation(len(x))
+    for start in range(0, len(x), batch_size):
+        idx = order[start:start + batch_size]
+        yield array(x[idx]), array(y[idx])
+
+
+def measure(batches, step_weight):
+    samples = 0
+    t0 = time.perf_counter()
+    for x, _ in batches:
+        if step_weight is not None:
+            x.data @ step_weight
+        samples += len(x)
+    return {"samples_per_s": samples / (time.perf_counter() - t0)}
+
+
+def run(samples=200_000, features=512, batch_size=256, workers=(0, 1, 4), compute=True):
+    import numpy as np
+    from deriv.data import DataLoader, NpyDataset
+
+    results = {}
+    weight = np.ones((features, features), dtype=np.float32) if compute else None
+    with tempfile.TemporaryDirectory() as directory:
+        paths = _write(directory, samples, features)
+        results["inline"] = measure(_inline(paths, batch_size), weight)
+        for n in workers:
+            loader = DataLoader(NpyDataset(*paths), batch_size=batch_size, shuffle=True, num_workers=n, seed=0)
+            results[f"loader_workers={n}"] = measure(loader, weight)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", type=int, default=200_000)
+    parser.add_argument("--features", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 4])
+    parser.add_argument("--no-compute", action="store_true", help="measure reading only")
+    args = parser.parse_args()
+
+    set_backend("cpu")
+    print(f"{'pipeline':<20} {'samples/s':>12}")
+    for name, r in run(args.samples, args.features, args.batch_size, args.workers, not args.no_compute).items():
+        print(f"{name:<20} {r['samples_per_s']:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Data-parallel training throughput.
+
+Trains a `dense` MLP with `deriv.parallel.DataParallel` for a range of
+worker counts and reports samples/s, milliseconds per step and the speedup
+over one worker. Worker processes get one BLAS thread each.
+
+    python benchmarks/bench_data_parallel.py --workers 1 2 4 8 --batch 1024
+"""
+import argparse
+import os
+import time
+
+from deriv.Array.backend import set_backend
+
+# One BLAS thread per process; must be set before NumPy starts its pool.
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+
+
+def build(features, width, depth, seed=0):
+    import numpy as np
+    from deriv.nn import Module, dense, ReLU
+
+    np.random.seed(seed)
+
+    class MLP(Module):
+        def __init__(self):
+            super().__init__()
+            sizes = [features] + [width] * depth
+            self.layers = []
+            for i in range(depth):
+                layer = dense(sizes[i], sizes[i + 1])
+                setattr(self, f"fc{i}", layer)
+                self.layers.append(layer)
+            self.head = dense(width, 1)
+            self.act = ReLU()
+
+        def forward(self, x):
+            for layer in self.layers:
+                x = self.act(layer(x))
+            return self.head(x)
+
+    return MLP()
+
+
+def measure(workers, batch, features, width, depth, steps):
+    import numpy as np
+    from deriv.loss_funcs import MSE
+    from deriv.optim import SGD
+    from deriv.parallel import DataParallel
+
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal((batch, features))
+    y = rng.standard_normal((batch, 1))
+    with DataParallel(build(features, width, depth), MSE(), num_workers=workers, start_method="fork") as trainer:
+        opt = SGD(trainer.parameters(), lr=1e-3)
+        trainer.backward(x, y)
+        best = float("inf")
+        for _ in range(steps):
+            t0 = time.perf_counter()
+            trainer.backward(x, y)
+            opt.step()
+            best = min(best, time.perf_counter() - t0)
+    return {"step_ms": best * 1e3, "samples_per_s": batch / best}
+
+
+def run(workers=(1, 2, 4, 8), batch=1024, features=64, width=512, depth=3, steps=10):
+    return [{"workers": n, **measure(n, batch, features, width, depth, steps)} for n in workers]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--batch", type=int, default=1024)
+    parser.add_argument("--features", type=int, default=64)
+    parser.add_argument("--width", type=int, default=512)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--steps", type=int, default=10)
+    args = parser.parse_args()
+
+    set_backend("cpu")
+    print(f"{'workers':>7} {'step ms':>9} {'samples/s':>11} {'speedup':>8}")
+    results = run(tuple(args.workers), args.batch, args.features, args.width, args.depth, args.steps)
+    for r in results:
+        speedup = r["samples_per_s"] / results[0]["samples_per_s"]
+        print(f"{r['workers']:>7} {r['step_ms']:>9.2f} {r['samples_per_s']:>11.0f} {speedup:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
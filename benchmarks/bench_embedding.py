@@ -0,0 +1,68 @@
+"""
+Sparse embedding gradients.
+
+Times one training step (forward, backward, optimizer step) of an
+`nn.Embedding` bag model with sparse and with dense weight gradients, and
+reports the size of the weight's gradient. The sparse step touches only the
+looked-up rows, so its cost follows the batch, not the table size.
+
+    python benchmarks/bench_embedding.py --rows 1000000 --dim 64 --optimizer adagrad
+"""
+import argparse
+import time
+
+from deriv.Array.backend import set_backend
+
+
+def measure(sparse, rows, dim, batch, fields, optimizer, repeats):
+    import numpy as np
+    from deriv.nn import Embedding
+    from deriv.optim import SGD, Adagrad, Adam
+
+    np.random.seed(0)
+    rng = np.random.default_rng(0)
+    table = Embedding(rows, dim, sparse=sparse)
+    opt = {"sgd": SGD, "adagrad": Adagrad, "adam": Adam}[optimizer](table.parameters())
+    weight = table.weight.data
+    grad_bytes = 0
+
+    def step():
+        nonlocal grad_bytes
+        ids = rng.integers(0, rows, size=(batch, fields))
+        t0 = time.perf_counter()
+        loss = ((table(ids).sum(axis=1) - 1.0) ** 2).mean()
+        loss.backward()
+        grad_bytes = weight.grad.nbytes
+        opt.step()
+        opt.zero_grad()
+        return time.perf_counter() - t0
+
+    step()
+    best = min(step() for _ in range(repeats))
+    return {"step_ms": best * 1e3, "steps_per_s": 1.0 / best, "grad_bytes": grad_bytes}
+
+
+def run(rows=1_000_000, dim=64, batch=256, fields=8, optimizer="adagrad", repeats=10):
+    return {"sparse": measure(True, rows, dim, batch, fields, optimizer, repeats),
+            "dense": measure(False, rows, dim, batch, fields, optimizer, repeats)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--fields", type=int, default=8, help="ids looked up per sample")
+    parser.add_argument("--optimizer", choices=("sgd", "adagrad", "adam"), default="adagrad")
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    set_backend("cpu")
+    r = run(args.rows, args.dim, args.batch, args.fields, args.optimizer, args.repeats)
+    for name, m in r.items():
+        print(f"{name:<7} {m['step_ms']:>9.2f} ms/step  grad {m['grad_bytes'] / 1e6:>9.2f} MB")
+    print(f"speedup {r['dense']['step_ms'] / r['sparse']['step_ms']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Backward time and memory against graph size.
+
+Builds a chain of `n` additions (one graph node per step), then runs
+`backward()` and reports per-node time and memory. Both should stay flat
+as `n` grows if the engine scales linearly, and the graph should be fully
+released once backward returns.
+
+    python benchmarks/bench_graph_scaling.py --max-nodes 1000000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from deriv.Array.backend import set_backend
+
+
+def build_chain(n, width):
+    import numpy as np
+    from deriv import array
+
+    leaf = array(np.ones(width), need_grad=True)
+    step = array(np.full(width, 1e-3))
+    x = leaf
+    for _ in range(n):
+        x = x + step
+    return leaf, x.sum()
+
+
+def measure(n, width=4, memory=True):
+    gc.collect()
+    if memory:
+        tracemalloc.start()
+
+    t0 = time.perf_counter()
+    leaf, loss = build_chain(n, width)
+    t1 = time.perf_counter()
+    graph_bytes = tracemalloc.get_traced_memory()[0] if memory else 0
+
+    loss.backward()
+    t2 = time.perf_counter()
+
+    result = {
+        "nodes": n,
+        "forward_s": t1 - t0,
+        "backward_s": t2 - t1,
+        "backward_us_per_node": (t2 - t1) / n * 1e6,
+    }
+    if memory:
+        _, peak = tracemalloc.get_traced_memory()
+        del loss
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result.update({
+            "graph_bytes_per_node": graph_bytes / n,
+            "peak_bytes_per_node": peak / n,
+            "retained_bytes_after_backward": retained,
+        })
+    del leaf
+    return result
+
+
+def run(max_nodes=1_000_000, width=4, memory=True):
+    sizes = []
+    n = 1000
+    while n <= max_nodes:
+        sizes.append(n)
+        n *= 10
+    return [measure(n, width, memory) for n in sizes]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-nodes", type=int, default=1_000_000)
+    parser.add_argument("--width", type=int, default=4)
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (faster)")
+    args = parser.parse_args()
+
+    set_backend("cpu")
+    rows = run(args.max_nodes, args.width, not args.no_memory)
+    header = f"{'nodes':>9} {'fwd s':>8} {'bwd s':>8} {'bwd us/node':>12}"
+    if not args.no_memory:
+        header += f" {'graph B/node':>13} {'peak B/node':>12} {'retained B':>11}"
+    print(header)
+    for r in rows:
+        line = f"{r['nodes']:>9} {r['forward_s']:>8.3f} {r['backward_s']:>8.3f} {r['backward_us_per_node']:>12.2f}"
+        if not args.no_memory:
+            line += (f" {r['graph_bytes_per_node']:>13.0f} {r['peak_bytes_per_node']:>12.0f}"
+                     f" {r['retained_bytes_after_backward']:>11}")
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
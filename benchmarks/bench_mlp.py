@@ -0,0 +1,91 @@
+"""
+MLP training throughput.
+
+Trains `dense` MLPs with ReLU, Tanh and Nami activations on random data
+(MSE loss, SGD) and reports samples/s and milliseconds per training step
+(forward, backward, optimizer step and zero_grad).
+
+    python benchmarks/bench_mlp.py --batch 128 --width 256 --depth 3
+"""
+import argparse
+import time
+
+from deriv.Array.backend import set_backend
+
+
+def build(activation, features, width, depth, seed=0):
+    import numpy as np
+    from deriv.nn import Module, dense, ReLU, Tanh, Nami
+
+    np.random.seed(seed)
+    make_act = {"relu": ReLU, "tanh": Tanh, "nami": Nami}[activation]
+
+    class MLP(Module):
+        def __init__(self):
+            super().__init__()
+            sizes = [features] + [width] * depth
+            self.layers = []
+            for i in range(depth):
+                layer = dense(sizes[i], sizes[i + 1])
+                setattr(self, f"fc{i}", layer)
+                self.layers.append(layer)
+            self.head = dense(width, 1)
+            self.act = make_act()
+
+        def forward(self, x):
+            for layer in self.layers:
+                x = self.act(layer(x))
+            return self.head(x)
+
+    return MLP()
+
+
+def measure(activation, batch, features, width, depth, steps):
+    import numpy as np
+    from deriv import array
+    from deriv.loss_funcs import MSE
+    from deriv.optim import SGD
+
+    model = build(activation, features, width, depth)
+    opt = SGD(model.parameters(), lr=1e-3)
+    loss_fn = MSE()
+    rng = np.random.default_rng(0)
+    x = array(rng.standard_normal((batch, features)))
+    y = array(rng.standard_normal((batch, 1)))
+
+    def step():
+        loss = loss_fn(model(x), y)
+        loss.backward()
+        opt.step()
+        opt.zero_grad()
+
+    step()
+    best = float("inf")
+    for _ in range(steps):
+        t0 = time.perf_counter()
+        step()
+        best = min(best, time.perf_counter() - t0)
+    return {"step_ms": best * 1e3, "samples_per_s": batch / best}
+
+
+def run(batch=128, features=64, width=256, depth=3, steps=20, activations=("relu", "tanh", "nami")):
+    return {act: measure(act, batch, features, width, depth, steps) for act in activations}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch", type=int, default=128)
+    parser.add_argument("--features", type=int, default=64)
+    parser.add_argument("--width", type=int, default=256)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--steps", type=int, default=20)
+    args = parser.parse_args()
+
+    set_backend("cpu")
+    print(f"{'activation':<10} {'step ms':>9} {'samples/s':>11}")
+    for name, r in run(args.batch, args.features, args.width, args.depth, args.steps).items():
+        print(f"{name:<10} {r['step_ms']:>9.2f} {r['samples_per_s']:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
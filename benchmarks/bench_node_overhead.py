@@ -0,0 +1,66 @@
+"""
+Object-creation cost and memory per graph node.
+
+Times and measures (with tracemalloc) the creation of `array` nodes:
+leaves wrapping an existing ndarray, leaves built from Python scalars, and
+op outputs of `a + b` that are recorded in the graph. Memory figures are per
+node and include the backward closure of op outputs.
+
+    python benchmarks/bench_node_overhead.py -n 100000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from deriv.Array.backend import set_backend
+
+
+def _cases():
+    import numpy as np
+    from deriv import array
+
+    buf = np.ones(4)
+    a = array(np.ones(4), need_grad=True)
+    b = array(np.ones(4))
+    return {
+        "leaf_from_ndarray": lambda: array(buf),
+        "leaf_from_scalar": lambda: array(1.0),
+        "op_node_with_grad": lambda: a + b,
+    }
+
+
+def measure(make, n):
+    gc.collect()
+    t0 = time.perf_counter()
+    for _ in range(n):
+        make()
+    elapsed = time.perf_counter() - t0
+
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    keep = [make() for _ in range(n)]
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del keep
+    return {"ns_per_node": elapsed / n * 1e9, "bytes_per_node": used / n}
+
+
+def run(n=100_000):
+    return {name: measure(make, n) for name, make in _cases().items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", type=int, default=100_000, help="nodes per case")
+    args = parser.parse_args()
+
+    set_backend("cpu")
+    print(f"{'case':<20} {'ns/node':>9} {'bytes/node':>11}")
+    for name, r in run(args.n).items():
+        print(f"{name:<20} {r['ns_per_node']:>9.0f} {r['bytes_per_node']:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
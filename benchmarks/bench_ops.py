@@ -0,0 +1,88 @@
+"""
+Forward and backward time per op.
+
+Times every differentiable op of `array_object.py`, `AMath.py` and
+`nn/non_linear.py` on `n x n` float64 inputs that need a gradient:
+the forward call, then `backward()` from its output (seeded with ones).
+Reported times are the best of `repeats` runs, in microseconds.
+
+    python benchmarks/bench_ops.py -n 256
+"""
+import argparse
+import time
+
+from deriv.Array.backend import set_backend
+
+
+def _ops(row):
+    import deriv
+    from deriv import array
+    from deriv.nn import ReLU, Tanh
+
+    relu, tanh = ReLU(), Tanh()
+    zero = array(0.0)
+    return {
+        "add": lambda a, b: a + b,
+        "add_broadcast": lambda a, b: a + row,
+        "sub": lambda a, b: a - b,
+        "mul": lambda a, b: a * b,
+        "div": lambda a, b: a / b,
+        "pow": lambda a, b: a ** b,
+        "matmul": lambda a, b: a @ b,
+        "neg": lambda a, b: -a,
+        "T": lambda a, b: a.T,
+        "sum": lambda a, b: a.sum(),
+        "sum_axis": lambda a, b: a.sum(axis=0),
+        "mean": lambda a, b: a.mean(),
+        "mean_axis": lambda a, b: a.mean(axis=0),
+        "max_axis": lambda a, b: a.max(axis=1),
+        "sin": lambda a, b: deriv.sin(a),
+        "cos": lambda a, b: deriv.cos(a),
+        "exp": lambda a, b: deriv.exp(a),
+        "log": lambda a, b: deriv.log(a),
+        "log10": lambda a, b: deriv.log10(a),
+        "rootof": lambda a, b: deriv.rootof(a, 3),
+        "relu": lambda a, b: relu(a),
+        "tanh": lambda a, b: tanh(a),
+        "where": lambda a, b: deriv.where(a > zero, a, b),
+    }
+
+
+def measure(op, leaves, repeats):
+    a, b = leaves[:2]
+    fwd = bwd = float("inf")
+    for _ in range(repeats):
+        for leaf in leaves:
+            leaf.grad = None
+        t0 = time.perf_counter()
+        out = op(a, b)
+        t1 = time.perf_counter()
+        out.backward()
+        t2 = time.perf_counter()
+        fwd, bwd = min(fwd, t1 - t0), min(bwd, t2 - t1)
+    return {"forward_us": fwd * 1e6, "backward_us": bwd * 1e6}
+
+
+def run(n=256, repeats=20):
+    import numpy as np
+    from deriv import array
+
+    rng = np.random.default_rng(0)
+    leaves = [array(rng.random(shape) + 0.5, need_grad=True) for shape in ((n, n), (n, n), (n,))]
+    return {name: measure(op, leaves, repeats) for name, op in _ops(leaves[2]).items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", type=int, default=256, help="inputs are n x n")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    set_backend("cpu")
+    print(f"{'op':<14} {'fwd us':>10} {'bwd us':>10}")
+    for name, r in run(args.n, args.repeats).items():
+        print(f"{name:<14} {r['forward_us']:>10.1f} {r['backward_us']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Optimizer step time against parameter count.
+
+Builds `layers` weight/bias pairs of size `width x width` and times
+`opt.step()` for every optimizer in `deriv.optim`. "numpy" is the previous
+SGD update (`v[...] = beta * v + (1 - beta) * grad; p[...] = p - lr * v`,
+one dict entry at a time), for reference.
+
+    python benchmarks/bench_optim_step.py --layers 10 100 1000 --width 32
+"""
+import argparse
+import time
+
+from deriv.Array.backend import set_backend
+
+
+def _params(layers, width):
+    import numpy as np
+    from deriv import array
+
+    rng = np.random.default_rng(0)
+    params = {}
+    for i in range(layers):
+        for name, shape in ((f"w{i}", (width, width)), (f"b{i}", (width,))):
+            p = array(rng.standard_normal(shape), need_grad=True)
+            p.grad = rng.standard_normal(shape) * 1e-3
+            params[name] = p
+    return params
+
+
+class _NumpySGD:
+    def __init__(self, parameters, lr=1e-3, beta=0.9):
+        import numpy as np
+        self.parameters, self.lr, self.beta = parameters, lr, beta
+        self.velocities = {name: np.zeros_like(p.data) for name, p in parameters.items()}
+
+    def step(self):
+        for name, param in self.parameters.items():
+            v = self.velocities[name]
+            v[...] = self.beta * v + (1 - self.beta) * param.grad
+            param.data[...] = param.data - self.lr * v
+
+
+def _optimizers():
+    from deriv.optim import SGD, Adam, AdamW, RMSProp, Adagrad
+    return {"numpy": _NumpySGD, "SGD": SGD, "Adam": Adam, "AdamW": AdamW,
+            "RMSProp": RMSProp, "Adagrad": Adagrad}
+
+
+def measure(make, params, repeats):
+    opt = make(params)
+    opt.step()
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        opt.step()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(layers=(10, 100, 1000), width=32, repeats=20):
+    results = []
+    for n in layers:
+        params = _params(n, width)
+        count = sum(p.data.size for p in params.values())
+        for name, make in _optimizers().items():
+            t = measure(make, params, repeats)
+            results.append({"optimizer": name, "tensors": len(params), "params": count,
+                            "step_us": t * 1e6, "ns_per_param": t / count * 1e9})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--layers", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--width", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    set_backend("cpu")
+    print(f"{'optimizer':<10} {'tensors':>8} {'params':>10} {'step us':>10} {'ns/param':>9}")
+    for r in run(args.layers, args.width, args.repeats):
+        print(f"{r['optimizer']:<10} {r['tensors']:>8} {r['params']:>10} {r['step_us']:>10.1f} {r['ns_per_param']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Thread-parallel backward.
+
+Times `backward(threads=n)` against the sequential backward on a branching
+graph: `heads` independent towers `tanh(x @ W1) @ W2` over a shared input,
+summed into one loss (the shape of a multi-head layer). Each tower's
+backward only meets the others in the shared input's gradient, so the
+towers can be differentiated concurrently.
+
+    python benchmarks/bench_parallel_backward.py --heads 8 --width 512 --threads 1 2 4
+"""
+import argparse
+import time
+
+from deriv.Array.backend import set_backend
+
+
+def measure(threads, heads, batch, width, repeats):
+    import numpy as np
+    from deriv import array
+    from deriv.nn import Tanh
+
+    rng = np.random.default_rng(0)
+    x = array(rng.standard_normal((batch, width)), need_grad=True)
+    weights = [(array(rng.standard_normal((width, width)) / width ** 0.5, need_grad=True),
+                array(rng.standard_normal((width, width)) / width ** 0.5, need_grad=True))
+               for _ in range(heads)]
+    act = Tanh()
+    leaves = [x] + [w for pair in weights for w in pair]
+
+    def step():
+        out = None
+        for w1, w2 in weights:
+            head = act(x @ w1) @ w2
+            out = head if out is None else out + head
+        loss = (out * out).mean()
+        t0 = time.perf_counter()
+        loss.backward(threads=threads)
+        elapsed = time.perf_counter() - t0
+        for leaf in leaves:
+            leaf.grad = None
+        return elapsed
+
+    step()
+    best = min(step() for _ in range(repeats))
+    return {"backward_ms": best * 1e3, "backward_per_s": 1.0 / best}
+
+
+def run(threads=(1, 2, 4), heads=8, batch=256, width=256, repeats=10):
+    results = []
+    for n in threads:
+        results.append({"threads": n, **measure(n if n > 1 else None, heads, batch, width, repeats)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--heads", type=int, default=8)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--width", type=int, default=256)
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    set_backend("cpu")
+    results = run(args.threads, args.heads, args.batch, args.width, args.repeats)
+    base = results[0]["backward_ms"]
+    for r in results:
+        print(f"threads={r['threads']:<3d} {r['backward_ms']:>9.2f} ms  {base / r['backward_ms']:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Per-example gradients.
+
+Compares `deriv.per_sample_grads` (one batched backward, full gradients or
+ghost norms only) against running `backward()` once per sample, on a
+`dense` MLP with ReLU and a softmax cross-entropy loss.
+
+    python benchmarks/bench_per_sample.py --batch 256 --width 256
+"""
+import argparse
+import time
+
+from deriv.Array.backend import set_backend
+
+
+def measure(batch, features, width, classes, repeats, loop):
+    import numpy as np
+    import deriv
+    from deriv import array
+    from deriv.loss_funcs import SoftmaxCrossEntropy
+    from deriv.nn import dense, ReLU
+
+    np.random.seed(0)
+    hidden, head, act = dense(features, width), dense(width, classes), ReLU()
+    params = {**hidden.parameters("hidden"), **head.parameters("head")}
+    loss_fn = SoftmaxCrossEntropy()
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal((batch, features))
+    y = rng.integers(0, classes, size=batch)
+
+    def fn(x, y):
+        # The scaled input is a parentless constant that keeps the batch axis.
+        return loss_fn(head(act(hidden(x * 0.5))), y)
+
+    def best(run, n):
+        run()
+        t = float("inf")
+        for _ in range(n):
+            t0 = time.perf_counter()
+            run()
+            t = min(t, time.perf_counter() - t0)
+        return t
+
+    def per_sample_loop():
+        for b in range(batch):
+            fn(array(x[b:b + 1]), array(y[b:b + 1])).backward()
+            for p in params.values():
+                p.grad = None
+
+    batched = best(lambda: deriv.per_sample_grads(fn, params, x, y), repeats)
+    norms = best(lambda: deriv.per_sample_grads(fn, params, x, y, norms=True), repeats)
+    result = {"batched_ms": batched * 1e3, "norms_ms": norms * 1e3,
+              "batched_samples_per_s": batch / batched, "norms_samples_per_s": batch / norms}
+    if loop:
+        looped = best(per_sample_loop, 1)
+        result["loop_ms"] = looped * 1e3
+        result["loop_samples_per_s"] = batch / looped
+    return result
+
+
+def run(batch=256, features=64, width=256, classes=10, repeats=10, loop=True):
+    return measure(batch, features, width, classes, repeats, loop)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--features", type=int, default=64)
+    parser.add_argument("--width", type=int, default=256)
+    parser.add_argument("--classes", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--no-loop", action="store_true", help="skip the one-backward-per-sample baseline")
+    args = parser.parse_args()
+
+    set_backend("cpu")
+    r = run(args.batch, args.features, args.width, args.classes, args.repeats, not args.no_loop)
+    print(f"batched      {r['batched_ms']:>9.2f} ms  {r['batched_samples_per_s']:>10.0f} samples/s")
+    print(f"norms only   {r['norms_ms']:>9.2f} ms  {r['norms_samples_per_s']:>10.0f} samples/s")
+    if "loop_ms" in r:
+        print(f"per-sample   {r['loop_ms']:>9.2f} ms  {r['loop_samples_per_s']:>10.0f} samples/s")
+
+
+if __name__ == "__main__":
+    main()
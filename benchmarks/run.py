@@ -0,0 +1,168 @@
+"""
+Runs the benchmark suite, writes the results as JSON and compares them
+against a stored baseline.
+
+Every metric is flattened to `bench.case.metric` (e.g.
+`ops.matmul.backward_us`). Metrics containing `per_s` are throughputs
+(higher is better); all others are times or bytes (lower is better). A
+metric that is worse than the baseline by more than `--threshold` is a
+regression and makes the script exit with status 1.
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --save-baseline baseline.json
+    python benchmarks/run.py --baseline baseline.json --only ops mlp
+
+The default sizes keep the whole suite well under a minute; `--full` uses
+each benchmark's own defaults. Baselines are machine specific, so none is
+checked in: save one on the machine you compare on.
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from deriv.Array.backend import set_backend
+
+# name -> (module, quick kwargs, full kwargs, fields that name a case of a list result)
+SUITE = {
+    "ops": ("bench_ops", {"repeats": 30}, {}, ()),
+    "graph_scaling": ("bench_graph_scaling", {"max_nodes": 100_000, "memory": False}, {}, ("nodes",)),
+    "node_overhead": ("bench_node_overhead", {"n": 20_000}, {}, ()),
+    "backward_alloc": ("bench_backward_alloc", {"batch": 64, "width": 256}, {}, ()),
+    "mlp": ("bench_mlp", {"steps": 30}, {}, ()),
+    "cross_entropy": ("bench_cross_entropy", {"classes": (10, 1000, 10000), "repeats": 3},
+                      {"classes": (10, 1000, 10000, 50000)}, ()),
+    "optim_step": ("bench_optim_step", {"layers": (10, 100), "repeats": 10}, {}, ("optimizer", "tensors")),
+    "data_loader": ("bench_data_loader", {"samples": 20_000, "features": 128, "workers": (0, 2)}, {}, ()),
+    "per_sample": ("bench_per_sample", {"batch": 64, "repeats": 5}, {}, ()),
+    "data_parallel": ("bench_data_parallel", {"workers": (1, 2), "batch": 256, "width": 128, "steps": 5}, {},
+                      ("workers",)),
+    "parallel_backward": ("bench_parallel_backward", {"threads": (1, 2), "heads": 4, "width": 128, "repeats": 5}, {},
+                          ("threads",)),
+    "embedding": ("bench_embedding", {"rows": 100_000, "dim": 32, "repeats": 5}, {}, ()),
+}
+
+# Fields of a list result that describe the case rather than measure it.
+_DESCRIPTIVE = {"params"}
+
+
+def flatten(name, result, keys=()):
+    """Flattens a benchmark result to `{"bench.case.metric": value}`."""
+    if isinstance(result, list):
+        flat = {}
+        for row in result:
+            case = ".".join(f"{k}={row[k]}" for k in keys)
+            metrics = {k: v for k, v in row.items() if k not in keys and k not in _DESCRIPTIVE}
+            flat.update(flatten(f"{name}.{case}", metrics))
+        return flat
+    if isinstance(result, dict):
+        flat = {}
+        for key, value in result.items():
+            flat.update(flatten(f"{name}.{key}", value))
+        return flat
+    return {name: float(result)}
+
+
+def higher_is_better(metric):
+    return "per_s" in metric.rsplit(".", 1)[-1]
+
+
+def compare(results, baseline, threshold):
+    """
+    Compares two flattened result dicts.
+
+    Returns:
+        tuple: (`regressions`, `improvements`), lists of
+        `(metric, baseline value, new value, relative change)` where a
+        positive change is always an improvement.
+    """
+    regressions, improvements = [], []
+    for metric, new in results.items():
+        old = baseline.get(metric)
+        if not old:
+            continue
+        change = (new - old) / old if higher_is_better(metric) else (old - new) / old
+        if change < -threshold:
+            regressions.append((metric, old, new, change))
+        elif change > threshold:
+            improvements.append((metric, old, new, change))
+    return regressions, improvements
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def run(names=None, full=False):
+    """Runs the selected benchmarks and returns `(flattened results, seconds per benchmark)`."""
+    results, durations = {}, {}
+    for name in names or SUITE:
+        module, quick, full_kwargs, keys = SUITE[name]
+        bench = importlib.import_module(module)
+        t0 = time.perf_counter()
+        result = bench.run(**(full_kwargs if full else quick))
+        durations[name] = time.perf_counter() - t0
+        results.update(flatten(name, result, keys))
+        print(f"{name:<16} {durations[name]:>7.1f} s", file=sys.stderr)
+    return results, durations
+
+
+def _print_changes(title, rows):
+    print(f"{title} ({len(rows)}):")
+    for metric, old, new, change in sorted(rows, key=lambda r: r[3]):
+        print(f"  {metric:<60} {old:>12.4g} -> {new:<12.4g} {change:+.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=list(SUITE), help="benchmarks to run")
+    parser.add_argument("--full", action="store_true", help="use each benchmark's full default sizes")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    parser.add_argument("--save-baseline", help="write the results as a new baseline")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="relative change counted as a regression / improvement")
+    args = parser.parse_args()
+
+    set_backend("cpu")
+    import numpy as np
+
+    results, durations = run(args.only, args.full)
+    report = {
+        "meta": {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+                 "commit": _git_commit(), "full": args.full, "durations_s": durations},
+        "results": results,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+
+    if not args.baseline:
+        for metric, value in results.items():
+            print(f"{metric:<60} {value:>14.4g}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline["meta"].get("full") != args.full:
+        print("warning: baseline was recorded with different sizes (--full)", file=sys.stderr)
+    regressions, improvements = compare(results, baseline["results"], args.threshold)
+    missing = sorted(set(baseline["results"]) - set(results))
+    _print_changes("regressions", regressions)
+    _print_changes("improvements", improvements)
+    print(f"{len(results)} metrics, {len(missing)} in the baseline but not run, threshold {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
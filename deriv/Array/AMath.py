@@ -1,4 +1,4 @@
-from deriv.Array.array_object import array, unbroadcast
+from deriv.Array.array_object import array, unbroadcast, _make_node
 from deriv.Array.backend import get_backend
 
 
@@ -36,11 +36,17 @@ class trigo:
         """
         obj = convert(obj)
         radians = xp.radians(obj.data) if deg else obj.data
-        out = array(xp.sin(radians), (obj,), need_grad=True, op='sin')
+        out = _make_node(xp.sin(radians), (obj,), 'sin', {'deg': deg})
+        if not out.parents:
+            return out
 
         def sinBackward():
             if obj.need_grad:
-                obj.grad += out.grad * xp.cos(radians)
+                grad = xp.cos(xp.radians(obj.data) if deg else obj.data)
+                grad *= out.grad
+                if deg:
+                    grad *= xp.pi / 180
+                obj._accumulate(grad)
 
         out._back = sinBackward
         return out
@@ -60,11 +66,17 @@ class trigo:
         """
         obj = convert(obj)
         radians = xp.radians(obj.data) if deg else obj.data
-        out = array(xp.cos(radians), (obj,), need_grad=True, op='cos')
+        out = _make_node(xp.cos(radians), (obj,), 'cos', {'deg': deg})
+        if not out.parents:
+            return out
 
         def cosBackward():
             if obj.need_grad:
-                obj.grad += out.grad * -xp.sin(radians)
+                grad = xp.sin(xp.radians(obj.data) if deg else obj.data)
+                grad *= out.grad
+                if deg:
+                    grad *= xp.pi / 180
+                obj._accumulate(grad, negate=True)
 
         out._back = cosBackward
         return out
@@ -88,11 +100,13 @@ class expo:
             `array`: Result of exp operation with autograd support.
         """
         obj = convert(obj)
-        out = array(xp.exp(obj.data), (obj,), need_grad=True, op='exp')
+        out = _make_node(xp.exp(obj.data), (obj,), 'exp')
+        if not out.parents:
+            return out
 
         def expBackward():
             if obj.need_grad:
-                obj.grad += out.grad * out.data
+                obj._accumulate(xp.multiply(out.grad, out.data))
 
         out._back = expBackward
         return out
@@ -110,11 +124,13 @@ class expo:
             `array`: Result of log operation with autograd support.
         """
         obj = convert(obj)
-        out = array(xp.log(obj.data), (obj,), need_grad=True, op='log')
+        out = _make_node(xp.log(obj.data), (obj,), 'log')
+        if not out.parents:
+            return out
 
         def logBackward():
             if obj.need_grad:
-                obj.grad += out.grad * (1 / obj.data)
+                obj._accumulate(xp.divide(out.grad, obj.data))
 
         out._back = logBackward
         return out
@@ -132,11 +148,15 @@ class expo:
             `array`: Result of log10 operation with autograd support.
         """
         obj = convert(obj)
-        out = array(xp.log10(obj.data), (obj,), need_grad=True, op='log10')
+        out = _make_node(xp.log10(obj.data), (obj,), 'log10')
+        if not out.parents:
+            return out
 
         def log10Backward():
             if obj.need_grad:
-                obj.grad += out.grad * (1 / obj.data) * xp.log10(xp.exp(1))
+                grad = xp.divide(out.grad, obj.data)
+                grad *= xp.log10(xp.e)
+                obj._accumulate(grad)
 
         out._back = log10Backward
         return out
@@ -155,16 +175,21 @@ class expo:
             `array`: Result of root operation with autograd support.
         """
         obj, _pow = convert(obj), convert(1 / _pow)
-        out = array((obj ** _pow).data, (obj, _pow), need_grad=True, op='root')
+        out = _make_node(obj.data ** _pow.data, (obj, _pow), 'root')
+        if not out.parents:
+            return out
 
         def rootBackward():
             if obj.need_grad:
-                grad_obj = _pow.data * (obj.data ** (_pow.data - 1)) * out.grad
-                obj.grad += unbroadcast(grad_obj, obj.data.shape)
+                grad_obj = xp.multiply(out.grad, _pow.data)
+                grad_obj *= xp.power(obj.data, _pow.data - 1)
+                obj._accumulate(unbroadcast(grad_obj, obj.data.shape))
 
             if _pow.need_grad:
-                grad_pow = out.data * xp.log(obj.data) * out.grad
-                _pow.grad += unbroadcast(grad_pow, _pow.data.shape)
+                grad_pow = xp.log(obj.data)
+                grad_pow *= out.data
+                grad_pow *= out.grad
+                _pow._accumulate(unbroadcast(grad_pow, _pow.data.shape))
 
         out._back = rootBackward
         return out
@@ -189,17 +214,17 @@ class reduct:
         Returns:
             `array`: Result of sum operation with autograd support.
         """
-        out = array(obj.data.sum(axis=axis, keepdims=keepdims), (obj,), need_grad=True, op='sum')
+        out = _make_node(obj.data.sum(axis=axis, keepdims=keepdims), (obj,), 'sum',
+                         {'axis': axis, 'keepdims': keepdims})
+        if not out.parents:
+            return out
 
         def sumBackward():
             if obj.need_grad:
                 grad = out.grad
                 if axis is not None and not keepdims:
-                    shape = list(obj.data.shape)
-                    axis_ = [axis] if isinstance(axis, int) else axis
-                    for ax in axis_:
-                        grad = xp.expand_dims(grad, ax)
-                obj.grad += grad * xp.ones_like(obj.data)
+                    grad = xp.expand_dims(grad, axis)
+                obj._accumulate(xp.broadcast_to(grad, obj.data.shape), owned=False)
 
         out._back = sumBackward
         return out
@@ -217,19 +242,16 @@ class reduct:
         Returns:
             `array`: Result of mean operation with autograd support.
         """
-        out = array(obj.data.mean(axis=axis), (obj,), need_grad=True, op='mean')
+        out = _make_node(obj.data.mean(axis=axis), (obj,), 'mean', {'axis': axis})
+        if not out.parents:
+            return out
 
         def meanBackward():
             if obj.need_grad:
-                shape = obj.data.shape
-                if axis is None:
-                    num_elements = xp.prod(shape)
-                    grad = xp.ones_like(obj.data) / num_elements
-                    obj.grad += out.grad * grad
-                else:
-                    num_elements = shape[axis]
-                    grad = xp.ones_like(obj.data) / num_elements
-                    obj.grad += out.grad * grad
+                grad = out.grad / (obj.data.size // out.data.size)
+                if axis is not None:
+                    grad = xp.expand_dims(grad, axis)
+                obj._accumulate(xp.broadcast_to(grad, obj.data.shape), owned=False)
 
         out._back = meanBackward
         return out
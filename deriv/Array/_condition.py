@@ -1,4 +1,4 @@
-from deriv.Array.array_object import array
+from deriv.Array.array_object import array, unbroadcast, _make_node
 from deriv.Array.backend import get_backend
 
 
@@ -23,21 +23,20 @@ def where(_statement, _do_data, _otherwise_data):
     >>> deriv.where(x>y, x*y, x+y)
     7
     """
+    if not isinstance(_statement, array):
+        _statement = array(_statement)
     out_data = xp.where(_statement.data, _do_data.data, _otherwise_data.data)
-    need_grad = _do_data.need_grad or _otherwise_data.need_grad
-    out = array(out_data, need_grad=need_grad)
+    out = _make_node(out_data, (_statement, _do_data, _otherwise_data), 'where')
+    if not out.parents:
+        return out
 
     def whereBackward():
         if _do_data.need_grad:
-            grad = xp.where(_statement.data, out.grad, 0.0)
-            _do_data.grad += grad
-            if hasattr(_do_data, '_back') and _do_data._back:
-                _do_data._back()
+            grad = xp.multiply(out.grad, _statement.data)
+            _do_data._accumulate(unbroadcast(grad, _do_data.data.shape))
         if _otherwise_data.need_grad:
-            grad = xp.where(_statement.data, 0.0, out.grad)
-            _otherwise_data.grad += grad
-            if hasattr(_otherwise_data, '_back') and _otherwise_data._back:
-                _otherwise_data._back()
+            grad = xp.multiply(out.grad, xp.logical_not(_statement.data))
+            _otherwise_data._accumulate(unbroadcast(grad, _otherwise_data.data.shape))
 
     out._back = whereBackward
     return out
@@ -1,17 +1,68 @@
 from typing import Callable
-from deriv.Array.reversed_mode_autodiff import _backward
-from deriv.Array.backend import get_backend
+from deriv.Array.reversed_mode_autodiff import _backward, _topo_order, locked_grads, noop, released
+from deriv.Array.backend import get_backend, on_backend_change
+from deriv.Array.grad_mode import is_grad_enabled, is_recording_constants, active_tape
+from deriv.Array.visualize import render_tree
+from deriv.Array import forward_mode
+from deriv.Array.op_table import _index_add
+from deriv.Array.sparse import SparseGrad, add_sparse
 
 def unbroadcast(grad, target_shape):
-    """Reduces gradient to the original broadcasted shape."""
-    while len(grad.shape) > len(target_shape):
-        grad = grad.sum(axis=0)
+    """Reduces gradient to the original broadcasted shape, in a single `sum`."""
+    shape = grad.shape
+    if shape == target_shape:
+        return grad
+    extra = len(shape) - len(target_shape)
+    axes = tuple(range(extra)) + tuple(
+        extra + i for i, dim in enumerate(target_shape) if dim == 1 and shape[extra + i] != 1
+    )
+    if axes:
+        grad = grad.sum(axis=axes, keepdims=True)
+    return grad.reshape(target_shape) if extra else grad
+
+def _raw_index(index, xp):
+    """An index as a tuple of raw parts: arrays and lists become backend arrays."""
+    parts = index if isinstance(index, tuple) else (index,)
+    return tuple(part.data if isinstance(part, array) else xp.asarray(part) if isinstance(part, list) else part
+                 for part in parts)
+
+def _make_node(data, parents, op, attrs=None):
+    """
+    Creates the output of an op. The output is only recorded in the graph
+    while grad mode is enabled and at least one parent needs a gradient,
+    otherwise it is returned as a constant (see `_make_const`).
+
+    `attrs` holds the op's static arguments (axis, keepdims, ...) so the op
+    can be recomputed from its parents, e.g. by `deriv.capture`.
 
-    for i, dim in enumerate(target_shape):
-        if dim == 1:
-            grad = grad.sum(axis=i, keepdims=True)
+    Inside `deriv.compact_tape()` the op is written to the tape instead and
+    the output keeps no parents, so ops skip building a backward closure.
 
-    return grad
+    Inside `deriv.forward_ad()` the output also gets the tangent computed
+    from its parents' tangents (see `deriv.Array.forward_mode`).
+    """
+    if forward_mode.depth:
+        return forward_mode.attach(_record_node(data, parents, op, attrs), parents, op, attrs)
+    return _record_node(data, parents, op, attrs)
+
+def _record_node(data, parents, op, attrs):
+    if is_grad_enabled():
+        for parent in parents:
+            if parent.need_grad:
+                tape = active_tape()
+                if tape is not None:
+                    return tape.record(data, parents, op, attrs)
+                return array(data, parents, op, need_grad=True, attrs=attrs)
+    return _make_const(data, parents, op, attrs)
+
+def _make_const(data, parents, op, attrs=None):
+    """
+    Creates the output of an op that does not need a gradient. It is a plain
+    leaf unless constants are being recorded for `deriv.capture`.
+    """
+    if is_recording_constants():
+        return array(data, parents, op, attrs=attrs)
+    return array(data)
 
 class array:
     """
@@ -19,6 +70,10 @@ class array:
 
     A NumPy-compatible array class with reverse-mode autodiff support.
 
+    Arrays are graph nodes, so they are kept small: attributes live in
+    `__slots__`, leaves share a single no-op backward function and `shape`
+    is read from `data` on demand.
+
     Parameters
     ----------
     data : array_like
@@ -27,94 +82,156 @@ class array:
         The parent nodes in the computation graph, used for backpropagation.
     need_grad : bool, optional
         Whether to track gradients for this array.
+    attrs : dict, optional
+        Static arguments of the op that produced this array.
     """
     
-    def __init__(self, data, parents=(), op='', need_grad=False, var_name=''):
-        self.xp = get_backend()
-        self.data = self.xp.array(data) if not isinstance(data, self.xp.ndarray) else data
-        self.grad = self.xp.zeros_like(self.data) if need_grad else None
-        self._cached_topo = []
-        self.shape = self.data.shape if isinstance(self.data, self.xp.ndarray) else ()
+    # `tangent` is only set on arrays that carry one in forward mode; it is
+    # read with `forward_mode.tangent_of`.
+    __slots__ = ('data', 'grad', 'parents', 'op', '_back', 'need_grad', 'var_name', 'attrs',
+                 'device', 'tangent', '__weakref__')
+
+    # Backend module, shared by all arrays and kept current by `set_backend`.
+    xp = None
+
+    def __init__(self, data, parents=(), op='', need_grad=False, var_name='', attrs=None):
+        xp = self.xp or get_backend()
+        self.data = data if isinstance(data, xp.ndarray) else xp.array(data)
+        self.grad = None
         self.parents = parents
         self.op = op
-        def noop():
-            pass
         self._back: Callable[[], None] = noop
         self.need_grad = need_grad
         self.var_name = var_name
-        self.is_scaler = True if self.data.shape == (1,1) else False
+        self.attrs = attrs
+
+    @property
+    def shape(self):
+        return self.data.shape
 
+    @property
+    def is_scaler(self):
+        return self.data.shape == (1, 1)
 
-    def backward(self):
+    def backward(self, retain_graph=False, free_intermediates=False, threads=None):
         """
-        deriv.backward()
+        deriv.backward(retain_graph=False, free_intermediates=False, threads=None)
 
         Computes the gradient of the array with respect to all `need_grad=True` inputs.
+
+        Parameters
+        ----------
+        retain_graph : bool, optional
+            If False (default), every processed node drops its `parents` and
+            backward closure, so the graph no longer pins its intermediates once
+            backward is done; calling backward on it again then raises. Pass
+            True to call backward through the same graph again: every call adds
+            one more gradient to the leaves.
+        free_intermediates : bool, optional
+            If True, the grad buffer and backward closure of every intermediate
+            (non-leaf) node are released as soon as that node has been processed.
+        threads : int, optional
+            Run the backward closures on a pool of this many threads. A node
+            runs as soon as all of its consumers have, so independent
+            branches of the graph are differentiated concurrently and shared
+            gradients are accumulated under a lock. Pays off for graphs with
+            wide branches of large ops (multi-head layers, ensembles of
+            towers); chains of small ops are faster sequentially.
+
+        Returns
+        -------
+        int
+            Number of constant nodes that were pruned from the backward pass.
         """
-        _backward(self)
+        return _backward(self, retain_graph, free_intermediates, threads)
 
-    def topo(self):
-        if not self._cached_topo:  
-            visited = set()
-            def build_topo(node):
-                if node not in visited:
-                    visited.add(node)
-                    for parent in node.parents:
-                        build_topo(parent)
-                    self._cached_topo.append(node)
-            build_topo(self)
-        return self._cached_topo
-
-    def graph(self, data=False):
-        def print_graph(node, indent="", last=True, visited=None):
-            if visited is None:
-                visited = set()
-                
-            if node in visited:
-                print(indent + ("└── " if last else "├── ") + f"[...]{get_node_label(node)}")
-                return
-            visited.add(node)
-
-            branch = "└── " if last else "├── "
-            print(indent + branch + get_node_label(node))
-
-            indent += "    " if last else "│   "
-            for i, parent in enumerate(node.parents):
-                is_last = (i == len(node.parents) - 1)
-                print_graph(parent, indent, is_last, visited)
-
-        def get_node_label(node):
-            def get_last_node(self): 
-                topo = []
-                visited = set()
-                def build_topo(node):
-                    if node not in visited:
-                        visited.add(node)
-                        for parent in node.parents:
-                            build_topo(parent)
-                        topo.append(node)
-                build_topo(self)
-                topo.reverse()
-                return topo
-            
-            topo = get_last_node(self)
-
-            if node == topo[0] and hasattr(node, 'op'):
-                return f"{node.op} ({node.data})"
-            if node.var_name:
-                if data == False:
-                    return f"{node.var_name}"
-                return f"{node.var_name} ({node.data})"
-            elif hasattr(node, 'op'):
-                if data == False:
-                    return f"{node.op}"
-                return f"{node.op} ({node.data})"
-            elif isinstance(node, (float, int)):
-                return f"(node)"
+    def _accumulate(self, grad, owned=True, negate=False):
+        """
+        Adds `grad` (or subtracts it, with `negate`) into `self.grad` in place,
+        creating the buffer on first write.
+
+        The first write adopts `grad` directly when it is a writable temporary
+        `owned` by the caller, and copies it otherwise (e.g. when it aliases
+        another node's grad or is a `broadcast_to` view).
+
+        A `SparseGrad` is kept sparse while every contribution is sparse
+        (see `deriv.Array.sparse`).
+        """
+        xp = self.xp
+        with locked_grads(self):
+            if isinstance(grad, SparseGrad) or isinstance(self.grad, SparseGrad):
+                self.grad = add_sparse(self.grad, -grad if negate else grad)
+            elif self.grad is None:
+                if grad.shape != self.data.shape:
+                    grad = xp.broadcast_to(grad, self.data.shape)
+                owned = owned and grad.flags.writeable
+                if negate:
+                    grad = xp.negative(grad, out=grad) if owned else xp.negative(grad)
+                elif not owned:
+                    grad = grad.copy()
+                # Ufuncs on 0-d arrays return scalars; `.grad` is always an array.
+                self.grad = grad if isinstance(grad, xp.ndarray) else xp.asarray(grad)
+            elif negate:
+                xp.subtract(self.grad, grad, out=self.grad)
             else:
-                return f"val ({node.data})"
-            
-        return print_graph(self)
+                xp.add(self.grad, grad, out=self.grad)
+
+    def _accumulate_at(self, index, grad):
+        """
+        Adds `grad` into `self.grad[index]` in place, creating a zero buffer
+        on first write. Repeated entries of an advanced index add up.
+        """
+        with locked_grads(self):
+            if self.grad is None:
+                self.grad = self.xp.zeros_like(self.data)
+            elif isinstance(self.grad, SparseGrad):
+                self.grad = self.grad.to_dense()
+            _index_add(self.xp, self.grad, index, grad)
+
+    def __reduce__(self):
+        """
+        Pickles the array as a leaf: its data, `need_grad` and name. The
+        graph (parents and backward closure), the gradient and the tangent
+        are not pickled, so parameters and modules can be sent to other
+        processes.
+        """
+        return (array, (self.data, (), '', self.need_grad, self.var_name))
+
+    def topo(self):
+        """
+        deriv.topo()
+
+        Returns the nodes of the graph ending at this array in topological
+        order (parents before children). The order is rebuilt on each call so
+        the array does not keep its graph alive.
+        """
+        return _topo_order(self)[0]
+
+    def graph(self, data=False, max_depth=None, collapse=False, file=None):
+        """
+        deriv.graph(data=False, max_depth=None, collapse=False, file=None)
+
+        Prints the graph ending at this array as a tree, streaming one line
+        per node. Each node is expanded once, so printing is linear in the
+        size of the graph; later references to it are shown as `[...]`.
+
+        Parameters
+        ----------
+        data : bool, optional
+            Print the data of every node next to its name.
+        max_depth : int, optional
+            Stop this many edges above this array. Cut-off nodes get a
+            `[+n]` suffix with their number of hidden inputs.
+        collapse : bool, optional
+            Print repeated subgraphs (e.g. identical layers) once; later
+            repeats are shown as `[~]`.
+        file : file-like, optional
+            Where to write the tree, `sys.stdout` by default.
+
+        See `deriv.to_dot` and `deriv.to_json` for exports that carry
+        shapes, dtypes and sizes.
+        """
+        render_tree(self, data, max_depth, collapse, file)
 
     def __repr__(self):
         """
@@ -132,7 +249,7 @@ class array:
             prefix=prefix     
         )
         extras = []
-        if self._back.__name__ != "noop":
+        if self._back is not noop and self._back is not released:
             extras.append(f"grad_fn=<{self._back.__name__}>")
         if self.need_grad:
             extras.append(f"need_grad={self.need_grad!r}")
@@ -151,12 +268,14 @@ class array:
         """
         if isinstance(other, (int, float, list)):
             other = array(other)
-        out = array(self.data + other.data, (self, other), '+', need_grad=True)
+        out = _make_node(self.data + other.data, (self, other), '+')
+        if not out.parents:
+            return out
         def add_back():
             if self.need_grad:
-                self.grad += unbroadcast(out.grad, self.data.shape)
+                self._accumulate(unbroadcast(out.grad, self.data.shape), owned=False)
             if other.need_grad:
-                other.grad += unbroadcast(out.grad, other.data.shape)
+                other._accumulate(unbroadcast(out.grad, other.data.shape), owned=False)
         out._back = add_back
         return out
 
@@ -174,12 +293,14 @@ class array:
         """
         if isinstance(other, (int, float, list)):
             other = array(other)
-        out = array(self.data - other.data, (self, other), '-', need_grad=True)
+        out = _make_node(self.data - other.data, (self, other), '-')
+        if not out.parents:
+            return out
         def sub_back():
             if self.need_grad:
-                self.grad += unbroadcast(out.grad, self.data.shape)
+                self._accumulate(unbroadcast(out.grad, self.data.shape), owned=False)
             if other.need_grad:
-                other.grad += unbroadcast(-out.grad, other.data.shape)
+                other._accumulate(unbroadcast(out.grad, other.data.shape), owned=False, negate=True)
         out._back = sub_back
         return out
 
@@ -197,14 +318,14 @@ class array:
         """
         if isinstance(other, (int, float, list)):
             other = array(other)
-        out = array(self.data * other.data, (self, other), '*', need_grad=True)
+        out = _make_node(self.data * other.data, (self, other), '*')
+        if not out.parents:
+            return out
         def mul_back():
             if self.need_grad:
-                grad = other.data * out.grad
-                self.grad += unbroadcast(grad, self.data.shape)
+                self._accumulate(unbroadcast(self.xp.multiply(out.grad, other.data), self.data.shape))
             if other.need_grad:
-                grad = self.data * out.grad
-                other.grad += unbroadcast(grad, other.data.shape)
+                other._accumulate(unbroadcast(self.xp.multiply(out.grad, self.data), other.data.shape))
         out._back = mul_back
         return out
 
@@ -222,14 +343,18 @@ class array:
         """
         if isinstance(other, (int, float, list)):
             other = array(other)
-        out = array(self.data / other.data, (self, other), '/', need_grad=True)
+        out = _make_node(self.data / other.data, (self, other), '/')
+        if not out.parents:
+            return out
         def div_back():
+            xp = self.xp
             if self.need_grad:
-                grad_self = out.grad / other.data
-                self.grad += unbroadcast(grad_self, self.data.shape)
+                self._accumulate(unbroadcast(xp.divide(out.grad, other.data), self.data.shape))
             if other.need_grad:
-                grad_other = -self.data * out.grad / (other.data ** 2)
-                other.grad += unbroadcast(grad_other, other.data.shape)
+                # d(a / b) / db = -(a / b) / b
+                grad_other = xp.multiply(out.grad, out.data)
+                xp.divide(grad_other, other.data, out=grad_other)
+                other._accumulate(unbroadcast(grad_other, other.data.shape), negate=True)
         out._back = div_back
         return out
 
@@ -247,14 +372,20 @@ class array:
         """
         if isinstance(other, (int, float, list)):
             other = array(other)
-        out = array(self.data ** other.data, (self, other), '**', need_grad=True)
+        out = _make_node(self.data ** other.data, (self, other), '**')
+        if not out.parents:
+            return out
         def pow_back():
+            xp = self.xp
             if self.need_grad:
-                grad_self = other.data * (self.data ** (other.data - 1)) * out.grad
-                self.grad += unbroadcast(grad_self, self.data.shape)
+                grad_self = xp.multiply(out.grad, other.data)
+                grad_self *= xp.power(self.data, other.data - 1)
+                self._accumulate(unbroadcast(grad_self, self.data.shape))
             if other.need_grad:
-                grad_other = out.data * self.xp.log(self.data) * out.grad
-                other.grad += unbroadcast(grad_other, other.data.shape)
+                grad_other = xp.log(self.data)
+                grad_other *= out.data
+                grad_other *= out.grad
+                other._accumulate(unbroadcast(grad_other, other.data.shape))
         out._back = pow_back
         return out
 
@@ -272,12 +403,14 @@ class array:
         """
         if not isinstance(other, array):
             other = array(other)
-        out = array(self.xp.matmul(self.data, other.data), (self, other), '@', need_grad=True)
+        out = _make_node(self.xp.matmul(self.data, other.data), (self, other), '@')
+        if not out.parents:
+            return out
         def matmul_back():
             if self.need_grad:
-                self.grad += self.xp.matmul(out.grad, self.xp.swapaxes(other.data, -1, -2))
+                self._accumulate(self.xp.matmul(out.grad, self.xp.swapaxes(other.data, -1, -2)))
             if other.need_grad:
-                other.grad += self.xp.matmul(self.xp.swapaxes(self.data, -1, -2), out.grad)
+                other._accumulate(self.xp.matmul(self.xp.swapaxes(self.data, -1, -2), out.grad))
         out._back = matmul_back
         return out
 
@@ -288,7 +421,13 @@ class array:
 
         Returns the transpose of the array.
         """
-        out = array(self.data.T, (self,), op='T')  
+        out = _make_node(self.data.T, (self,), 'T')
+        if not out.parents:
+            return out
+        def T_back():
+            if self.need_grad:
+                self._accumulate(out.grad.T, owned=False)
+        out._back = T_back
         return out
 
     def sum(self, axis=None, keepdims=False):
@@ -304,19 +443,16 @@ class array:
         keepdims : bool, optional
             If True, retains reduced dimensions with size one.
         """
-        out = array(self.data.sum(axis=axis, keepdims=keepdims), (self,), 'sum', need_grad=True)  
+        out = _make_node(self.data.sum(axis=axis, keepdims=keepdims), (self,), 'sum',
+                         {'axis': axis, 'keepdims': keepdims})
+        if not out.parents:
+            return out
         def sumBackward():
             if self.need_grad:
                 grad = out.grad
                 if axis is not None and not keepdims:
-                    shape = list(self.data.shape)
-                    if isinstance(axis, int):
-                        axis_ = [axis]
-                    else:
-                        axis_ = axis
-                    for ax in axis_:
-                        grad = self.xp.expand_dims(grad, ax)
-                self.grad += grad * self.xp.ones_like(self.data)
+                    grad = self.xp.expand_dims(grad, axis)
+                self._accumulate(self.xp.broadcast_to(grad, self.data.shape), owned=False)
         out._back = sumBackward
         return out
 
@@ -331,33 +467,104 @@ class array:
         axis : None or int, optional
             Axis or axes along which the mean is computed.
         """
-        out = array(self.data.mean(axis=axis), (self,), 'mean', need_grad=True)  
+        out = _make_node(self.data.mean(axis=axis), (self,), 'mean', {'axis': axis})
+        if not out.parents:
+            return out
         def meanBackward():
             if self.need_grad:
-                shape = self.data.shape
-                if axis is None:
-                    num_elements = self.xp.prod(shape)
-                    grad = self.xp.ones_like(self.data) / num_elements
-                    self.grad += out.grad * grad
-                else:
-                    num_elements = shape[axis]
-                    grad = self.xp.ones_like(self.data) / num_elements
-                    self.grad += out.grad * grad 
+                xp = self.xp
+                grad = out.grad / (self.data.size // out.data.size)
+                if axis is not None:
+                    grad = xp.expand_dims(grad, axis)
+                self._accumulate(xp.broadcast_to(grad, self.data.shape), owned=False)
         out._back = meanBackward
         return out
     
     def max(self, axis=None, keepdims=False):
-        out = array(self.data.max(axis=axis, keepdims=keepdims), (self,), 'max', need_grad=True)
+        out = _make_node(self.data.max(axis=axis, keepdims=keepdims), (self,), 'max',
+                         {'axis': axis, 'keepdims': keepdims})
+        if not out.parents:
+            return out
+        def maxBackward():
+            if self.need_grad:
+                xp = self.xp
+                peak = out.data
+                grad = out.grad
+                if axis is not None and not keepdims:
+                    peak = xp.expand_dims(peak, axis)
+                    grad = xp.expand_dims(grad, axis)
+                mask = self.data == peak
+                grad = grad / mask.sum(axis=axis, keepdims=True)
+                self._accumulate(xp.multiply(mask, grad))
+        out._back = maxBackward
         return out
         
 
+    def reshape(self, shape):
+        """
+        deriv.reshape(self, shape)
+
+        Gives a new shape to the array without changing its data.
+
+        Parameters
+        ----------
+        shape : int or tuple of ints
+            The new shape; one dimension may be -1.
+        """
+        data = self.data.reshape(shape)
+        out = _make_node(data, (self,), 'reshape', {'shape': data.shape})
+        if not out.parents:
+            return out
+        def reshapeBackward():
+            if self.need_grad:
+                self._accumulate(out.grad.reshape(self.data.shape), owned=False)
+        out._back = reshapeBackward
+        return out
+
+    def broadcast_to(self, shape):
+        """
+        deriv.broadcast_to(self, shape)
+
+        Broadcasts the array to a new shape (a read-only view).
+
+        Parameters
+        ----------
+        shape : tuple of ints
+            The shape to broadcast to.
+        """
+        data = self.xp.broadcast_to(self.data, shape)
+        out = _make_node(data, (self,), 'broadcast', {'shape': data.shape})
+        if not out.parents:
+            return out
+        def broadcastBackward():
+            if self.need_grad:
+                self._accumulate(unbroadcast(out.grad, self.data.shape), owned=False)
+        out._back = broadcastBackward
+        return out
+
     def __len__(self):
         """Returns the number of elements along the first axis."""
         return len(self.data)
 
     def __getitem__(self, index):
-        """Indexing access to data."""
-        return self.data[index]
+        """
+        deriv.__getitem__(self, index)
+
+        Differentiable indexing, `x[index]`, with NumPy's basic and advanced
+        indexing rules. The gradient is added back at `index`; entries an
+        advanced index selects more than once receive the sum of their
+        gradients. Indices may be ints, slices, `None`, `...`, lists or
+        (integer or boolean) arrays.
+        """
+        index = _raw_index(index, self.xp)
+        out = _make_node(self.data[index], (self,), 'getitem', {'index': index})
+        if not out.parents:
+            return out
+        def getitemBackward():
+            if self.need_grad:
+                self._accumulate_at(index, out.grad)
+        out._back = getitemBackward
+        return out
 
     def __eq__(self, other):
         """Equality check (reference based)."""
@@ -366,31 +573,31 @@ class array:
     def __ne__(self, other):
         """Non-equality check."""
         if isinstance(other, self.__class__):
-            return self.data != other.data
+            return _make_const(self.data != other.data, (self, other), '!=')
         return NotImplemented
 
     def __lt__(self, other):
         """Less-than comparison."""
         if isinstance(other, self.__class__):
-            return self.data < other.data
+            return _make_const(self.data < other.data, (self, other), '<')
         return NotImplemented
 
     def __le__(self, other):
         """Less-than or equal comparison."""
         if isinstance(other, self.__class__):
-            return self.data <= other.data
+            return _make_const(self.data <= other.data, (self, other), '<=')
         return NotImplemented
 
     def __gt__(self, other):
         """Greater-than comparison."""
         if isinstance(other, self.__class__):
-            return self.data > other.data
+            return _make_const(self.data > other.data, (self, other), '>')
         return NotImplemented
 
     def __ge__(self, other):
         """Greater-than or equal comparison."""
         if isinstance(other, self.__class__):
-            return self.data >= other.data
+            return _make_const(self.data >= other.data, (self, other), '>=')
         return NotImplemented
 
     def __hash__(self):
@@ -398,7 +605,14 @@ class array:
         return id(self)
     
     def __neg__(self):
-        return array(-self.data)
+        out = _make_node(-self.data, (self,), 'neg')
+        if not out.parents:
+            return out
+        def neg_back():
+            if self.need_grad:
+                self._accumulate(out.grad, owned=False, negate=True)
+        out._back = neg_back
+        return out
 
     def to(self, device: str):
         if device == 'cpu':
@@ -414,4 +628,7 @@ class array:
             self.device = 'cuda'
         else:
             raise ValueError("Device must be 'cpu' or 'cuda'")
-        return self  # enable chaining
\ No newline at end of file
+        return self  # enable chaining
+
+
+on_backend_change(lambda xp: setattr(array, 'xp', xp))
@@ -1,4 +1,5 @@
 _backend = None
+_hooks = []
 
 def set_backend(name: str):
     global _backend
@@ -13,11 +14,19 @@ def set_backend(name: str):
             raise RuntimeError("CuPy is not installed. Install it with `pip install cupy`.")
     else:
         raise ValueError(f"Unknown backend '{name}'. Use 'cpu' or 'cuda'.")
+    for hook in _hooks:
+        hook(_backend)
 
 def get_backend():
     if _backend is None:
         raise RuntimeError("Backend not set. Please call `set_backend('cpu')` or `set_backend('cuda')` first.")
     return _backend
 
+def on_backend_change(hook):
+    """Registers `hook(xp)`, called now if a backend is set and on every `set_backend`."""
+    _hooks.append(hook)
+    if _backend is not None:
+        hook(_backend)
+
 def is_gpu():
     return get_backend().__name__ == "cupy"
@@ -0,0 +1,202 @@
+from deriv.Array.array_object import array
+from deriv.Array.backend import get_backend
+from deriv.Array.grad_mode import enable_grad, record_constants
+from deriv.Array.op_table import FORWARD
+from deriv.Array.fusion import find_groups, DEFAULT_CHUNK_SIZE
+from deriv.Array.memory_plan import MemoryPlan, saved_by
+
+
+class Tape:
+    """
+    A forward graph recorded once by `deriv.capture` and replayed in place.
+
+    The tape keeps the nodes of the captured graph alive together with their
+    backward closures. A replay copies new input data into the captured input
+    buffers, recomputes every node into its existing `data` buffer with the
+    rules from `op_table.FORWARD`, and runs the stored backward closures in the
+    precomputed order, accumulating into grad buffers that are allocated on
+    the first replay and reused afterwards. No node, closure or topological
+    sort is created per step.
+
+    Buffers are bound when the tape is built: parameters must be updated in
+    place (as the optimizers in `deriv.optim` do), not rebound.
+
+    With fusion enabled, chains of elementwise nodes run as `FusedGroup`s
+    (see `deriv.Array.fusion`): only the root of each chain gets its `data`
+    and `grad` written, the nodes inside the chain are not materialized.
+
+    With `reuse_buffers`, the `data` and `grad` of the nodes are views into
+    the arena of a `MemoryPlan`, shared between values whose lifetimes do
+    not overlap. Only the output's `data` and `grad` stay valid after a
+    replay, and every `backward` must follow its own `forward`.
+
+    Attributes:
+        inputs (list): Input leaves the replay data is copied into.
+        output (array): Output node; its `data` is overwritten on each replay.
+        nodes (list): Non-leaf nodes in topological order.
+        groups (list): Fused elementwise chains.
+        memory_plan (MemoryPlan): The buffer plan, if `reuse_buffers` is set.
+    """
+
+    def __init__(self, inputs, output, nodes, groups=(), reuse_buffers=False):
+        self.xp = get_backend()
+        self.inputs = inputs
+        self.output = output
+        self.nodes = nodes
+        self.groups = list(groups)
+
+        fused = {id(node) for group in self.groups for node in group.nodes[:-1]}
+        roots = {id(group.root): group for group in self.groups}
+        units = []
+        for node in nodes:
+            group = roots.get(id(node))
+            if group is not None:
+                units.append((node, group.inputs, group.inputs, True))
+            elif id(node) not in fused:
+                units.append((node, node.parents, *saved_by(node, node.parents)))
+
+        self.memory_plan = None
+        zero_at = {}
+        if reuse_buffers:
+            self.memory_plan = MemoryPlan(units, output)
+            self.memory_plan.bind(self.xp)
+            for group in self.groups:
+                group.bind_inputs()
+            last = self.memory_plan.steps - 1
+            for iv in self.memory_plan.intervals:
+                if iv.kind == 'grad' and iv.node is not output:
+                    zero_at.setdefault(last - iv.start, []).append(iv.node)
+
+        self._steps = []
+        self._grad_nodes = []
+        self._backward_steps = []
+        self._zero_before = []
+        for i, (node, *_) in enumerate(units):
+            group = roots.get(id(node))
+            if group is not None:
+                self._steps.append((group.forward, node.data, (), {}))
+            else:
+                self._steps.append((FORWARD[node.op], node.data, tuple(p.data for p in node.parents), node.attrs or {}))
+            if node.need_grad:
+                self._grad_nodes.append(node)
+                self._backward_steps.append(group.backward if group is not None else node._back)
+                self._zero_before.append([n.grad for n in zero_at.get(i, ())])
+        self._grad_nodes.reverse()
+        self._backward_steps.reverse()
+        self._zero_before.reverse()
+
+    def forward(self, *inputs):
+        """
+        Recompute the captured graph for new input data.
+
+        Args:
+            *inputs: One `array` or array_like per captured input, with the
+                same shapes as the example inputs.
+
+        Returns:
+            array: The captured output node holding the new result.
+        """
+        xp = self.xp
+        if len(inputs) != len(self.inputs):
+            raise ValueError(f"Expected {len(self.inputs)} inputs, got {len(inputs)}")
+        for leaf, value in zip(self.inputs, inputs):
+            value = value.data if isinstance(value, array) else value
+            if xp.shape(value) != leaf.data.shape:
+                raise ValueError(f"Input shape {xp.shape(value)} does not match captured shape {leaf.data.shape}")
+            xp.copyto(leaf.data, value)
+        for rule, out, args, attrs in self._steps:
+            rule(xp, out, *args, **attrs)
+        return self.output
+
+    def backward(self):
+        """
+        Run the captured backward pass for the last `forward`.
+
+        Gradients are accumulated into the leaves' `.grad` exactly like
+        `array.backward()`; zero them between steps (e.g. `opt.zero_grad()`).
+        """
+        if not self.output.need_grad:
+            raise RuntimeError("The captured output does not need grad")
+        if self.memory_plan is None:
+            for node in self._grad_nodes:
+                if node.grad is None:
+                    node.grad = self.xp.zeros_like(node.data)
+                else:
+                    node.grad.fill(0)
+        self.output.grad.fill(1)
+        for step, zero in zip(self._backward_steps, self._zero_before):
+            # Planned grads share buffers, so each is cleared right before its first write.
+            for grad in zero:
+                grad.fill(0)
+            step()
+
+    def replay(self, *inputs, backward=True):
+        """
+        Run `forward` and, unless `backward=False`, `backward` for new inputs.
+
+        Returns:
+            array: The captured output node.
+        """
+        out = self.forward(*inputs)
+        if backward:
+            self.backward()
+        return out
+
+    __call__ = replay
+
+
+def capture(fn, example_inputs, fuse=False, chunk_size=DEFAULT_CHUNK_SIZE, reuse_buffers=False):
+    """
+    deriv.capture(fn, example_inputs, fuse=False, chunk_size=16384, reuse_buffers=False)
+
+    Record the graph built by `fn` once, for fast replay on new data.
+
+    `fn` is called on fresh copies of `example_inputs`. Every op is recorded,
+    including ops on data that does not need a gradient, so the whole forward
+    pass can be recomputed from the inputs. Parameters (leaves with
+    `need_grad=True`) are used by reference, so optimizer updates to them are
+    seen by later replays. Values computed outside deriv ops inside `fn` are
+    frozen at capture time, and input shapes must stay the same.
+
+    Args:
+        fn: Function taking one `array` per example input and returning an `array`.
+        example_inputs: Sequence of `array` or array_like values.
+        fuse (bool): Fuse chains of elementwise ops (`+ - * / **`, `neg`,
+            `sin`, `cos`, `exp`, `log`, `relu`, `tanh`) into single blocked
+            passes for forward and backward.
+        chunk_size (int): Elements per block of a fused chain.
+        reuse_buffers (bool): Run with a liveness-based `MemoryPlan`: node
+            activations and grads share arena buffers wherever their
+            lifetimes do not overlap. The plan is in `tape.memory_plan`.
+
+    Returns:
+        Tape: The recorded tape. Call it (or `replay`) with new inputs.
+
+    Example:
+        >>> step = deriv.capture(lambda x, y: ((model(x) - y) ** 2).sum(), [x0, y0])
+        >>> for x, y in batches:
+        ...     loss = step(x, y)
+        ...     opt.step()
+        ...     opt.zero_grad()
+    """
+    xp = get_backend()
+    inputs = []
+    for value in example_inputs:
+        if isinstance(value, array):
+            inputs.append(array(xp.array(value.data, copy=True), need_grad=value.need_grad))
+        else:
+            inputs.append(array(xp.array(value, copy=True)))
+
+    with enable_grad(), record_constants():
+        output = fn(*inputs)
+    if not isinstance(output, array):
+        raise TypeError(f"Captured function must return an array, got {type(output)}")
+
+    nodes = [node for node in output.topo() if node.parents]
+    for node in nodes:
+        if node.op not in FORWARD:
+            raise NotImplementedError(f"Op '{node.op}' cannot be replayed by a captured tape")
+        if not node.data.flags.owndata:
+            node.data = node.data.copy()
+    groups = find_groups(nodes, output, chunk_size) if fuse else ()
+    return Tape(inputs, output, nodes, groups, reuse_buffers)
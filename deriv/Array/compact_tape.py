@@ -0,0 +1,299 @@
+import array as typed
+import json
+import numbers
+import weakref
+
+from deriv.Array.array_object import array, unbroadcast
+from deriv.Array.backend import get_backend, is_gpu
+from deriv.Array.grad_mode import active_tape, _set_active_tape
+from deriv.Array.op_table import BACKWARD, SAVES
+
+
+def _encode_attr(value, op, tensors):
+    """
+    JSON form of an op attribute. Tuples (axes, shapes, index tuples) become
+    lists, slices and Ellipsis tagged objects, and arrays (advanced indices)
+    are stored in `tensors` and referenced by key.
+    """
+    if isinstance(value, (tuple, list)):
+        return [_encode_attr(v, op, tensors) for v in value]
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, numbers.Real):
+        return float(value)
+    if isinstance(value, slice):
+        return {"slice": [_encode_attr(v, op, tensors) for v in (value.start, value.stop, value.step)]}
+    if value is Ellipsis:
+        return {"ellipsis": True}
+    if hasattr(value, "shape") and hasattr(value, "dtype"):
+        key = f"attr_{len(tensors)}"
+        tensors[key] = value.get() if is_gpu() else value
+        return {"array": key}
+    raise TypeError(f"Cannot save attribute {value!r} of op '{op}'")
+
+
+def _decode_attr(value, f, xp):
+    """Inverse of `_encode_attr`, reading arrays from the loaded `.npz` file `f`."""
+    if isinstance(value, list):
+        return tuple(_decode_attr(v, f, xp) for v in value)
+    if isinstance(value, dict):
+        if "slice" in value:
+            return slice(*value["slice"])
+        if "array" in value:
+            return xp.asarray(f[value["array"]])
+        return Ellipsis
+    return value
+
+
+class CompactTape:
+    """
+    Structure-of-arrays recording of a computation graph.
+
+    While the tape is active, ops that need a gradient are written to the tape
+    instead of building graph nodes: the returned arrays keep no parents and
+    no backward closure. The tape itself only holds on to the data that some
+    backward rule reads (see `op_table.SAVES`): a value's data is kept once
+    its own op's rule reads the output or a consumer's rule reads it as an
+    input. Other intermediates are freed as soon as the caller drops them;
+    their slot holds a zero-byte stand-in of the right shape and dtype. Each
+    recorded value (leaf or op output) gets a slot:
+
+        ops[slot]             op code (index into `op_names`), -1 for leaves
+        parent_offsets[slot]  start of the slot's parents in `parent_index`
+        parent_index          parent slots, CSR style
+        attrs_index[slot]     index into `attrs`, -1 if the op has none
+        need_grad[slot]       1 if the value needs a gradient
+        kept[slot]            1 if the value's data is kept
+        slots[slot]           saved tensor (the value's data), or its stand-in
+
+    The graph bookkeeping costs a few bytes per node on top of the saved
+    tensors. `backward` dispatches on the op string through
+    `op_table.BACKWARD`, and `save` / `load` / `summary` serialize and inspect
+    the graph without walking Python objects.
+
+    Example:
+        >>> with deriv.compact_tape() as tape:
+        ...     loss = ((model(x) - y) ** 2).sum()
+        >>> tape.backward(loss)
+    """
+
+    def __init__(self):
+        self.xp = get_backend()
+        self.op_names = []
+        self.ops = typed.array('h')
+        self.parent_offsets = typed.array('i', [0])
+        self.parent_index = typed.array('i')
+        self.attrs_index = typed.array('i')
+        self.attrs = []
+        self.need_grad = typed.array('b')
+        self.kept = typed.array('b')
+        self.slots = []
+        self.leaves = {}
+        self._op_codes = {}
+        self._slot_of = {}
+        self._prev = None
+
+    def __enter__(self):
+        self._prev = active_tape()
+        _set_active_tape(self)
+        return self
+
+    def __exit__(self, *exc):
+        _set_active_tape(self._prev)
+        return False
+
+    def __len__(self):
+        return len(self.slots)
+
+    def _stand_in(self, data):
+        """A zero-byte array with the shape and dtype of `data`."""
+        return self.xp.broadcast_to(self.xp.zeros((), dtype=data.dtype), data.shape)
+
+    def _keep(self, slot, data):
+        if not self.kept[slot]:
+            self.slots[slot] = data
+            self.kept[slot] = 1
+
+    def _append(self, data, op, parent_slots, attrs, need_grad, keep):
+        if op is None:
+            code = -1
+        else:
+            code = self._op_codes.get(op)
+            if code is None:
+                code = self._op_codes[op] = len(self.op_names)
+                self.op_names.append(op)
+        self.ops.append(code)
+        self.parent_index.extend(parent_slots)
+        self.parent_offsets.append(len(self.parent_index))
+        if attrs:
+            self.attrs_index.append(len(self.attrs))
+            self.attrs.append(attrs)
+        else:
+            self.attrs_index.append(-1)
+        self.need_grad.append(1 if need_grad else 0)
+        self.kept.append(1 if keep else 0)
+        self.slots.append(data if keep else self._stand_in(data))
+        return len(self.slots) - 1
+
+    def slot(self, node):
+        """
+        Returns the slot of `node`, registering it as a leaf if it has not
+        been seen yet.
+        """
+        entry = self._slot_of.get(id(node))
+        if entry is not None and entry[1]() is node:
+            slot = entry[0]
+            if not self.kept[slot] or self.slots[slot] is node.data:
+                return slot
+        slot = self._append(node.data, None, (), None, node.need_grad, False)
+        self._slot_of[id(node)] = (slot, weakref.ref(node))
+        if node.need_grad:
+            self.leaves[slot] = node
+        return slot
+
+    def record(self, data, parents, op, attrs=None):
+        """
+        Writes an op to the tape and returns its output as a parentless array.
+        Called by `_make_node` while the tape is active.
+        """
+        parent_slots = [self.slot(parent) for parent in parents]
+        saved, reads_out = SAVES.get(op, (range(len(parents)), True))
+        for i in saved:
+            self._keep(parent_slots[i], parents[i].data)
+        out = array(data, op=op, need_grad=True)
+        self._slot_of[id(out)] = (self._append(out.data, op, parent_slots, attrs, True, reads_out),
+                                  weakref.ref(out))
+        return out
+
+    def backward(self, root=None):
+        """
+        Runs reverse-mode autodiff over the tape.
+
+        Args:
+            root (array or int, optional): Output to differentiate, as a
+                recorded array or a slot. Defaults to the last recorded slot.
+
+        Returns:
+            dict: Gradient per leaf slot. Leaves that are bound to an `array`
+            also receive their gradient in `.grad`, like `array.backward()`.
+        """
+        xp = self.xp
+        end = len(self.slots) - 1 if root is None else root if isinstance(root, int) else self.slot(root)
+        if not self.need_grad[end]:
+            raise RuntimeError("backward() called on a value that does not need grad")
+        grads = [None] * (end + 1)
+        grads[end] = xp.ones_like(self.slots[end])
+
+        for s in range(end, -1, -1):
+            g = grads[s]
+            code = self.ops[s]
+            if g is None or code < 0:
+                continue
+            grads[s] = None
+            parents = self.parent_index[self.parent_offsets[s]:self.parent_offsets[s + 1]]
+            inputs = [self.slots[p] for p in parents]
+            needs = [self.need_grad[p] for p in parents]
+            k = self.attrs_index[s]
+            kwargs = self.attrs[k] if k >= 0 else {}
+            parent_grads = BACKWARD[self.op_names[code]](xp, g, self.slots[s], inputs, needs, **kwargs)
+            for p, gp in zip(parents, parent_grads):
+                if gp is None or not self.need_grad[p]:
+                    continue
+                gp = unbroadcast(gp, self.slots[p].shape)
+                # Never written to in place, so views and aliases are safe here.
+                grads[p] = gp if grads[p] is None else grads[p] + gp
+
+        leaf_grads = {}
+        for s in range(end + 1):
+            if self.ops[s] < 0 and grads[s] is not None:
+                leaf_grads[s] = grads[s]
+                if s in self.leaves:
+                    self.leaves[s]._accumulate(grads[s], owned=False)
+        return leaf_grads
+
+    def structure_nbytes(self):
+        """Bytes used by the integer arrays that describe the graph."""
+        return sum(a.itemsize * len(a) for a in (
+            self.ops, self.parent_offsets, self.parent_index, self.attrs_index, self.need_grad, self.kept))
+
+    def saved_nbytes(self):
+        """Bytes of the tensors the tape keeps alive."""
+        return sum(data.nbytes for data, kept in zip(self.slots, self.kept) if kept)
+
+    def summary(self):
+        """
+        Returns a readable listing of the tape, one line per slot, e.g.
+        `%4 = @(%2, %3) shape=(8, 4)`.
+        """
+        lines = []
+        for s, data in enumerate(self.slots):
+            code = self.ops[s]
+            if code < 0:
+                desc = "leaf"
+            else:
+                parents = self.parent_index[self.parent_offsets[s]:self.parent_offsets[s + 1]]
+                desc = f"{self.op_names[code]}({', '.join(f'%{p}' for p in parents)})"
+                k = self.attrs_index[s]
+                if k >= 0:
+                    desc += f" {self.attrs[k]}"
+            grad = " need_grad" if self.need_grad[s] else ""
+            lines.append(f"%{s} = {desc} shape={tuple(data.shape)}{grad}")
+        return "\n".join(lines)
+
+    def save(self, path):
+        """Saves the graph structure and the saved tensors to an `.npz` file."""
+        import numpy as np
+        tensors = {f"slot_{i}": (data.get() if is_gpu() else data) if self.kept[i] else np.zeros((), data.dtype)
+                   for i, data in enumerate(self.slots)}
+        shapes = [list(data.shape) for data in self.slots]
+        op_of = {k: self.op_names[self.ops[s]] for s, k in enumerate(self.attrs_index) if k >= 0}
+        attr_tensors = {}
+        attrs = [{name: _encode_attr(v, op_of[k], attr_tensors) for name, v in a.items()}
+                 for k, a in enumerate(self.attrs)]
+        np.savez(
+            path,
+            ops=np.asarray(self.ops),
+            parent_offsets=np.asarray(self.parent_offsets),
+            parent_index=np.asarray(self.parent_index),
+            attrs_index=np.asarray(self.attrs_index),
+            need_grad=np.asarray(self.need_grad),
+            kept=np.asarray(self.kept),
+            meta=json.dumps({"op_names": self.op_names, "attrs": attrs, "shapes": shapes}),
+            **tensors,
+            **attr_tensors,
+        )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a tape written by `save`. Its leaves are not bound to arrays, so
+        `backward` only returns the leaf gradients.
+        """
+        import numpy as np
+        tape = cls()
+        with np.load(path) as f:
+            meta = json.loads(str(f["meta"]))
+            tape.op_names = meta["op_names"]
+            tape._op_codes = {op: i for i, op in enumerate(tape.op_names)}
+            tape.attrs = [{k: _decode_attr(v, f, tape.xp) for k, v in a.items()} for a in meta["attrs"]]
+            tape.ops = typed.array('h', f["ops"].tolist())
+            tape.parent_offsets = typed.array('i', f["parent_offsets"].tolist())
+            tape.parent_index = typed.array('i', f["parent_index"].tolist())
+            tape.attrs_index = typed.array('i', f["attrs_index"].tolist())
+            tape.need_grad = typed.array('b', f["need_grad"].tolist())
+            tape.kept = typed.array('b', f["kept"].tolist())
+            tape.slots = [tape.xp.asarray(f[f"slot_{i}"]) if kept
+                          else tape.xp.broadcast_to(tape.xp.asarray(f[f"slot_{i}"]), tuple(shape))
+                          for i, (kept, shape) in enumerate(zip(tape.kept, meta["shapes"]))]
+        return tape
+
+
+def compact_tape():
+    """
+    deriv.compact_tape()
+
+    Returns a new `CompactTape`; use it as a context manager to record into it.
+    """
+    return CompactTape()
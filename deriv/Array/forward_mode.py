@@ -0,0 +1,175 @@
+"""
+Forward-mode autodiff with dual arrays.
+
+Inside a `forward_ad` block every array may carry a `tangent` next to its
+`data`, and every op that goes through `_make_node` computes the tangent of
+its output from the tangents of its inputs with the rules in
+`op_table.JVP`. A missing tangent is zero. Outside such a block ops do not
+look at tangents at all.
+
+One forward pass gives the derivative of every output along one input
+direction, so Jacobian-vector products of functions with few inputs and
+many outputs cost about as much as a single evaluation. Batched tangents
+carry a leading axis of directions and push all of them through in the
+same vectorized pass.
+"""
+import threading
+
+from deriv.Array.backend import get_backend
+from deriv.Array.op_table import JVP
+
+# Number of active `forward_ad` blocks over all threads; lets `_make_node`
+# skip the thread-local lookup when forward mode is not used at all.
+depth = 0
+_local = threading.local()
+
+
+def tangent_of(x):
+    """The tangent of `x`, or None when it is zero (or `x` is not an array)."""
+    return getattr(x, 'tangent', None)
+
+
+def attach(out, parents, op, attrs):
+    """Sets `out.tangent` from the tangents of `parents` (called by `_make_node`)."""
+    batched = getattr(_local, 'batched', None)
+    if batched is None:
+        return out
+    tangents = [tangent_of(p) for p in parents]
+    if all(t is None for t in tangents):
+        return out
+    rule = JVP.get(op)
+    if rule is None:
+        raise NotImplementedError(f"Op '{op}' has no forward-mode (JVP) rule")
+    xp = get_backend()
+    t = rule(xp, out.data, [p.data for p in parents], tangents, batched, **(attrs or {}))
+    shape = (_local.directions,) + out.data.shape if batched else out.data.shape
+    if xp.shape(t) != shape:
+        t = xp.broadcast_to(t, shape)
+    out.tangent = t
+    return out
+
+
+class forward_ad:
+    """
+    deriv.forward_ad(batched=False)
+
+    Enables tangent propagation on the current thread.
+
+    Set `x.tangent` on the inputs (same shape as `x.data`, or with a leading
+    axis of `directions` when `batched`); every array computed inside the
+    block then has its `tangent`. Most code should use `deriv.jvp`.
+
+    Args:
+        batched (bool): Tangents carry a leading axis of directions.
+        directions (int): Number of directions when `batched`.
+    """
+
+    def __init__(self, batched=False, directions=None):
+        if batched and directions is None:
+            raise ValueError("batched tangents need the number of directions")
+        self.batched = batched
+        self.directions = directions
+        self._prev = []
+
+    def __enter__(self):
+        global depth
+        self._prev.append((getattr(_local, 'batched', None), getattr(_local, 'directions', None)))
+        _local.batched = self.batched
+        _local.directions = self.directions
+        depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        global depth
+        depth -= 1
+        _local.batched, _local.directions = self._prev.pop()
+        return False
+
+
+def _as_tuple(value):
+    return (tuple(value), True) if isinstance(value, (tuple, list)) else ((value,), False)
+
+
+def jvp(fn, primals, tangents, batched=False):
+    """
+    deriv.jvp(fn, primals, tangents, batched=False)
+
+    Jacobian-vector product of `fn` at `primals` along `tangents`, in a
+    single forward pass.
+
+    Args:
+        fn: Function of one or more arrays returning an array or a tuple
+            of arrays.
+        primals: An array_like or a sequence of them (one per argument).
+        tangents: The directions, shaped like the primals. With `batched`,
+            each tangent has an extra leading axis of `k` directions and
+            all `k` products are computed in one vectorized pass.
+        batched (bool): Tangents carry a leading axis of directions.
+
+    Returns:
+        tuple: `(outputs, output_tangents)`, each an array or a tuple
+        matching what `fn` returns. Output tangents are raw backend arrays
+        (with the leading direction axis when `batched`); outputs that do
+        not depend on the primals get zero tangents.
+
+    Example:
+        >>> y, dy = deriv.jvp(lambda x: deriv.sin(x) * x, [x0], [v])
+        >>> y, J = deriv.jvp(f, [x0], [basis], batched=True)   # J[i] = df(x0) . basis[i]
+    """
+    from deriv.Array.array_object import array
+
+    xp = get_backend()
+    primals, _ = _as_tuple(primals)
+    tangents, _ = _as_tuple(tangents)
+    if len(primals) != len(tangents):
+        raise ValueError(f"Got {len(primals)} primals but {len(tangents)} tangents")
+    directions = None
+    leaves = []
+    for primal, tangent in zip(primals, tangents):
+        leaf = array(primal.data if isinstance(primal, array) else primal)
+        t = xp.asarray(tangent.data if isinstance(tangent, array) else tangent, dtype=leaf.data.dtype)
+        expected = leaf.data.shape
+        if batched:
+            directions = t.shape[0] if directions is None else directions
+            expected = (directions,) + expected
+        if t.shape != expected:
+            raise ValueError(f"Tangent shape {t.shape} does not match {expected}")
+        leaf.tangent = t
+        leaves.append(leaf)
+
+    with forward_ad(batched, directions):
+        outputs = fn(*leaves)
+    outputs, multiple = _as_tuple(outputs)
+    out_tangents = []
+    for out in outputs:
+        t = tangent_of(out)
+        if t is None:
+            shape = (directions,) + out.data.shape if batched else out.data.shape
+            t = xp.zeros(shape, dtype=out.data.dtype)
+        out_tangents.append(t)
+    if multiple:
+        return outputs, tuple(out_tangents)
+    return outputs[0], out_tangents[0]
+
+
+def jacfwd(fn, x):
+    """
+    deriv.jacfwd(fn, x)
+
+    Jacobian of `fn` at `x` by forward mode: one batched pass with a
+    direction per element of `x`.
+
+    Args:
+        fn: Function of a single array returning an array.
+        x: The point, array or array_like.
+
+    Returns:
+        Backend array of shape `fn(x).shape + x.shape`.
+    """
+    from deriv.Array.array_object import array
+
+    xp = get_backend()
+    data = x.data if isinstance(x, array) else xp.asarray(x)
+    basis = xp.eye(data.size, dtype=data.dtype if data.dtype.kind == 'f' else float).reshape((data.size,) + data.shape)
+    out, tangent = jvp(fn, [data.astype(basis.dtype)], [basis], batched=True)
+    return xp.moveaxis(tangent, 0, -1).reshape(out.data.shape + data.shape)
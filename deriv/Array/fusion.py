@@ -0,0 +1,172 @@
+"""
+Elementwise op fusion for captured tapes.
+
+Chains of elementwise nodes whose intermediates have a single consumer are
+grouped and evaluated block by block over the flattened data: each block of
+`chunk_size` elements runs through the whole chain in small scratch
+buffers, so a chain of k ops needs k block-sized temporaries instead of k
+full-size ones. The backward pass of a group recomputes the block's
+intermediates and backpropagates through the chain within the block, using
+the rules from `op_table`.
+"""
+from deriv.Array.op_table import FORWARD, BACKWARD
+
+ELEMENTWISE = frozenset(['+', '-', '*', '/', '**', 'neg', 'sin', 'cos', 'exp', 'log', 'relu', 'tanh'])
+
+DEFAULT_CHUNK_SIZE = 16384
+
+
+def _fusible(node):
+    """A node can be fused if it is elementwise over one contiguous shape."""
+    if node.op not in ELEMENTWISE or not node.data.flags.c_contiguous or node.data.size == 0:
+        return False
+    shape = node.data.shape
+    for parent in node.parents:
+        data = parent.data
+        if data.size != 1 and (data.shape != shape or not data.flags.c_contiguous):
+            return False
+    return True
+
+
+def find_groups(nodes, output, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Partitions the captured `nodes` (topological order) into fusion groups.
+
+    A fusible node joins the groups of those fusible parents that have the
+    same shape, are consumed only by this node and are not the output, so
+    every group has a single root whose value is needed outside of it.
+
+    Returns:
+        list: `FusedGroup` objects for the groups with at least two nodes.
+    """
+    consumers = {}
+    for node in nodes:
+        for parent in set(map(id, node.parents)):
+            consumers[parent] = consumers.get(parent, 0) + 1
+
+    group_of = {}
+    for node in nodes:
+        if not _fusible(node):
+            continue
+        members = [node]
+        for parent in node.parents:
+            pid = id(parent)
+            if (pid in group_of and consumers.get(pid) == 1 and parent is not output
+                    and parent.data.shape == node.data.shape):
+                for member in group_of.pop(pid):
+                    if member not in members:
+                        members.append(member)
+        group_of[id(node)] = members
+
+    order = {id(node): i for i, node in enumerate(nodes)}
+    groups = []
+    for members in group_of.values():
+        if len(members) > 1:
+            members.sort(key=lambda n: order[id(n)])
+            groups.append(FusedGroup(members, chunk_size))
+    return groups
+
+
+class FusedGroup:
+    """
+    A fused chain of elementwise nodes with a single root (`nodes[-1]`).
+
+    Values are addressed by integers: `i >= 0` is the i-th node of the group,
+    `i < 0` is external input `-i - 1`.
+    """
+
+    def __init__(self, nodes, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.nodes = nodes
+        self.root = nodes[-1]
+        self.chunk_size = chunk_size
+        self.inputs = []
+        index = {id(node): i for i, node in enumerate(nodes)}
+        external = {}
+        self.program = []
+        for node in nodes:
+            args = []
+            for parent in node.parents:
+                if id(parent) in index:
+                    args.append(index[id(parent)])
+                else:
+                    if id(parent) not in external:
+                        external[id(parent)] = len(self.inputs)
+                        self.inputs.append(parent)
+                    args.append(-external[id(parent)] - 1)
+            self.program.append((node.op, node.attrs or {}, args))
+
+        size = self.root.data.size
+        block = min(chunk_size, size)
+        self._size = size
+        xp = self.root.xp
+        self._scratch = [None if node is self.root else xp.empty(block, dtype=node.data.dtype) for node in nodes]
+        self._full = [x.data.size != 1 for x in self.inputs]
+        self.bind_inputs()
+
+    def bind_inputs(self):
+        """Takes flat views of the inputs' current `data` buffers."""
+        self._flat_inputs = [x.data.reshape(-1) if x.data.size != 1 else x.data.reshape(()) for x in self.inputs]
+
+    def _blocks(self):
+        for lo in range(0, self._size, self.chunk_size):
+            yield lo, min(lo + self.chunk_size, self._size)
+
+    def _input(self, j, lo, hi):
+        return self._flat_inputs[j][lo:hi] if self._full[j] else self._flat_inputs[j]
+
+    def _run(self, xp, lo, hi, root_out):
+        """Evaluates the chain on one block; returns the per-node block values."""
+        values = []
+        last = len(self.program) - 1
+        for i, (op, attrs, args) in enumerate(self.program):
+            out = root_out if i == last else self._scratch[i][:hi - lo]
+            if out is not None:
+                FORWARD[op](xp, out, *(values[a] if a >= 0 else self._input(-a - 1, lo, hi) for a in args), **attrs)
+            values.append(out)
+        return values
+
+    def forward(self, xp, out):
+        """Computes the group into the root's `data` buffer (`out`)."""
+        flat = out.reshape(-1)
+        for lo, hi in self._blocks():
+            self._run(xp, lo, hi, flat[lo:hi])
+
+    def backward(self):
+        """Backpropagates the root's grad to the group's external inputs."""
+        xp = self.root.xp
+        grad_flat = []
+        for x in self.inputs:
+            if not x.need_grad:
+                grad_flat.append(None)
+                continue
+            if x.grad is None:
+                x.grad = xp.zeros_like(x.data)
+            elif not x.grad.flags.c_contiguous:
+                x.grad = xp.ascontiguousarray(x.grad)
+            grad_flat.append(x.grad.reshape(-1) if x.grad.size != 1 else x.grad)
+
+        root_data = self.root.data.reshape(-1)
+        root_grad = self.root.grad.reshape(-1)
+        last = len(self.program) - 1
+        for lo, hi in self._blocks():
+            values = self._run(xp, lo, hi, None)
+            values[last] = root_data[lo:hi]
+            grads = [None] * len(self.program)
+            grads[last] = root_grad[lo:hi]
+            for i in range(last, -1, -1):
+                g = grads[i]
+                if g is None:
+                    continue
+                op, attrs, args = self.program[i]
+                inputs = [values[a] if a >= 0 else self._input(-a - 1, lo, hi) for a in args]
+                needs = [self.nodes[a].need_grad if a >= 0 else self.inputs[-a - 1].need_grad for a in args]
+                for a, gp in zip(args, BACKWARD[op](xp, g, values[i], inputs, needs, **attrs)):
+                    if gp is None:
+                        continue
+                    if a >= 0:
+                        grads[a] = gp if grads[a] is None else grads[a] + gp
+                    elif self._full[-a - 1]:
+                        grad_flat[-a - 1][lo:hi] += gp
+                    else:
+                        grad_flat[-a - 1] += gp.sum()
+
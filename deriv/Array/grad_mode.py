@@ -0,0 +1,131 @@
+import threading
+import functools
+
+_global_enabled = True
+_local = threading.local()
+
+
+def is_grad_enabled():
+    """
+    Returns True if operations are currently recorded in the computation graph.
+
+    A `no_grad` / `inference_mode` block on the current thread takes priority
+    over the process-wide default set with `set_grad_enabled`.
+    """
+    return getattr(_local, 'enabled', _global_enabled)
+
+
+def set_grad_enabled(mode: bool):
+    """
+    deriv.set_grad_enabled(mode)
+
+    Sets the process-wide default for graph recording. Threads that are inside
+    a `no_grad` / `enable_grad` block keep their local setting.
+    """
+    global _global_enabled
+    _global_enabled = bool(mode)
+
+
+class _GradMode:
+    """
+    Context manager / decorator that pins graph recording on the current thread.
+
+    The state to restore is pushed per entry, so one instance can be entered
+    again inside its own block.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self._prev = []
+
+    def __enter__(self):
+        self._prev.append(getattr(_local, 'enabled', None))
+        _local.enabled = self.enabled
+        return self
+
+    def __exit__(self, *exc):
+        prev = self._prev.pop()
+        if prev is None:
+            del _local.enabled
+        else:
+            _local.enabled = prev
+        return False
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with self.__class__():
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+class no_grad(_GradMode):
+    """
+    deriv.no_grad()
+
+    Disables graph construction. Inside the block every op returns a plain leaf
+    `array`: no parents, no backward closure and no gradient buffer.
+
+    Works as a context manager or as a decorator:
+
+    >>> with deriv.no_grad():
+    ...     pred = model(x)
+    >>> @deriv.no_grad()
+    ... def predict(x):
+    ...     return model(x)
+    """
+    enabled = False
+
+
+class enable_grad(_GradMode):
+    """
+    deriv.enable_grad()
+
+    Re-enables graph construction inside a `no_grad` block.
+    """
+    enabled = True
+
+
+class inference_mode(no_grad):
+    """
+    deriv.inference_mode()
+
+    Alias of `no_grad` meant for serving code paths.
+    """
+
+
+def is_recording_constants():
+    """Returns True inside a `record_constants` block on the current thread."""
+    return getattr(_local, 'record_constants', False)
+
+
+class record_constants:
+    """
+    Keeps parents and op attributes on op outputs that do not need a gradient.
+
+    Normally such outputs are plain leaves. `deriv.capture` records the
+    forward pass under this context so that subgraphs computed from the
+    inputs alone (normalization, masks, ...) can be recomputed on replay.
+    """
+
+    def __init__(self):
+        self._prev = []
+
+    def __enter__(self):
+        self._prev.append(is_recording_constants())
+        _local.record_constants = True
+        return self
+
+    def __exit__(self, *exc):
+        _local.record_constants = self._prev.pop()
+        return False
+
+
+def active_tape():
+    """Returns the `CompactTape` recording on the current thread, if any."""
+    return getattr(_local, 'tape', None)
+
+
+def _set_active_tape(tape):
+    _local.tape = tape
@@ -0,0 +1,273 @@
+"""
+Differentiable reverse mode.
+
+`array.backward()` runs the backward closures, which work on raw backend
+data: fast, but the gradients it leaves in `.grad` are not graph nodes and
+cannot be differentiated again. `grad` runs the same reverse pass with the
+rules in `VJP` instead, which compute every gradient with `array` ops. With
+`create_graph=True` those ops are recorded, so the returned gradients are
+graph nodes themselves and can be differentiated again (gradient
+penalties, second derivatives). Inside `deriv.forward_ad` they carry
+tangents, which is how `hvp` gets Hessian-vector products: forward mode
+over reverse mode, at the cost of about two gradient evaluations.
+
+VJP rules take the output node, its gradient, the parent nodes and a
+`needs` flag per parent, and return one gradient per parent (None where it
+is not needed), already reduced to the parent's shape:
+
+    VJP[op](out, g, inputs, needs, **attrs)
+
+Fused losses add their rule through `loss_funcs._reduction.register`.
+"""
+import math
+
+from deriv.Array.array_object import array
+from deriv.Array.AMath import sin, cos, log
+from deriv.Array._condition import where
+from deriv.Array.backend import get_backend
+from deriv.Array.forward_mode import forward_ad, tangent_of
+from deriv.Array.grad_mode import enable_grad, no_grad
+from deriv.Array.indexing import index_add
+from deriv.Array.reversed_mode_autodiff import _topo_order
+
+
+def sum_to(g, shape):
+    """Sums a gradient `g` in broadcast shape down to `shape`, as array ops."""
+    if g.data.shape == shape:
+        return g
+    extra = g.data.ndim - len(shape)
+    if extra:
+        g = g.sum(axis=tuple(range(extra)))
+    axes = tuple(i for i, dim in enumerate(shape) if dim == 1 and g.data.shape[i] != 1)
+    if axes:
+        g = g.sum(axis=axes, keepdims=True)
+    return g
+
+
+def _expand(g, shape, axis=None, keepdims=False):
+    """Broadcasts the gradient of a reduction over `axis` back to `shape`."""
+    if axis is not None and not keepdims:
+        axes = {a % len(shape) for a in ((axis,) if isinstance(axis, int) else axis)}
+        g = g.reshape(tuple(1 if i in axes else dim for i, dim in enumerate(shape)))
+    return g.broadcast_to(shape)
+
+
+def _v_add(out, g, inputs, needs):
+    a, b = inputs
+    return [sum_to(g, a.data.shape) if needs[0] else None,
+            sum_to(g, b.data.shape) if needs[1] else None]
+
+
+def _v_sub(out, g, inputs, needs):
+    a, b = inputs
+    return [sum_to(g, a.data.shape) if needs[0] else None,
+            sum_to(-g, b.data.shape) if needs[1] else None]
+
+
+def _v_mul(out, g, inputs, needs):
+    a, b = inputs
+    return [sum_to(g * b, a.data.shape) if needs[0] else None,
+            sum_to(g * a, b.data.shape) if needs[1] else None]
+
+
+def _v_div(out, g, inputs, needs):
+    a, b = inputs
+    return [sum_to(g / b, a.data.shape) if needs[0] else None,
+            sum_to(-(g * out) / b, b.data.shape) if needs[1] else None]
+
+
+def _v_pow(out, g, inputs, needs):
+    a, b = inputs
+    return [sum_to(g * b * a ** (b - 1), a.data.shape) if needs[0] else None,
+            sum_to(g * out * log(a), b.data.shape) if needs[1] else None]
+
+
+def _v_matmul(out, g, inputs, needs):
+    a, b = inputs
+    if a.data.ndim > 2 or b.data.ndim > 2:
+        raise NotImplementedError("Differentiable matmul supports up to 2-D operands")
+    # Vectors take part as a row (left) or a column (right) matrix.
+    a2 = a.reshape((1, -1)) if a.data.ndim == 1 else a
+    b2 = b.reshape((-1, 1)) if b.data.ndim == 1 else b
+    g2 = g.reshape((a2.data.shape[0], b2.data.shape[1]))
+    return [(g2 @ b2.T).reshape(a.data.shape) if needs[0] else None,
+            (a2.T @ g2).reshape(b.data.shape) if needs[1] else None]
+
+
+def _v_sum(out, g, inputs, needs, axis=None, keepdims=False):
+    return [_expand(g, inputs[0].data.shape, axis, keepdims)]
+
+
+def _v_mean(out, g, inputs, needs, axis=None):
+    a = inputs[0]
+    return [_expand(g / (a.data.size // out.data.size), a.data.shape, axis)]
+
+
+def _v_max(out, g, inputs, needs, axis=None, keepdims=False):
+    a = inputs[0]
+    peak = out.data if axis is None or keepdims else get_backend().expand_dims(out.data, axis)
+    mask = a.data == peak
+    weights = array(mask / mask.sum(axis=axis, keepdims=True))
+    return [_expand(g, a.data.shape, axis, keepdims) * weights]
+
+
+def _v_where(out, g, inputs, needs):
+    cond, a, b = inputs
+    zero = array(get_backend().zeros((), dtype=g.data.dtype))
+    return [None,
+            sum_to(where(cond, g, zero), a.data.shape) if needs[1] else None,
+            sum_to(where(cond, zero, g), b.data.shape) if needs[2] else None]
+
+
+def _v_getitem(out, g, inputs, needs, index):
+    a = inputs[0]
+    return [index_add(array(get_backend().zeros(a.data.shape, dtype=g.data.dtype)), index, g)]
+
+
+def _v_index_add(out, g, inputs, needs, index):
+    a, values = inputs
+    return [g if needs[0] else None,
+            sum_to(g[index], values.data.shape) if needs[1] else None]
+
+
+VJP = {
+    '+': _v_add,
+    '-': _v_sub,
+    '*': _v_mul,
+    '/': _v_div,
+    '**': _v_pow,
+    'root': _v_pow,
+    '@': _v_matmul,
+    'neg': lambda out, g, inputs, needs: [-g],
+    'T': lambda out, g, inputs, needs: [g.T],
+    'sum': _v_sum,
+    'mean': _v_mean,
+    'max': _v_max,
+    'sin': lambda out, g, inputs, needs, deg=False: [g * cos(inputs[0], deg=deg) * (math.pi / 180 if deg else 1.0)],
+    'cos': lambda out, g, inputs, needs, deg=False: [-(g * sin(inputs[0], deg=deg)) * (math.pi / 180 if deg else 1.0)],
+    'exp': lambda out, g, inputs, needs: [g * out],
+    'log': lambda out, g, inputs, needs: [g / inputs[0]],
+    'log10': lambda out, g, inputs, needs: [g / inputs[0] * math.log10(math.e)],
+    'relu': lambda out, g, inputs, needs: [g * array(inputs[0].data > 0)],
+    'tanh': lambda out, g, inputs, needs: [g * (1.0 - out * out)],
+    'where': _v_where,
+    'reshape': lambda out, g, inputs, needs, shape: [g.reshape(inputs[0].data.shape)],
+    'broadcast': lambda out, g, inputs, needs, shape: [sum_to(g, inputs[0].data.shape)],
+    'getitem': _v_getitem,
+    'index_add': _v_index_add,
+}
+
+
+def grad(output, inputs, grad_output=None, create_graph=False):
+    """
+    deriv.grad(output, inputs, grad_output=None, create_graph=False)
+
+    Gradients of `output` with respect to `inputs`, returned instead of
+    accumulated into `.grad`. The graph is left intact, so `grad` can be
+    called several times on it.
+
+    Args:
+        output (array): The value to differentiate; it must need a gradient.
+        inputs: An array or a sequence of arrays of the graph.
+        grad_output: Gradient of the output (array_like), ones by default.
+        create_graph (bool): Record the gradient computation, so that the
+            returned gradients can be differentiated again.
+
+    Returns:
+        The gradient of each input as an `array` (a graph node with
+        `create_graph`), in the same structure as `inputs`. Inputs the output
+        does not depend on get zeros.
+
+    Example:
+        >>> (dx,) = deriv.grad(y, [x], create_graph=True)
+        >>> (d2x,) = deriv.grad(dx.sum(), [x])
+    """
+    xp = get_backend()
+    single = isinstance(inputs, array)
+    inputs = [inputs] if single else list(inputs)
+    if not output.need_grad:
+        raise RuntimeError("grad() called on an array that does not need grad")
+    if grad_output is None:
+        seed = array(xp.ones_like(output.data))
+    else:
+        seed = grad_output if isinstance(grad_output, array) else array(xp.asarray(grad_output))
+    wanted = {id(x) for x in inputs}
+    grads = {id(output): seed}
+    topo, _ = _topo_order(output, need_grad_only=True)
+
+    with enable_grad() if create_graph else no_grad():
+        for node in reversed(topo):
+            g = grads.get(id(node)) if id(node) in wanted else grads.pop(id(node), None)
+            if g is None or not node.parents:
+                continue
+            rule = VJP.get(node.op)
+            if rule is None:
+                raise NotImplementedError(f"Op '{node.op}' has no differentiable (VJP) rule")
+            needs = [parent.need_grad for parent in node.parents]
+            contributions = rule(node, g, node.parents, needs, **(node.attrs or {}))
+            for parent, contribution in zip(node.parents, contributions):
+                if contribution is None or not parent.need_grad:
+                    continue
+                prev = grads.get(id(parent))
+                grads[id(parent)] = contribution if prev is None else prev + contribution
+
+    result = [grads[id(x)] if id(x) in grads else array(xp.zeros_like(x.data)) for x in inputs]
+    return result[0] if single else tuple(result)
+
+
+def hvp(fn, primals, tangents, batched=False):
+    """
+    deriv.hvp(fn, primals, tangents, batched=False)
+
+    Hessian-vector product of a scalar function, by forward mode over
+    reverse mode: `fn` and its gradient are evaluated once inside a
+    `deriv.forward_ad` block, and the tangent of the gradient is `H @ v`.
+    The Hessian itself is never formed.
+
+    Args:
+        fn: Function of one or more arrays returning a scalar array.
+        primals: An array_like or a sequence of them (one per argument).
+        tangents: The vectors `v`, shaped like the primals. With `batched`,
+            each has an extra leading axis of `k` vectors.
+        batched (bool): Tangents carry a leading axis of vectors.
+
+    Returns:
+        tuple: `(output, hvps)`. `hvps` holds one raw backend array per
+        primal (a single one when `primals` is not a sequence): the
+        gradient's directional derivative along all tangents together,
+        i.e. `sum_j H[i, j] @ v[j]`.
+
+    Example:
+        >>> loss, Hv = deriv.hvp(lambda w: loss_fn(model(x, w), y), w0, v)
+    """
+    xp = get_backend()
+    single = not isinstance(primals, (tuple, list))
+    primals = [primals] if single else list(primals)
+    tangents = [tangents] if single else list(tangents)
+    if len(primals) != len(tangents):
+        raise ValueError(f"Got {len(primals)} primals but {len(tangents)} tangents")
+    directions = None
+    leaves = []
+    for primal, tangent in zip(primals, tangents):
+        leaf = array(xp.array(primal.data if isinstance(primal, array) else primal, dtype=float), need_grad=True)
+        t = xp.asarray(tangent.data if isinstance(tangent, array) else tangent, dtype=leaf.data.dtype)
+        expected = leaf.data.shape
+        if batched:
+            directions = t.shape[0] if directions is None else directions
+            expected = (directions,) + expected
+        if t.shape != expected:
+            raise ValueError(f"Tangent shape {t.shape} does not match {expected}")
+        leaf.tangent = t
+        leaves.append(leaf)
+
+    with forward_ad(batched, directions), enable_grad():
+        output = fn(*leaves)
+        grads = grad(output, leaves)
+    hvps = []
+    for leaf, g in zip(leaves, grads):
+        t = tangent_of(g)
+        if t is None:
+            shape = (directions,) + leaf.data.shape if batched else leaf.data.shape
+            t = xp.zeros(shape, dtype=leaf.data.dtype)
+        hvps.append(t)
+    return output, hvps[0] if single else tuple(hvps)
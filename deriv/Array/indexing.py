@@ -0,0 +1,155 @@
+"""
+Differentiable gather and scatter.
+
+`take` and `gather` select entries of an array by integer indices and
+`scatter_add` adds values into an array at integer indices; each is the
+other's gradient. They are built on the two indexing ops of
+`op_table`: 'getitem' (`a[index]`) and 'index_add' (`a` with `values` added
+at `index`), with the index tuple spelled out for the given axis.
+
+`take(..., sparse=True)` keeps the gradient of the table sparse: its
+backward leaves a `SparseGrad` with one row per index in `.grad` instead of
+a dense array the size of the table (see `nn.Embedding`).
+"""
+from deriv.Array.array_object import array, unbroadcast, _make_node
+from deriv.Array.backend import get_backend
+from deriv.Array.op_table import _index_add
+from deriv.Array.sparse import SparseGrad
+
+
+def _indices(indices, xp):
+    """Raw integer indices of a backend array, an `array` or array_like."""
+    data = xp.asarray(indices.data if isinstance(indices, array) else indices)
+    if data.dtype.kind not in "iu":
+        raise TypeError(f"Indices must be integers, got dtype {data.dtype}")
+    return data
+
+
+def _take_index(indices, axis, shape, xp):
+    """The index tuple for which `a[index]` is `xp.take(a, indices, axis)`."""
+    if axis is None:
+        return xp.unravel_index(indices, shape)
+    return (slice(None),) * (axis % len(shape)) + (indices,)
+
+
+def _along_axis_index(indices, axis, shape, xp):
+    """The index tuple for which `a[index]` is `xp.take_along_axis(a, indices, axis)`."""
+    ndim = len(shape)
+    if indices.ndim != ndim:
+        raise ValueError(f"Indices must have the same number of dimensions as the array ({ndim}), "
+                         f"got {indices.ndim}")
+    axis %= ndim
+    return tuple(indices if d == axis else xp.arange(shape[d]).reshape((1,) * d + (-1,) + (1,) * (ndim - d - 1))
+                 for d in range(ndim))
+
+
+def index_add(a, index, values):
+    """`a` with `values` added at the raw index tuple `index`, as one 'index_add' node."""
+    xp = get_backend()
+    if not isinstance(values, array):
+        values = array(values)
+    data = xp.array(a.data, dtype=xp.result_type(a.data, values.data))
+    _index_add(xp, data, index, values.data)
+    out = _make_node(data, (a, values), 'index_add', {'index': index})
+    if not out.parents:
+        return out
+
+    def indexAddBackward():
+        if a.need_grad:
+            a._accumulate(out.grad, owned=False)
+        if values.need_grad:
+            values._accumulate(unbroadcast(out.grad[index], values.data.shape), owned=False)
+
+    out._back = indexAddBackward
+    return out
+
+
+def take(a, indices, axis=None, sparse=False):
+    """
+    deriv.take(a, indices, axis=None, sparse=False)
+
+    Entries of `a` at integer `indices` along `axis`, like `numpy.take`
+    (over the flattened array when `axis` is None). Repeated indices select
+    an entry several times and receive the sum of its gradients.
+
+    Args:
+        a (array): The array (table) to select from.
+        indices: Integer indices (backend array, `array` or array_like).
+        axis (int, optional): The axis to index.
+        sparse (bool): Store the gradient of `a` as a `SparseGrad` of the
+            selected rows instead of a dense array; needs `axis=0`.
+
+    Returns:
+        array: Of shape `a.shape[:axis] + indices.shape + a.shape[axis + 1:]`.
+
+    Example:
+        >>> rows = deriv.take(table, ids, axis=0, sparse=True)
+    """
+    xp = get_backend()
+    indices = _indices(indices, xp)
+    if sparse and axis != 0:
+        raise ValueError("Sparse gradients are only supported for axis=0")
+    index = _take_index(indices, axis, a.data.shape, xp)
+    if not sparse:
+        return a[index]
+
+    out = _make_node(a.data[index], (a,), 'getitem', {'index': index})
+    if not out.parents:
+        return out
+
+    def takeBackward():
+        if a.need_grad:
+            values = out.grad.reshape((-1,) + a.data.shape[1:])
+            a._accumulate(SparseGrad(a.data.shape, indices.reshape(-1), values.copy()))
+
+    out._back = takeBackward
+    return out
+
+
+def gather(a, indices, axis):
+    """
+    deriv.gather(a, indices, axis)
+
+    Entries of `a` picked along `axis` by an index array of the same rank,
+    like `numpy.take_along_axis`: `out[i, j] = a[i, indices[i, j]]` for
+    `axis=1`. Other axes of `indices` broadcast against `a`.
+
+    Args:
+        a (array): The array to select from.
+        indices: Integer indices with `a.ndim` dimensions.
+        axis (int): The axis to index.
+
+    Returns:
+        array: Of the broadcast shape of `indices` (and `a` off `axis`).
+    """
+    xp = get_backend()
+    indices = _indices(indices, xp)
+    return a[_along_axis_index(indices, axis, a.data.shape, xp)]
+
+
+def scatter_add(a, indices, values, axis=0):
+    """
+    deriv.scatter_add(a, indices, values, axis=0)
+
+    A copy of `a` with `values` added at integer `indices` along `axis`; the
+    adjoint of `take`. Repeated indices add up. Differentiable with respect
+    to both `a` and `values`.
+
+    Args:
+        a (array): The array to add into.
+        indices: Integer indices (1-D for a row per value, or any shape).
+        values (array or array_like): Broadcastable to
+            `a.shape[:axis] + indices.shape + a.shape[axis + 1:]`.
+        axis (int): The axis to index.
+
+    Returns:
+        array: Of the shape of `a`.
+
+    Example:
+        >>> sums = deriv.scatter_add(deriv.array(xp.zeros((n, d))), segment_ids, rows)
+    """
+    xp = get_backend()
+    if not isinstance(a, array):
+        a = array(a)
+    indices = _indices(indices, xp)
+    return index_add(a, _take_index(indices, axis, a.data.shape, xp), values)
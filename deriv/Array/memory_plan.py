@@ -0,0 +1,196 @@
+"""
+Liveness-based memory planning for one training step (forward + backward).
+
+A step over `n` ops is laid out on a timeline of `2n` steps: op `i` runs
+its forward at step `i` and its backward at step `2n - 1 - i`. From the
+graph alone, before anything is executed, every intermediate gets
+
+    a data interval   from its forward step to its last read, which is the
+                      last forward consumer or the last backward rule that
+                      saves it (see `op_table.SAVES`)
+    a grad interval   from the first backward step that writes into it to
+                      its own backward step
+
+Intervals are then packed greedily (best fit) into a few arena buffers, so
+activations and gradients whose lifetimes do not overlap share memory.
+Leaves (inputs and parameters) and their grads are owned by the caller and
+are counted but not planned.
+"""
+import heapq
+
+from deriv.Array.op_table import SAVES
+
+
+class Interval:
+    """A buffer lifetime: `node.data` (kind 'data') or `node.grad` (kind 'grad')."""
+
+    __slots__ = ('node', 'kind', 'start', 'end', 'nbytes', 'buffer')
+
+    def __init__(self, node, kind, start, end):
+        self.node = node
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.nbytes = node.data.nbytes
+        self.buffer = None
+
+    def __repr__(self):
+        return f"Interval({self.kind} of {self.node.op!r}, [{self.start}, {self.end}], {self.nbytes}B, buffer={self.buffer})"
+
+
+def saved_by(node, inputs):
+    """Returns the inputs the backward rule of `node` reads, and whether it reads the output."""
+    rule = SAVES.get(node.op)
+    if rule is None:
+        return list(inputs), True
+    index, reads_out = rule
+    return [inputs[i] for i in index], reads_out
+
+
+class MemoryPlan:
+    """
+    Buffer assignment for the intermediates of a graph.
+
+    Args:
+        units (list): `(node, inputs, saved, reads_out)` tuples in execution
+            order. `node` is the value written by the step (an op output, or
+            the root of a fused group), `inputs` the values it reads, and
+            `saved` / `reads_out` what its backward reads (see `saved_by`).
+        output (array): The value backward starts from. Its data and grad
+            stay live for the whole step.
+
+    Attributes:
+        intervals (list): One `Interval` per planned buffer lifetime.
+        buffer_sizes (list): Size in bytes of each arena buffer.
+        arena_bytes (int): Total size of the arena buffers.
+        leaf_bytes (int): Data and grads of the leaves, which are not planned.
+        peak_bytes (int): Planned peak, `arena_bytes + leaf_bytes`.
+        live_peak_bytes (int): Lower bound: the most bytes live at one step.
+        naive_bytes (int): Memory without reuse (every buffer kept alive).
+    """
+
+    def __init__(self, units, output):
+        n = len(units)
+        self.steps = 2 * n
+        step_of = {id(unit[0]): i for i, unit in enumerate(units)}
+        data_end = {}
+        grad_start = {}
+        leaves = {}
+        for i, (node, inputs, saved, reads_out) in enumerate(units):
+            data_end.setdefault(id(node), i)
+            for x in inputs:
+                if id(x) in step_of:
+                    data_end[id(x)] = max(data_end[id(x)], i)
+                else:
+                    leaves[id(x)] = x
+            if not node.need_grad:
+                continue
+            back = 2 * n - 1 - i
+            if reads_out:
+                data_end[id(node)] = back
+            for x in saved:
+                if id(x) in step_of:
+                    data_end[id(x)] = max(data_end[id(x)], back)
+            for x in inputs:
+                if x.need_grad and id(x) in step_of:
+                    grad_start[id(x)] = min(grad_start.get(id(x), back), back)
+        if id(output) in step_of:
+            data_end[id(output)] = self.steps
+            if output.need_grad:
+                grad_start[id(output)] = n
+
+        self.intervals = []
+        for i, (node, *_) in enumerate(units):
+            self.intervals.append(Interval(node, 'data', i, data_end[id(node)]))
+            if id(node) in grad_start:
+                end = self.steps if node is output else 2 * n - 1 - i
+                self.intervals.append(Interval(node, 'grad', grad_start[id(node)], end))
+
+        self.leaf_bytes = sum(x.data.nbytes * (2 if x.need_grad else 1) for x in leaves.values())
+        self.buffer_sizes = self._assign()
+        self.arena_bytes = sum(self.buffer_sizes)
+        self.peak_bytes = self.arena_bytes + self.leaf_bytes
+        self.live_peak_bytes = self._live_peak() + self.leaf_bytes
+        self.naive_bytes = sum(iv.nbytes for iv in self.intervals) + self.leaf_bytes
+
+    def _assign(self):
+        """Greedy best-fit packing of the intervals, in order of start step."""
+        sizes = []
+        free = []
+        active = []
+        for iv in sorted(self.intervals, key=lambda iv: (iv.start, -iv.nbytes)):
+            while active and active[0][0] < iv.start:
+                free.append(heapq.heappop(active)[1])
+            fits = [b for b in free if sizes[b] >= iv.nbytes]
+            if fits:
+                buf = min(fits, key=sizes.__getitem__)
+            elif free:
+                buf = max(free, key=sizes.__getitem__)
+                sizes[buf] = iv.nbytes
+            else:
+                buf = len(sizes)
+                sizes.append(iv.nbytes)
+            if buf in free:
+                free.remove(buf)
+            iv.buffer = buf
+            heapq.heappush(active, (iv.end, buf))
+        return sizes
+
+    def _live_peak(self):
+        delta = [0] * (self.steps + 2)
+        for iv in self.intervals:
+            delta[iv.start] += iv.nbytes
+            delta[iv.end + 1] -= iv.nbytes
+        peak = live = 0
+        for d in delta:
+            live += d
+            peak = max(peak, live)
+        return peak
+
+    def bind(self, xp):
+        """
+        Allocates the arena and points every planned `data` / `grad` at its
+        slice of it. Values computed before binding are not copied over.
+        """
+        self.buffers = [xp.empty(size, dtype=xp.uint8) for size in self.buffer_sizes]
+        for iv in self.intervals:
+            ref = iv.node.data
+            view = self.buffers[iv.buffer][:iv.nbytes].view(ref.dtype).reshape(ref.shape)
+            setattr(iv.node, iv.kind, view)
+
+    def summary(self):
+        """Returns the planned numbers as a short readable report."""
+        n_data = sum(iv.kind == 'data' for iv in self.intervals)
+        mb = lambda b: f"{b / 1e6:.2f} MB"
+        return "\n".join([
+            f"MemoryPlan: {n_data} activations, {len(self.intervals) - n_data} grads"
+            f" in {len(self.buffer_sizes)} buffers",
+            f"  planned peak   {mb(self.peak_bytes)} (arena {mb(self.arena_bytes)} + leaves {mb(self.leaf_bytes)})",
+            f"  lower bound    {mb(self.live_peak_bytes)}",
+            f"  without reuse  {mb(self.naive_bytes)}",
+        ])
+
+    def __repr__(self):
+        return (f"MemoryPlan(peak_bytes={self.peak_bytes}, naive_bytes={self.naive_bytes}, "
+                f"buffers={len(self.buffer_sizes)})")
+
+
+def plan_memory(root):
+    """
+    deriv.plan_memory(root)
+
+    Plans the memory of a backward pass from `root` before running it.
+
+    The plan only reads the graph (topological order, shapes and dtypes),
+    so it can be used to size batches: build the loss, check
+    `plan.peak_bytes` and call `backward()` only if it fits. Pass
+    `reuse_buffers=True` to `deriv.capture` to execute with the plan.
+
+    Args:
+        root (array): Output of the graph, e.g. the loss.
+
+    Returns:
+        MemoryPlan: The plan; `print(plan.summary())` for a report.
+    """
+    units = [(node, node.parents, *saved_by(node, node.parents)) for node in root.topo() if node.parents]
+    return MemoryPlan(units, root)
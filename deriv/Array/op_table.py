@@ -0,0 +1,433 @@
+"""
+Per-op rules keyed on the `op` string every graph node carries.
+
+FORWARD rules recompute a node from its parents' data without building
+graph nodes. They write into a preallocated `out` buffer and take the op's
+`attrs` as keyword arguments:
+
+    FORWARD[op](xp, out, *parent_data, **attrs)
+
+BACKWARD rules are the raw-data counterparts of the backward closures. They
+take the output gradient `g`, the output data, the parents' data and a
+`needs` flag per parent, and return one gradient per parent (None where it
+is not needed). Gradients may still be in broadcast shape and may be views:
+callers reduce them with `unbroadcast` and copy before writing into them.
+
+    BACKWARD[op](xp, g, out, inputs, needs, **attrs)
+
+SAVES lists what each backward rule reads besides `g`: the indices of the
+parents whose data it needs and whether it needs the output data. Ops that
+are missing from it are assumed to read everything.
+
+JVP rules propagate forward-mode tangents (see `deriv.jvp`). They take the
+output data, the parents' data and one tangent per parent (None for a zero
+tangent) and return the output tangent. With `batched`, every tangent
+carries an extra leading axis of directions.
+
+    JVP[op](xp, out, inputs, tangents, batched, **attrs)
+
+The indexing ops carry their index as a tuple in `attrs['index']`:
+'getitem' is `a[index]`, and 'index_add' is `a` with `values` added at
+`index` (repeated entries of an advanced index add up).
+"""
+import numbers
+
+
+def _transpose(xp, out, a):
+    xp.copyto(out, a.T)
+    return out
+
+
+def _sum(xp, out, a, axis=None, keepdims=False):
+    return xp.sum(a, axis=axis, keepdims=keepdims, out=out)
+
+
+def _mean(xp, out, a, axis=None):
+    return xp.mean(a, axis=axis, out=out)
+
+
+def _max(xp, out, a, axis=None, keepdims=False):
+    return xp.amax(a, axis=axis, keepdims=keepdims, out=out)
+
+
+def _sin(xp, out, a, deg=False):
+    return xp.sin(xp.radians(a) if deg else a, out=out)
+
+
+def _cos(xp, out, a, deg=False):
+    return xp.cos(xp.radians(a) if deg else a, out=out)
+
+
+def _reshape(xp, out, a, shape):
+    xp.copyto(out, a.reshape(shape))
+    return out
+
+
+def _broadcast(xp, out, a, shape):
+    xp.copyto(out, xp.broadcast_to(a, shape))
+    return out
+
+
+def _is_basic(index):
+    """True if the index tuple only slices (ints, slices, None, Ellipsis), so `a[index]` is a view."""
+    return all(part is None or part is Ellipsis or isinstance(part, slice)
+               or (isinstance(part, numbers.Integral) and not isinstance(part, bool)) for part in index)
+
+
+def _index_add(xp, target, index, values):
+    """`target[index] += values` in place, summing repeated entries of an advanced index."""
+    if _is_basic(index):
+        target[index] += values
+    else:
+        xp.add.at(target, index, values)
+    return target
+
+
+def _getitem(xp, out, a, index):
+    xp.copyto(out, a[index])
+    return out
+
+
+def _index_add_forward(xp, out, a, values, index):
+    xp.copyto(out, a)
+    return _index_add(xp, out, index, values)
+
+
+def _where(xp, out, cond, a, b):
+    xp.copyto(out, b)
+    xp.copyto(out, a, where=cond)
+    return out
+
+
+FORWARD = {
+    '+': lambda xp, out, a, b: xp.add(a, b, out=out),
+    '-': lambda xp, out, a, b: xp.subtract(a, b, out=out),
+    '*': lambda xp, out, a, b: xp.multiply(a, b, out=out),
+    '/': lambda xp, out, a, b: xp.divide(a, b, out=out),
+    '**': lambda xp, out, a, b: xp.power(a, b, out=out),
+    '@': lambda xp, out, a, b: xp.matmul(a, b, out=out),
+    'neg': lambda xp, out, a: xp.negative(a, out=out),
+    '<': lambda xp, out, a, b: xp.less(a, b, out=out),
+    '<=': lambda xp, out, a, b: xp.less_equal(a, b, out=out),
+    '>': lambda xp, out, a, b: xp.greater(a, b, out=out),
+    '>=': lambda xp, out, a, b: xp.greater_equal(a, b, out=out),
+    '!=': lambda xp, out, a, b: xp.not_equal(a, b, out=out),
+    'T': _transpose,
+    'sum': _sum,
+    'mean': _mean,
+    'max': _max,
+    'sin': _sin,
+    'cos': _cos,
+    'exp': lambda xp, out, a: xp.exp(a, out=out),
+    'log': lambda xp, out, a: xp.log(a, out=out),
+    'log10': lambda xp, out, a: xp.log10(a, out=out),
+    'root': lambda xp, out, a, p: xp.power(a, p, out=out),
+    'relu': lambda xp, out, a: xp.maximum(a, 0, out=out),
+    'tanh': lambda xp, out, a: xp.tanh(a, out=out),
+    'where': _where,
+    'reshape': _reshape,
+    'broadcast': _broadcast,
+    'getitem': _getitem,
+    'index_add': _index_add_forward,
+}
+
+
+def _expand(xp, g, shape, axis, keepdims):
+    """Broadcasts the gradient of a reduction back to the reduced input's shape."""
+    if axis is not None and not keepdims:
+        g = xp.expand_dims(g, axis)
+    return xp.broadcast_to(g, shape)
+
+
+def _b_add(xp, g, out, inputs, needs):
+    return [g if needs[0] else None, g if needs[1] else None]
+
+
+def _b_sub(xp, g, out, inputs, needs):
+    return [g if needs[0] else None, -g if needs[1] else None]
+
+
+def _b_mul(xp, g, out, inputs, needs):
+    a, b = inputs
+    return [g * b if needs[0] else None, g * a if needs[1] else None]
+
+
+def _b_div(xp, g, out, inputs, needs):
+    a, b = inputs
+    return [g / b if needs[0] else None, -a * g / (b ** 2) if needs[1] else None]
+
+
+def _b_pow(xp, g, out, inputs, needs):
+    a, b = inputs
+    return [b * (a ** (b - 1)) * g if needs[0] else None,
+            out * xp.log(a) * g if needs[1] else None]
+
+
+def _b_matmul(xp, g, out, inputs, needs):
+    a, b = inputs
+    return [xp.matmul(g, xp.swapaxes(b, -1, -2)) if needs[0] else None,
+            xp.matmul(xp.swapaxes(a, -1, -2), g) if needs[1] else None]
+
+
+def _b_sum(xp, g, out, inputs, needs, axis=None, keepdims=False):
+    return [_expand(xp, g, inputs[0].shape, axis, keepdims)]
+
+
+def _b_mean(xp, g, out, inputs, needs, axis=None):
+    a = inputs[0]
+    n = a.size if axis is None else a.size // out.size
+    return [_expand(xp, g, a.shape, axis, False) / n]
+
+
+def _b_max(xp, g, out, inputs, needs, axis=None, keepdims=False):
+    a = inputs[0]
+    mask = a == a.max(axis=axis, keepdims=True)
+    g = _expand(xp, g, a.shape, axis, keepdims)
+    return [mask * g / mask.sum(axis=axis, keepdims=True)]
+
+
+def _b_sin(xp, g, out, inputs, needs, deg=False):
+    a = inputs[0]
+    grad = g * xp.cos(xp.radians(a) if deg else a)
+    return [grad * (xp.pi / 180) if deg else grad]
+
+
+def _b_cos(xp, g, out, inputs, needs, deg=False):
+    a = inputs[0]
+    grad = g * -xp.sin(xp.radians(a) if deg else a)
+    return [grad * (xp.pi / 180) if deg else grad]
+
+
+def _b_getitem(xp, g, out, inputs, needs, index):
+    return [_index_add(xp, xp.zeros(inputs[0].shape, dtype=g.dtype), index, g)]
+
+
+def _b_index_add(xp, g, out, inputs, needs, index):
+    return [g if needs[0] else None, g[index] if needs[1] else None]
+
+
+def _b_where(xp, g, out, inputs, needs):
+    cond = inputs[0]
+    return [None,
+            xp.where(cond, g, 0.0) if needs[1] else None,
+            xp.where(cond, 0.0, g) if needs[2] else None]
+
+
+BACKWARD = {
+    '+': _b_add,
+    '-': _b_sub,
+    '*': _b_mul,
+    '/': _b_div,
+    '**': _b_pow,
+    'root': _b_pow,
+    '@': _b_matmul,
+    'neg': lambda xp, g, out, inputs, needs: [-g],
+    'T': lambda xp, g, out, inputs, needs: [g.T],
+    'sum': _b_sum,
+    'mean': _b_mean,
+    'max': _b_max,
+    'sin': _b_sin,
+    'cos': _b_cos,
+    'exp': lambda xp, g, out, inputs, needs: [g * out],
+    'log': lambda xp, g, out, inputs, needs: [g / inputs[0]],
+    'log10': lambda xp, g, out, inputs, needs: [g / inputs[0] * xp.log10(xp.exp(1))],
+    'relu': lambda xp, g, out, inputs, needs: [g * (inputs[0] > 0)],
+    'tanh': lambda xp, g, out, inputs, needs: [g * (1.0 - out ** 2)],
+    'where': _b_where,
+    'reshape': lambda xp, g, out, inputs, needs, shape: [g.reshape(inputs[0].shape)],
+    'broadcast': lambda xp, g, out, inputs, needs, shape: [g],
+    'getitem': _b_getitem,
+    'index_add': _b_index_add,
+}
+
+
+SAVES = {
+    '+': ((), False),
+    '-': ((), False),
+    '*': ((0, 1), False),
+    '/': ((1,), True),
+    '**': ((0, 1), True),
+    'root': ((0, 1), True),
+    '@': ((0, 1), False),
+    'neg': ((), False),
+    'T': ((), False),
+    'sum': ((), False),
+    'mean': ((), False),
+    'max': ((0,), True),
+    'sin': ((0,), False),
+    'cos': ((0,), False),
+    'exp': ((), True),
+    'log': ((0,), False),
+    'log10': ((0,), False),
+    'relu': ((0,), False),
+    'tanh': ((), True),
+    'where': ((0,), False),
+    'reshape': ((), False),
+    'broadcast': ((), False),
+    'getitem': ((), False),
+    'index_add': ((), False),
+}
+
+
+def _pad(xp, t, ndim, batched):
+    """Aligns a tangent for broadcasting against values with `ndim` dims."""
+    if t is None or not batched or t.ndim - 1 >= ndim:
+        return t
+    return t.reshape(t.shape[:1] + (1,) * (ndim - t.ndim + 1) + t.shape[1:])
+
+
+def _axis(axis, ndim, batched):
+    """Moves a reduction axis past the leading direction axis of batched tangents."""
+    if not batched:
+        return axis
+    if axis is None:
+        return tuple(range(1, ndim + 1))
+    if isinstance(axis, tuple):
+        return tuple(a + 1 if a >= 0 else a for a in axis)
+    return axis + 1 if axis >= 0 else axis
+
+
+def _elementwise(rule):
+    """JVP of an elementwise op: `rule` sees tangents padded to the output's rank."""
+    def jvp(xp, out, inputs, tangents, batched, **attrs):
+        tangents = [_pad(xp, t, out.ndim, batched) for t in tangents]
+        return rule(xp, out, inputs, tangents, **attrs)
+    return jvp
+
+
+def _sum_terms(*terms):
+    terms = [t for t in terms if t is not None]
+    total = terms[0]
+    for t in terms[1:]:
+        total = total + t
+    return total
+
+
+def _j_add(xp, out, inputs, tangents):
+    return _sum_terms(*tangents)
+
+
+def _j_sub(xp, out, inputs, tangents):
+    ta, tb = tangents
+    return ta if tb is None else (-tb if ta is None else ta - tb)
+
+
+def _j_mul(xp, out, inputs, tangents):
+    (a, b), (ta, tb) = inputs, tangents
+    return _sum_terms(ta * b if ta is not None else None, a * tb if tb is not None else None)
+
+
+def _j_div(xp, out, inputs, tangents):
+    (a, b), (ta, tb) = inputs, tangents
+    num = _j_sub(xp, out, inputs, [ta, out * tb if tb is not None else None])
+    return num / b
+
+
+def _j_pow(xp, out, inputs, tangents):
+    (a, b), (ta, tb) = inputs, tangents
+    return _sum_terms(ta * (b * a ** (b - 1)) if ta is not None else None,
+                      tb * (out * xp.log(a)) if tb is not None else None)
+
+
+def _j_matmul(xp, out, inputs, tangents, batched):
+    (a, b), (ta, tb) = inputs, tangents
+    terms = []
+    if ta is not None:
+        terms.append(xp.matmul(ta, b))
+    if tb is not None:
+        if batched and b.ndim == 1:
+            terms.append(xp.moveaxis(xp.matmul(a, xp.moveaxis(tb, 0, -1)), -1, 0))
+        else:
+            terms.append(xp.matmul(a, tb))
+    return _sum_terms(*terms)
+
+
+def _j_transpose(xp, out, inputs, tangents, batched):
+    t = tangents[0]
+    return xp.transpose(t, (0,) + tuple(range(t.ndim - 1, 0, -1))) if batched else t.T
+
+
+def _j_sum(xp, out, inputs, tangents, batched, axis=None, keepdims=False):
+    return xp.sum(tangents[0], axis=_axis(axis, inputs[0].ndim, batched), keepdims=keepdims)
+
+
+def _j_mean(xp, out, inputs, tangents, batched, axis=None):
+    return xp.mean(tangents[0], axis=_axis(axis, inputs[0].ndim, batched))
+
+
+def _j_max(xp, out, inputs, tangents, batched, axis=None, keepdims=False):
+    a = inputs[0]
+    peak = out if axis is None or keepdims else xp.expand_dims(out, axis)
+    mask = a == peak
+    weights = mask / mask.sum(axis=axis, keepdims=True)
+    return xp.sum(tangents[0] * weights, axis=_axis(axis, a.ndim, batched), keepdims=keepdims)
+
+
+def _j_sin(xp, out, inputs, tangents, deg=False):
+    a = xp.radians(inputs[0]) if deg else inputs[0]
+    t = tangents[0] * xp.cos(a)
+    return t * (xp.pi / 180) if deg else t
+
+
+def _j_cos(xp, out, inputs, tangents, deg=False):
+    a = xp.radians(inputs[0]) if deg else inputs[0]
+    t = -tangents[0] * xp.sin(a)
+    return t * (xp.pi / 180) if deg else t
+
+
+def _j_reshape(xp, out, inputs, tangents, batched, shape):
+    t = tangents[0]
+    return t.reshape(t.shape[:1] + out.shape if batched else out.shape)
+
+
+def _j_broadcast(xp, out, inputs, tangents, batched, shape):
+    t = _pad(xp, tangents[0], out.ndim, batched)
+    return xp.broadcast_to(t, t.shape[:1] + out.shape if batched else out.shape)
+
+
+def _j_getitem(xp, out, inputs, tangents, batched, index):
+    return tangents[0][(slice(None),) + index if batched else index]
+
+
+def _j_index_add(xp, out, inputs, tangents, batched, index):
+    ta, tv = tangents
+    shape = ((ta if ta is not None else tv).shape[0],) + out.shape if batched else out.shape
+    t = xp.zeros(shape, dtype=out.dtype) if ta is None else xp.array(xp.broadcast_to(ta, shape))
+    if tv is not None:
+        tv = _pad(xp, tv, out[index].ndim, batched)
+        _index_add(xp, t, (slice(None),) + index if batched else index, tv)
+    return t
+
+
+def _j_where(xp, out, inputs, tangents):
+    cond = inputs[0]
+    _, ta, tb = tangents
+    return xp.where(cond, 0.0 if ta is None else ta, 0.0 if tb is None else tb)
+
+
+JVP = {
+    '+': _elementwise(_j_add),
+    '-': _elementwise(_j_sub),
+    '*': _elementwise(_j_mul),
+    '/': _elementwise(_j_div),
+    '**': _elementwise(_j_pow),
+    'root': _elementwise(_j_pow),
+    '@': _j_matmul,
+    'neg': _elementwise(lambda xp, out, inputs, tangents: -tangents[0]),
+    'T': _j_transpose,
+    'sum': _j_sum,
+    'mean': _j_mean,
+    'max': _j_max,
+    'sin': _elementwise(_j_sin),
+    'cos': _elementwise(_j_cos),
+    'exp': _elementwise(lambda xp, out, inputs, tangents: tangents[0] * out),
+    'log': _elementwise(lambda xp, out, inputs, tangents: tangents[0] / inputs[0]),
+    'log10': _elementwise(lambda xp, out, inputs, tangents: tangents[0] / (inputs[0] * xp.log(10.0))),
+    'relu': _elementwise(lambda xp, out, inputs, tangents: tangents[0] * (inputs[0] > 0)),
+    'tanh': _elementwise(lambda xp, out, inputs, tangents: tangents[0] * (1.0 - out * out)),
+    'where': _elementwise(_j_where),
+    'reshape': _j_reshape,
+    'broadcast': _j_broadcast,
+    'getitem': _j_getitem,
+    'index_add': _j_index_add,
+}
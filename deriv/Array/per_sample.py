@@ -0,0 +1,232 @@
+"""
+Per-example gradients from a single batched backward pass.
+
+The forward runs once on the whole batch. In the reverse pass, gradients
+with respect to batched activations are the ordinary ones: as long as no op
+mixes samples (everything but the final reduction of the loss works
+sample by sample), row `b` of an activation's gradient only depends on
+sample `b`. The batch is only summed away where a batched value meets a
+parameter, and there `per_sample_grads` keeps it:
+
+    x @ W      per-sample `x_b^T g_b`, one einsum over the batch
+    x + b ...  the elementwise backward, reduced to the parameter's shape
+               on every axis but the batch axis
+
+Ops of parameters alone (e.g. `W.T`) receive a gradient per sample and
+pass it back through their `op_table.BACKWARD` rule sample by sample.
+
+With `norms=True` only the per-sample L2 norms are returned. For a weight
+that only enters the graph through one `x @ W` the norm is computed from
+`x` and `g` directly ("ghost norm", `|x_b|^2 |g_b|^2` for 2-D inputs)
+without forming the `(batch, in, out)` gradient.
+"""
+from deriv.Array.backend import get_backend
+from deriv.Array.grad_mode import enable_grad
+from deriv.Array.op_table import BACKWARD
+from deriv.Array.reversed_mode_autodiff import _topo_order
+
+# Ops whose backward rules broadcast a parameter against the batch.
+ELEMENTWISE = frozenset(['+', '-', '*', '/', '**', 'root', 'where'])
+
+
+def _reduce_per_sample(xp, grad, shape):
+    """Sums a gradient in broadcast shape `(batch, ...)` down to `(batch,) + shape`."""
+    batch = grad.shape[0]
+    rank = grad.ndim - 1
+    if len(shape) > rank:
+        # The parameter's leading size-1 axes line up with the batch axis.
+        grad = grad.reshape((batch,) + (1,) * (len(shape) - rank) + grad.shape[1:])
+        rank = len(shape)
+    extra = rank - len(shape)
+    axes = tuple(range(1, 1 + extra)) + tuple(
+        1 + extra + i for i, dim in enumerate(shape) if dim == 1 and grad.shape[1 + extra + i] != 1
+    )
+    if axes:
+        grad = grad.sum(axis=axes, keepdims=True)
+    return grad.reshape((batch,) + shape)
+
+
+def _matmul_operands(a, b, g, index):
+    """`(left, right)` so the per-sample gradient of operand `index` is `left_b @ right_b`."""
+    batch = g.shape[0]
+    if index == 1:
+        if b.ndim != 2:
+            raise NotImplementedError("Per-sample gradients of `x @ W` need a 2-D W")
+        # sum_t x[b, t, :]^T g[b, t, :]
+        return a.reshape(batch, -1, a.shape[-1]), g.reshape(batch, -1, g.shape[-1])
+    if a.ndim != 2 or b.ndim < 3:
+        raise NotImplementedError("Per-sample gradients of `W @ x` need a 2-D W and a batched x")
+    # sum_t g[b, t] @ x[b, t]^T, with the contraction over the last axis
+    return (g.reshape(batch, -1, g.shape[-2], g.shape[-1]),
+            b.reshape(batch, -1, b.shape[-2], b.shape[-1]))
+
+
+def _matmul_per_sample(xp, a, b, g, index):
+    left, right = _matmul_operands(a, b, g, index)
+    if index == 1:
+        return xp.einsum('bti,btj->bij', left, right)
+    return xp.einsum('btik,btjk->bij', left, right)
+
+
+def _matmul_norm_sq(xp, a, b, g, index):
+    """Squared per-sample norms of the gradient of operand `index` of `a @ b`."""
+    left, right = _matmul_operands(a, b, g, index)
+    if index == 1:
+        steps, rows, cols = left.shape[1], left.shape[2], right.shape[2]
+        if steps == 1:
+            return (left ** 2).sum(axis=(1, 2)) * (right ** 2).sum(axis=(1, 2))
+        if steps * steps <= rows * cols:
+            # |sum_t x_t g_t^T|^2 = sum_{t,s} (x_t . x_s)(g_t . g_s)
+            return (xp.einsum('bti,bsi->bts', left, left) * xp.einsum('btj,bsj->bts', right, right)).sum(axis=(1, 2))
+    return (_matmul_per_sample(xp, a, b, g, index) ** 2).sum(axis=(1, 2))
+
+
+def per_sample_grads(fn, parameters, *inputs, norms=False):
+    """
+    deriv.per_sample_grads(fn, parameters, *inputs, norms=False)
+
+    Gradients of `fn(*inputs)` with respect to `parameters`, one per sample,
+    from a single forward and backward pass over the batch.
+
+    `fn` must treat axis 0 of every input as the batch, work on each sample
+    independently, and reduce to a scalar only at the end (e.g. a loss with
+    'mean' or 'sum' reduction). Row `b` of a result is sample `b`'s
+    contribution to the gradient, so summing over axis 0 gives the ordinary
+    gradient; with a 'mean' loss, multiply by the batch size for the
+    gradient of each sample's own loss. `.grad` is not touched.
+
+    Args:
+        fn: Function of the inputs returning a scalar array; it may read
+            the parameters from a closure (e.g. a `Module`).
+        parameters (dict, list or array): A `Module.parameters()` dict, a
+            list of arrays or a single array.
+        *inputs: Batched inputs (arrays or array_like).
+        norms (bool): Return the per-sample L2 norm of each parameter's
+            gradient (shape `(batch,)`) instead of the gradients, using
+            ghost norms for weights of `x @ W`.
+
+    Returns:
+        tuple: `(output, grads)`, where `grads` matches `parameters` (dict,
+        list or single entry) and holds raw backend arrays of shape
+        `(batch,) + param.shape`, or `(batch,)` with `norms`.
+
+    Example:
+        >>> loss, grads = deriv.per_sample_grads(lambda x, y: loss_fn(model(x), y),
+        ...                                      model.parameters(), x, y)
+        >>> loss, norms = deriv.per_sample_grads(f, model.parameters(), x, y, norms=True)
+    """
+    from deriv.Array.array_object import array, unbroadcast
+
+    xp = get_backend()
+    if isinstance(parameters, dict):
+        names, params = list(parameters), list(parameters.values())
+    elif isinstance(parameters, array):
+        names, params = None, [parameters]
+    else:
+        names, params = None, list(parameters)
+    inputs = [x if isinstance(x, array) else array(x) for x in inputs]
+    if not inputs:
+        raise ValueError("per_sample_grads needs at least one batched input")
+    batch = inputs[0].data.shape[0]
+
+    with enable_grad():
+        output = fn(*inputs)
+    if not output.need_grad:
+        raise RuntimeError("The output does not depend on any parameter")
+    if output.data.size != 1:
+        raise ValueError(f"fn must return a scalar, got shape {output.data.shape}")
+
+    topo, _ = _topo_order(output, need_grad_only=True)
+    # A node is parameter-only if everything under it is a parameter or a
+    # constant without the batch axis; everything else is batched. Inputs
+    # preprocessed without grad (`x / 255`, `x.reshape(...)`) are parentless
+    # constants, recognized by their leading `batch` axis.
+    batched = {id(x) for x in inputs}
+    for node in topo:
+        if any(id(p) in batched or (not p.need_grad and p.data.ndim and p.data.shape[0] == batch)
+               for p in node.parents):
+            batched.add(id(node))
+    targets = {id(p) for p in params}
+    # A ghost norm is only exact for a parameter with a single incoming gradient.
+    edges = {}
+    for node in topo:
+        for parent in node.parents:
+            if id(parent) in targets:
+                edges[id(parent)] = edges.get(id(parent), 0) + 1
+
+    grads = {id(output): xp.ones_like(output.data)}
+    norm_sq = {}
+    for node in reversed(topo):
+        g = grads.pop(id(node), None)
+        if g is None or not node.parents:
+            if g is not None and id(node) in targets:
+                grads[id(node)] = g
+            continue
+        rule = BACKWARD.get(node.op)
+        if rule is None:
+            raise NotImplementedError(f"Op '{node.op}' has no backward rule")
+        parents = node.parents
+        data = [p.data for p in parents]
+        needs = tuple(p.need_grad for p in parents)
+        attrs = node.attrs or {}
+
+        if id(node) in batched:
+            contributions = [None] * len(parents)
+            per_sample = [p.need_grad and id(p) not in batched for p in parents]
+            if any(per_sample) and (node.data.ndim == 0 or node.data.shape[0] != batch):
+                raise ValueError(
+                    f"Op '{node.op}' combines a parameter with a value that no longer has the batch axis; "
+                    "fn must reduce over the batch only at the end, so add parameter-only terms "
+                    "(e.g. a weight penalty) to the gradients afterwards")
+            if node.op == '@':
+                for i, parent in enumerate(parents):
+                    if not per_sample[i]:
+                        continue
+                    if norms and id(parent) in targets and edges[id(parent)] == 1:
+                        norm_sq[id(parent)] = _matmul_norm_sq(xp, data[0], data[1], g, i)
+                    else:
+                        contributions[i] = _matmul_per_sample(xp, data[0], data[1], g, i)
+                rest = tuple(need and not ps for need, ps in zip(needs, per_sample))
+                if any(rest):
+                    for i, grad in enumerate(rule(xp, g, node.data, data, rest, **attrs)):
+                        if rest[i]:
+                            contributions[i] = unbroadcast(grad, data[i].shape)
+            else:
+                if any(per_sample) and node.op not in ELEMENTWISE:
+                    raise NotImplementedError(
+                        f"Per-sample gradients through op '{node.op}' between batched data and a parameter")
+                for i, grad in enumerate(rule(xp, g, node.data, data, needs, **attrs)):
+                    if grad is None or not needs[i]:
+                        continue
+                    if per_sample[i]:
+                        contributions[i] = _reduce_per_sample(xp, xp.broadcast_to(grad, node.data.shape),
+                                                              data[i].shape)
+                    else:
+                        contributions[i] = unbroadcast(grad, data[i].shape)
+        else:
+            # A function of parameters only: its gradient has a batch axis.
+            rows = [rule(xp, g[b], node.data, data, needs, **attrs) for b in range(batch)]
+            contributions = [xp.stack([unbroadcast(row[i], data[i].shape) for row in rows]) if needs[i] else None
+                             for i in range(len(parents))]
+
+        for parent, grad in zip(parents, contributions):
+            if grad is None or not parent.need_grad:
+                continue
+            prev = grads.get(id(parent))
+            grads[id(parent)] = grad if prev is None else prev + grad
+
+    results = []
+    for param in params:
+        grad = grads.get(id(param))
+        if norms:
+            if id(param) in norm_sq:
+                results.append(xp.sqrt(norm_sq[id(param)]))
+            elif grad is None:
+                results.append(xp.zeros(batch, dtype=param.data.dtype))
+            else:
+                results.append(xp.sqrt((grad.reshape(batch, -1) ** 2).sum(axis=1)))
+        else:
+            results.append(grad if grad is not None else xp.zeros((batch,) + param.data.shape, dtype=param.data.dtype))
+    if names is not None:
+        return output, dict(zip(names, results))
+    return output, results[0] if isinstance(parameters, array) else results
@@ -0,0 +1,223 @@
+import functools
+import json
+import threading
+import time
+
+from deriv.Array import reversed_mode_autodiff
+from deriv.Array.array_object import array
+
+
+def _entry_points():
+    """(owner, attribute, op label) of every public op that builds a node."""
+    import deriv
+    from deriv.Array import AMath, _condition, indexing
+    from deriv.nn import non_linear
+    from deriv import loss_funcs
+
+    binary = {'add': '+', 'sub': '-', 'mul': '*', 'truediv': '/', 'pow': '**'}
+    points = []
+    for name, label in binary.items():
+        points += [(array, f'__{name}__', label), (array, f'__r{name}__', label)]
+    for name, label in (('__matmul__', '@'), ('__neg__', 'neg'), ('T', 'T'), ('sum', 'sum'), ('mean', 'mean'),
+                        ('max', 'max'), ('__lt__', '<'), ('__le__', '<='), ('__gt__', '>'), ('__ge__', '>='),
+                        ('__ne__', '!='), ('reshape', 'reshape'), ('broadcast_to', 'broadcast'),
+                        ('__getitem__', 'getitem')):
+        points.append((array, name, label))
+    points += [(AMath.trigo, 'sin', 'sin'), (AMath.trigo, 'cos', 'cos'), (AMath.expo, 'exp', 'exp'),
+               (AMath.expo, 'log', 'log'), (AMath.expo, 'log10', 'log10'), (AMath.expo, 'rootof', 'root'),
+               (AMath.reduct, 'sum', 'sum'), (AMath.reduct, 'mean', 'mean'),
+               (non_linear.ReLU, '__call__', 'relu'), (non_linear.Tanh, '__call__', 'tanh'),
+               (loss_funcs.SoftmaxCrossEntropy, '__call__', 'cce'), (loss_funcs.MSE, '__call__', 'mse'),
+               (loss_funcs.BCEWithLogits, '__call__', 'bce_logits'), (loss_funcs.Huber, '__call__', 'huber'),
+               (_condition, 'where', 'where'), (deriv, 'where', 'where')]
+    for name, label in (('take', 'getitem'), ('gather', 'getitem'), ('scatter_add', 'index_add')):
+        points += [(indexing, name, label), (deriv, name, label)]
+    return points
+
+
+class OpStats:
+    """Accumulated numbers for one op."""
+
+    __slots__ = ('op', 'count', 'forward_time', 'backward_count', 'backward_time', 'data_bytes', 'grad_bytes')
+
+    def __init__(self, op):
+        self.op = op
+        self.count = 0
+        self.forward_time = 0.0
+        self.backward_count = 0
+        self.backward_time = 0.0
+        self.data_bytes = 0
+        self.grad_bytes = 0
+
+    @property
+    def total_time(self):
+        return self.forward_time + self.backward_time
+
+    def as_dict(self):
+        return dict({name: getattr(self, name) for name in self.__slots__}, total_time=self.total_time)
+
+
+class Profile:
+    """
+    Per-op time and memory accounting for eager forward and backward passes.
+
+    While active, every deriv op entry point (array operators, `deriv.sin`
+    and friends, activations, losses) is timed, and `array.backward()` times
+    each node's backward closure. Memory is the `data` of every op output and
+    each grad buffer created during backward, attributed to the op whose
+    output it belongs to (`leaf` for parameters and inputs).
+
+    Ops that call other ops are counted once, under the outermost call.
+    Captured tapes (`deriv.capture`) and compact tapes replay without going
+    through these entry points and are not broken down.
+
+    Attributes:
+        stats (dict): `OpStats` per op string.
+        graph_nodes (int): Op outputs recorded in the graph.
+        const_nodes (int): Op outputs that did not need a gradient.
+        wall_time (float): Seconds spent inside the `profile` block.
+    """
+
+    def __init__(self, record_events=True):
+        self.record_events = record_events
+        self.stats = {}
+        self.events = []
+        self.graph_nodes = 0
+        self.const_nodes = 0
+        self.wall_time = 0.0
+        self._patched = []
+        self._local = threading.local()
+
+    def _op(self, op):
+        stats = self.stats.get(op)
+        if stats is None:
+            stats = self.stats[op] = OpStats(op)
+        return stats
+
+    def _event(self, name, cat, t0, t1, **args):
+        if self.record_events:
+            self.events.append((name, cat, t0, t1, threading.get_ident(), args))
+
+    def _wrap(self, fn, label):
+        local = self._local
+
+        @functools.wraps(fn)
+        def profiled(*args, **kwargs):
+            if getattr(local, 'depth', 0):
+                return fn(*args, **kwargs)
+            local.depth = 1
+            t0 = time.perf_counter()
+            try:
+                out = fn(*args, **kwargs)
+            finally:
+                local.depth = 0
+            t1 = time.perf_counter()
+            if isinstance(out, array):
+                stats = self._op(out.op or label)
+                stats.count += 1
+                stats.forward_time += t1 - t0
+                stats.data_bytes += out.data.nbytes
+                if out.parents:
+                    self.graph_nodes += 1
+                else:
+                    self.const_nodes += 1
+                self._event(stats.op, 'forward', t0, t1, shape=list(out.data.shape), bytes=out.data.nbytes)
+            return out
+        return profiled
+
+    def _back(self, node):
+        fresh = [p for p in node.parents if p.grad is None]
+        t0 = time.perf_counter()
+        node._back()
+        t1 = time.perf_counter()
+        stats = self._op(node.op or 'leaf')
+        stats.backward_count += 1
+        stats.backward_time += t1 - t0
+        for parent in fresh:
+            if parent.grad is not None:
+                self._op(parent.op or 'leaf').grad_bytes += parent.grad.nbytes
+        self._event(stats.op, 'backward', t0, t1)
+
+    def __enter__(self):
+        if reversed_mode_autodiff._back_hook is not None:
+            raise RuntimeError("deriv.profile() blocks cannot be nested")
+        for owner, name, label in _entry_points():
+            raw = vars(owner)[name]
+            if isinstance(raw, staticmethod):
+                patched = staticmethod(self._wrap(raw.__func__, label))
+            elif isinstance(raw, property):
+                patched = property(self._wrap(raw.fget, label), raw.fset, raw.fdel, raw.__doc__)
+            else:
+                patched = self._wrap(raw, label)
+            self._patched.append((owner, name, raw))
+            setattr(owner, name, patched)
+        reversed_mode_autodiff._back_hook = self._back
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall_time += time.perf_counter() - self._start
+        reversed_mode_autodiff._back_hook = None
+        for owner, name, raw in reversed(self._patched):
+            setattr(owner, name, raw)
+        self._patched = []
+        return False
+
+    def sorted(self, sort_by='total_time'):
+        """`OpStats` sorted by `sort_by` (an `OpStats` field), largest first; 'op' sorts by name."""
+        if sort_by == 'op':
+            return sorted(self.stats.values(), key=lambda s: s.op)
+        return sorted(self.stats.values(), key=lambda s: getattr(s, sort_by), reverse=True)
+
+    def table(self, sort_by='total_time', limit=None):
+        """
+        Returns the per-op report as text.
+
+        Args:
+            sort_by (str): 'total_time', 'forward_time', 'backward_time',
+                'count', 'data_bytes', 'grad_bytes' or 'op'.
+            limit (int, optional): Show only the first `limit` rows.
+        """
+        rows = self.sorted(sort_by)[:limit]
+        total = sum(s.total_time for s in self.stats.values()) or 1.0
+        lines = [f"{'op':<12} {'calls':>7} {'fwd ms':>9} {'bwd calls':>9} {'bwd ms':>9} {'total %':>8}"
+                 f" {'data MB':>9} {'grad MB':>9}"]
+        for s in rows:
+            lines.append(f"{s.op:<12} {s.count:>7} {s.forward_time * 1e3:>9.3f} {s.backward_count:>9}"
+                         f" {s.backward_time * 1e3:>9.3f} {100 * s.total_time / total:>7.1f}%"
+                         f" {s.data_bytes / 1e6:>9.3f} {s.grad_bytes / 1e6:>9.3f}")
+        op_time = sum(s.total_time for s in self.stats.values())
+        lines.append(f"graph nodes: {self.graph_nodes}, constant outputs: {self.const_nodes}, "
+                     f"op time: {op_time * 1e3:.3f} ms of {self.wall_time * 1e3:.3f} ms wall")
+        return "\n".join(lines)
+
+    def export_chrome_trace(self, path):
+        """Writes the recorded forward / backward events as a Chrome trace (chrome://tracing, Perfetto)."""
+        events = [{"name": name, "cat": cat, "ph": "X", "pid": 0, "tid": tid,
+                   "ts": (t0 - self._start) * 1e6, "dur": (t1 - t0) * 1e6, "args": args}
+                  for name, cat, t0, t1, tid, args in self.events]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def profile(record_events=True):
+    """
+    deriv.profile(record_events=True)
+
+    Context manager that profiles the deriv ops run inside it.
+
+    Args:
+        record_events (bool): Keep one event per op call for
+            `export_chrome_trace`; set to False for long runs.
+
+    Returns:
+        Profile: Read `table()` after the block, or export a trace.
+
+    Example:
+        >>> with deriv.profile() as prof:
+        ...     loss = loss_fn(model(x), y)
+        ...     loss.backward()
+        >>> print(prof.table(sort_by='backward_time'))
+        >>> prof.export_chrome_trace("step.json")
+    """
+    return Profile(record_events)
@@ -1,20 +1,226 @@
+import contextlib
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
 from deriv.Array.backend import get_backend
 
+# Called as `_back_hook(node)` in place of `node._back()` while a
+# `deriv.profile()` block is active.
+_back_hook = None
+
+# Number of backward passes currently running closures on worker threads.
+# While it is non-zero, writes to `.grad` buffers go through `locked_grads`.
+_parallel = 0
+_GRAD_LOCKS = tuple(threading.Lock() for _ in range(64))
+_UNLOCKED = contextlib.nullcontext()
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def noop():
+    pass
+
+
+def released():
+    """Backward closure of a node whose graph `backward()` has already released."""
+
+
+class _Held:
+    """Holds a set of striped grad locks, acquired in a fixed order."""
+
+    __slots__ = ('locks',)
+
+    def __init__(self, locks):
+        self.locks = locks
+
+    def __enter__(self):
+        for lock in self.locks:
+            lock.acquire()
+
+    def __exit__(self, *exc):
+        for lock in reversed(self.locks):
+            lock.release()
+
+
+def locked_grads(*nodes):
+    """
+    Context manager guarding writes to the `.grad` buffers of `nodes`.
+
+    Backward closures that write into a parent's grad (`_accumulate`, or
+    directly) wrap the write in it. Outside a parallel backward it is a
+    no-op; during one it holds a lock per node, so branches that finish at
+    the same time never interleave their updates of a shared gradient.
+    """
+    if not _parallel:
+        return _UNLOCKED
+    stripes = sorted({id(node) % len(_GRAD_LOCKS) for node in nodes})
+    return _Held([_GRAD_LOCKS[i] for i in stripes])
+
+
+def _pool(threads):
+    """A worker pool of `threads` threads, shared by all parallel backward passes."""
+    with _pools_lock:
+        pool = _pools.get(threads)
+        if pool is None:
+            pool = _pools[threads] = ThreadPoolExecutor(threads, thread_name_prefix="deriv-backward")
+        return pool
+
 
-def _backward(self):
+def _topo_order(root, need_grad_only=False):
+    """
+    Iterative depth-first topological sort of the graph ending at `root`.
+
+    Args:
+        root: Output node of the graph.
+        need_grad_only (bool): If True, parents with `need_grad=False` are not
+            entered; they are collected separately as skipped nodes.
+
+    Returns:
+        tuple: (`order`, `skipped`) where `order` lists nodes with parents
+        before children and `skipped` is the number of pruned constant nodes.
+    """
+    order = []
+    visited = {id(root)}
+    skipped = set()
+    stack = [(root, iter(root.parents))]
+    while stack:
+        node, parents = stack[-1]
+        for parent in parents:
+            if id(parent) in visited:
+                continue
+            if need_grad_only and not parent.need_grad:
+                skipped.add(id(parent))
+                continue
+            visited.add(id(parent))
+            stack.append((parent, iter(parent.parents)))
+            break
+        else:
+            stack.pop()
+            order.append(node)
+    return order, len(skipped)
+
+
+def _release(node, root, retain_graph, free_intermediates):
+    """Drops what a processed node no longer needs (see `_backward`)."""
+    if not node.parents:
+        return
+    if not retain_graph:
+        node.parents = ()
+        node._back = released if node is root else noop
+    if free_intermediates and node is not root:
+        node.grad = None
+        node._back = noop
+
+
+def _backward_parallel(self, topo, threads, retain_graph, free_intermediates):
+    """
+    Runs the backward closures of `topo` on a pool of `threads` threads.
+
+    A node is ready once every node consuming it has run, i.e. its gradient
+    is complete; ready nodes run concurrently, so independent branches of
+    the graph (the heads of a multi-head layer, the two sides of a residual
+    block) are differentiated in parallel. Scheduling stays on the calling
+    thread; workers only run closures. NumPy releases the GIL inside large
+    kernels, which is where the speedup comes from.
+    """
+    global _parallel
+    pending = {id(node): 0 for node in topo}
+    for node in topo:
+        for parent in node.parents:
+            if parent.need_grad:
+                pending[id(parent)] += 1
+    # `_release` clears `parents`, so the edges are read before a node runs.
+    edges = {}
+
+    def run(node):
+        node._back()
+        _release(node, self, retain_graph, free_intermediates)
+
+    pool = _pool(threads)
+    ready, running = [self], {}
+    with _pools_lock:
+        _parallel += 1
+    try:
+        while ready or running:
+            finished = []
+            for node in ready:
+                edges[id(node)] = node.parents
+                if node.parents and node.grad is not None:
+                    running[pool.submit(run, node)] = node
+                else:
+                    # A leaf, or a node no gradient reached: nothing to run.
+                    finished.append(node)
+            ready = []
+            if not finished:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finished.append(running.pop(future))
+                    future.result()
+            for node in finished:
+                for parent in edges.pop(id(node)):
+                    if parent.need_grad:
+                        pending[id(parent)] -= 1
+                        if not pending[id(parent)]:
+                            ready.append(parent)
+    except BaseException:
+        for future in running:
+            future.cancel()
+        wait(running)
+        raise
+    finally:
+        with _pools_lock:
+            _parallel -= 1
+
+
+def _backward(self, retain_graph=False, free_intermediates=False, threads=None):
+    """
+    Runs reverse-mode autodiff from `self`.
+
+    Only nodes with `need_grad=True` are traversed: since an op output needs a
+    gradient exactly when one of its inputs does, these are the nodes that lie
+    on a path to a trainable leaf. Constant parents are pruned without visiting
+    their own subgraphs.
+
+    Unless `retain_graph` is set, each node drops its `parents` and backward
+    closure once its `_back` has run, releasing the intermediates the graph
+    held on to. With `free_intermediates`, each non-leaf node also drops its
+    grad buffer. The root keeps its grad. Calling backward again on a root
+    whose graph was released raises.
+
+    Gradients of intermediate nodes are local to one pass: they are reset
+    before propagating, so a second pass through a retained graph adds
+    exactly one more gradient to the leaves.
+
+    With `threads`, closures run on a thread pool as soon as all of their
+    node's consumers are done (see `_backward_parallel`). Profiling hooks
+    always run sequentially.
+
+    Returns:
+        int: Number of constant nodes skipped during the traversal.
+    """
     xp = get_backend()
+    if not self.need_grad:
+        raise RuntimeError("backward() called on an array that does not need grad")
+    if self._back is released:
+        raise RuntimeError("backward() called a second time through a released graph; "
+                           "pass retain_graph=True to the first call")
     if self.grad is None or xp.all(self.grad == 0):
         self.grad = xp.ones_like(self.data)
-    if not self._cached_topo:  
-        visited = set()
-        def build_topo(node):
-            if node not in visited:
-                visited.add(node)
-                for parent in node.parents:
-                    build_topo(parent)
-                self._cached_topo.append(node)
-        build_topo(self)
-
-    for node in reversed(self._cached_topo):
-        node._back()
+    topo, skipped = _topo_order(self, need_grad_only=True)
+    for node in topo:
+        if node.parents and node is not self:
+            node.grad = None
+    hook = _back_hook
+    if threads and threads > 1 and hook is None:
+        _backward_parallel(self, topo, threads, retain_graph, free_intermediates)
+        return skipped
 
+    for node in reversed(topo):
+        if node.grad is None:
+            continue
+        if hook is None:
+            node._back()
+        else:
+            hook(node)
+        _release(node, self, retain_graph, free_intermediates)
+    return skipped
@@ -0,0 +1,102 @@
+from deriv.Array.backend import get_backend
+
+
+class SparseGrad:
+    """
+    Gradient of a table that is zero outside a few rows, e.g. of an
+    `nn.Embedding` weight: `values[i]` is the gradient of row `indices[i]`.
+
+    A backward pass through `deriv.take(..., sparse=True)` leaves one in
+    `.grad` instead of a dense `zeros_like` of the whole table, so its size
+    is that of the rows looked up. Rows may repeat until `coalesce` sums
+    them. The optimizers update only the listed rows; adding a dense
+    gradient to it (a table also used densely) makes `.grad` dense again.
+
+    Args:
+        shape (tuple): Shape of the dense gradient, i.e. of the table.
+        indices: Row indices, 1-D.
+        values: Row gradients, of shape `(len(indices),) + shape[1:]`.
+    """
+
+    __slots__ = ('shape', '_indices', '_values', '_coalesced')
+
+    def __init__(self, shape, indices, values):
+        self.shape = tuple(shape)
+        self._indices = [indices]
+        self._values = [values]
+        self._coalesced = False
+
+    def _merge(self):
+        if len(self._indices) > 1:
+            xp = get_backend()
+            self._indices = [xp.concatenate(self._indices)]
+            self._values = [xp.concatenate(self._values)]
+
+    @property
+    def indices(self):
+        self._merge()
+        return self._indices[0]
+
+    @property
+    def values(self):
+        self._merge()
+        return self._values[0]
+
+    @property
+    def dtype(self):
+        return self._values[0].dtype
+
+    @property
+    def nbytes(self):
+        return sum(i.nbytes for i in self._indices) + sum(v.nbytes for v in self._values)
+
+    def add(self, indices, values):
+        """Appends the rows of another gradient; summing is deferred to `coalesce`."""
+        self._indices.append(indices)
+        self._values.append(values)
+        self._coalesced = False
+
+    def coalesce(self):
+        """Sums repeated rows in place, leaving sorted unique `indices`. Returns self."""
+        if self._coalesced:
+            return self
+        xp = get_backend()
+        indices, values = self.indices, self.values
+        rows, inverse = xp.unique(indices, return_inverse=True)
+        summed = xp.zeros((len(rows),) + self.shape[1:], dtype=values.dtype)
+        xp.add.at(summed, inverse.reshape(-1), values)
+        self._indices, self._values = [rows], [summed]
+        self._coalesced = True
+        return self
+
+    def to_dense(self):
+        """The gradient as a dense backend array of `shape`."""
+        xp = get_backend()
+        dense = xp.zeros(self.shape, dtype=self.dtype)
+        xp.add.at(dense, self.indices, self.values)
+        return dense
+
+    def __neg__(self):
+        return SparseGrad(self.shape, self.indices, -self.values)
+
+    def __repr__(self):
+        return f"SparseGrad(shape={self.shape}, rows={sum(len(i) for i in self._indices)})"
+
+
+def add_sparse(current, grad):
+    """
+    `current + grad` for gradients of which at least one is a `SparseGrad`
+    (`current` may be None for zero). Updates `current` in place where it
+    can and returns the result, which is dense unless both are sparse.
+    """
+    if current is None:
+        return grad
+    if isinstance(current, SparseGrad):
+        if isinstance(grad, SparseGrad):
+            current.add(grad.indices, grad.values)
+            return current
+        dense = current.to_dense()
+        dense += grad
+        return dense
+    get_backend().add.at(current, grad.indices, grad.values)
+    return current
@@ -0,0 +1,257 @@
+"""
+Graph rendering and export.
+
+Every function here visits each node of the graph once and writes its
+output as it goes, so large graphs render in time linear in their size.
+
+    render_tree   the indented tree printed by `array.graph()`
+    to_dot        Graphviz DOT, one record per node
+    to_json       nodes with op, shape, dtype, bytes and need_grad
+
+`max_depth` stops the walk that many edges above the root. `collapse`
+folds repeated subgraphs: two nodes have the same structure when they
+apply the same op to inputs of the same structure (leaves match on shape,
+dtype and need_grad), so the second of two identical layers is shown as a
+reference to the first instead of being expanded again.
+"""
+import json
+import sys
+from collections import deque
+
+# The tree view restarts its indentation every `_WRAP` levels, so very deep
+# graphs (long chains) do not produce lines that grow with their depth.
+_WRAP = 32
+
+
+def _label(node, root, data):
+    if node is root:
+        return f"{node.op} ({node.data})"
+    name = node.var_name or node.op
+    return f"{name} ({node.data})" if data else name
+
+
+def _hashable(value):
+    """A hashable stand-in for an attr value (index tuples hold slices and arrays)."""
+    if isinstance(value, (tuple, list)):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, slice):
+        return ('slice', value.start, value.stop, value.step)
+    if hasattr(value, 'tobytes'):
+        return (value.shape, value.dtype.str, value.tobytes())
+    return value
+
+
+def _signatures(root):
+    """
+    Structural signature of every node of the graph, as small ints keyed by
+    node id. Computed bottom-up, so each node is hashed once.
+    """
+    from deriv.Array.reversed_mode_autodiff import _topo_order
+
+    table = {}
+    sig = {}
+    for node in _topo_order(root)[0]:
+        attrs = tuple(sorted((k, _hashable(v)) for k, v in node.attrs.items())) if node.attrs else ()
+        key = (node.op, attrs, node.data.shape, node.data.dtype.str, node.need_grad,
+               tuple(sig[id(p)] for p in node.parents))
+        sig[id(node)] = table.setdefault(key, len(table))
+    return sig
+
+
+def render_tree(root, data=False, max_depth=None, collapse=False, file=None):
+    """
+    Writes the graph ending at `root` as an indented tree, one line per node.
+
+    A node reached a second time is printed as `[...]label` and not expanded
+    again. With `collapse`, a node whose subgraph repeats one already shown
+    is printed as `[~]label`. A node cut off by `max_depth` gets a
+    `[+n]` suffix with the number of inputs that were not shown. Below
+    `_WRAP` levels the indentation restarts and labels are prefixed with
+    their depth, `@depth`.
+    """
+    out = file or sys.stdout
+    sig = _signatures(root) if collapse else None
+    shown = set()
+    expanded = set()
+    # (node, indent, last, depth); children are pushed in reverse so the
+    # first parent is printed first, as in a recursive walk.
+    stack = [(root, "", True, 0)]
+    while stack:
+        node, indent, last, depth = stack.pop()
+        branch = "└── " if last else "├── "
+        if depth >= _WRAP:
+            branch = f"{branch}@{depth} "
+        label = _label(node, root, data)
+        if id(node) in shown:
+            out.write(f"{indent}{branch}[...]{label}\n")
+            continue
+        shown.add(id(node))
+        if collapse and node.parents and sig[id(node)] in expanded:
+            out.write(f"{indent}{branch}[~]{label}\n")
+            continue
+        if max_depth is not None and depth >= max_depth and node.parents:
+            out.write(f"{indent}{branch}{label} [+{len(node.parents)}]\n")
+            continue
+        out.write(f"{indent}{branch}{label}\n")
+        if collapse:
+            expanded.add(sig[id(node)])
+        indent = "" if (depth + 1) % _WRAP == 0 else indent + ("    " if last else "│   ")
+        n = len(node.parents)
+        for i in range(n - 1, -1, -1):
+            stack.append((node.parents[i], indent, i == n - 1, depth + 1))
+
+
+def _walk(root, max_depth=None, collapse=False):
+    """
+    Breadth-first walk from `root` towards the leaves, yielding
+    `(node, depth, status)` once per node. `status` is None for an expanded
+    node, 'truncated' when `max_depth` stops the walk at it, or the id of the
+    node whose repeated structure it shares when it was collapsed.
+    """
+    sig = _signatures(root) if collapse else None
+    first = {}
+    seen = {id(root)}
+    queue = deque([(root, 0)])
+    while queue:
+        node, depth = queue.popleft()
+        if collapse and node.parents:
+            rep = first.setdefault(sig[id(node)], id(node))
+            if rep != id(node):
+                yield node, depth, rep
+                continue
+        if max_depth is not None and depth >= max_depth and node.parents:
+            yield node, depth, 'truncated'
+            continue
+        yield node, depth, None
+        for parent in node.parents:
+            if id(parent) not in seen:
+                seen.add(id(parent))
+                queue.append((parent, depth + 1))
+
+
+def _record(node, depth, status):
+    data = node.data
+    record = {
+        "id": id(node),
+        "op": node.op or "leaf",
+        "name": node.var_name,
+        "shape": list(data.shape),
+        "dtype": str(data.dtype),
+        "bytes": int(data.nbytes),
+        "grad_bytes": int(node.grad.nbytes) if node.grad is not None else 0,
+        "need_grad": bool(node.need_grad),
+        "depth": depth,
+        "parents": [] if status is not None else [id(p) for p in node.parents],
+    }
+    if status == 'truncated':
+        record["truncated"] = True
+    elif status is not None:
+        record["collapsed_into"] = status
+    return record
+
+
+def _escape(text):
+    for ch in '\\{}|<>"':
+        text = text.replace(ch, "\\" + ch)
+    return text
+
+
+def _dot_lines(root, max_depth, collapse):
+    yield "digraph deriv {"
+    yield "  rankdir=BT;"
+    yield '  node [shape=record, fontname="monospace", fontsize=10];'
+    for node, depth, status in _walk(root, max_depth, collapse):
+        r = _record(node, depth, status)
+        title = _escape(f"{r['name']}: {r['op']}" if r["name"] else r["op"])
+        shape = "x".join(map(str, r["shape"])) or "scalar"
+        fill = "#dbe9f6" if r["need_grad"] else "#ffffff"
+        if status is None:
+            attrs = f'label="{{{title}|{shape} {r["dtype"]}|{r["bytes"]} B}}", style=filled, fillcolor="{fill}"'
+        elif status == 'truncated':
+            attrs = f'label="{{{title} ...|{shape} {r["dtype"]}|{r["bytes"]} B}}", style="filled,dashed", fillcolor="{fill}"'
+        else:
+            attrs = f'label="{{{title} (repeat)|{shape} {r["dtype"]}}}", style=filled, fillcolor="{fill}", peripheries=2'
+        yield f"  n{r['id']} [{attrs}];"
+        if status is not None and status != 'truncated':
+            yield f"  n{r['id']} -> n{status} [style=dotted, arrowhead=none, constraint=false];"
+        for parent in r["parents"]:
+            yield f"  n{parent} -> n{r['id']};"
+    yield "}"
+
+
+def _emit(lines, path):
+    if path is None:
+        return "\n".join(lines) + "\n"
+    with open(path, "w") as f:
+        for line in lines:
+            f.write(line)
+            f.write("\n")
+
+
+def to_dot(root, path=None, max_depth=None, collapse=False):
+    """
+    deriv.to_dot(root, path=None, max_depth=None, collapse=False)
+
+    Exports the graph ending at `root` in Graphviz DOT format.
+
+    Each node shows its op (and variable name), shape, dtype and size in
+    bytes; nodes that need a gradient are shaded. Edges point from inputs
+    to the op that reads them.
+
+    Args:
+        root (array): Output of the graph, e.g. the loss.
+        path (str, optional): File to stream the output to. If None the
+            DOT source is returned as a string.
+        max_depth (int, optional): Stop this many edges above the root.
+            Cut-off nodes are drawn dashed.
+        collapse (bool): Draw a repeated subgraph once; later repeats are
+            a single double-bordered node pointing at the first.
+
+    Returns:
+        str or None: The DOT source when `path` is None.
+
+    Example:
+        >>> deriv.to_dot(loss, "step.dot")   # dot -Tsvg step.dot > step.svg
+    """
+    return _emit(_dot_lines(root, max_depth, collapse), path)
+
+
+def _json_lines(root, max_depth, collapse):
+    total = grad_total = count = 0
+    yield '{"nodes": ['
+    sep = ""
+    for node, depth, status in _walk(root, max_depth, collapse):
+        r = _record(node, depth, status)
+        total += r["bytes"]
+        grad_total += r["grad_bytes"]
+        count += 1
+        yield sep + json.dumps(r)
+        sep = ","
+    yield f'], "root": {id(root)}, "num_nodes": {count}, "total_bytes": {total}, "total_grad_bytes": {grad_total}}}'
+
+
+def to_json(root, path=None, max_depth=None, collapse=False):
+    """
+    deriv.to_json(root, path=None, max_depth=None, collapse=False)
+
+    Exports the graph ending at `root` as JSON.
+
+    The document has a `nodes` list in breadth-first order from the root,
+    and the `root` id, `num_nodes`, `total_bytes` and `total_grad_bytes`.
+    Every node has `id`, `op` ('leaf' for inputs and parameters), `name`,
+    `shape`, `dtype`, `bytes`, `grad_bytes`, `need_grad`, `depth` (edges
+    from the root) and `parents` (ids). Nodes cut off by `max_depth` are
+    marked `truncated`; collapsed repeats carry `collapsed_into`, the id of
+    the node they repeat, and list no parents.
+
+    Args:
+        root (array): Output of the graph, e.g. the loss.
+        path (str, optional): File to stream the output to. If None the
+            JSON text is returned as a string.
+        max_depth (int, optional): Stop this many edges above the root.
+        collapse (bool): Do not expand repeated subgraphs.
+
+    Returns:
+        str or None: The JSON text when `path` is None.
+    """
+    return _emit(_json_lines(root, max_depth, collapse), path)
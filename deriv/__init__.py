@@ -1,5 +1,17 @@
 from .Array.array_object import *
 from .Array.AMath import *
 from .Array._condition import *
+from .Array.grad_mode import no_grad, enable_grad, inference_mode, is_grad_enabled, set_grad_enabled
+from .Array.capture import capture, Tape
+from .Array.compact_tape import CompactTape, compact_tape
+from .Array.memory_plan import MemoryPlan, plan_memory
+from .Array.profiler import profile, Profile
+from .Array.visualize import to_dot, to_json
+from .Array.forward_mode import jvp, jacfwd, forward_ad
+from .Array.higher_order import grad, hvp
+from .Array.per_sample import per_sample_grads
+from .Array.indexing import take, gather, scatter_add
+from .Array.sparse import SparseGrad
+from .codegen import jit
 from .helpers.grad_enabler import grads_on
 from .nn import ReLU, Tanh, Nami
\ No newline at end of file
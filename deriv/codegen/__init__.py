@@ -0,0 +1,4 @@
+from .tracer import Tracer
+from .ir import Graph, trace
+from .autodiff import gradients
+from .jit import Compiled, JITFunction, jit
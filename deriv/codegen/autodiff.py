@@ -0,0 +1,193 @@
+"""
+Reverse-mode differentiation of the codegen IR.
+
+`gradients` appends the backward pass of a `Graph` to the IR itself, so the
+forward and backward values can be optimized (CSE, DCE) together and
+emitted as straight-line code. Ops with a rule in `GRAD` are differentiated
+into IR ops; any other op of `op_table.BACKWARD` (losses, `max`, matmuls of
+vectors, ops traced without static shapes) becomes a single 'vjp' value
+that calls its raw backward rule at runtime.
+"""
+import math
+
+from deriv.Array.op_table import BACKWARD
+from deriv.codegen.tracer import Tracer
+
+
+def _node(op, parents, attrs=None, like=None):
+    """A backward value; `like` gives it a static shape and dtype."""
+    return Tracer(None, op, parents, attrs, like.shape if like is not None else None,
+                  like.dtype if like is not None else None, need_grad=False)
+
+
+def _const(value):
+    return Tracer(repr(value), 'const', shape=(), value=value, need_grad=False)
+
+
+def _to(g, parent, shape):
+    """Reduces a contribution `g` of static shape `shape` to the shape of `parent`."""
+    if parent.shape is None:
+        return _node('unbroadcast', (g, parent), like=parent)
+    if shape is not None and shape == parent.shape:
+        return g
+    return _node('unbroadcast', (g,), {'shape': parent.shape}, parent)
+
+
+def _g_add(n, g):
+    a, b = n.parents
+    return [_to(g, a, n.shape), _to(g, b, n.shape)]
+
+
+def _g_sub(n, g):
+    a, b = n.parents
+    return [_to(g, a, n.shape), _to(_node('neg', (g,), like=n), b, n.shape)]
+
+
+def _g_mul(n, g):
+    a, b = n.parents
+    return [_to(_node('*', (g, b), like=n), a, n.shape), _to(_node('*', (g, a), like=n), b, n.shape)]
+
+
+def _g_div(n, g):
+    a, b = n.parents
+    grad_b = _node('neg', (_node('/', (_node('*', (g, n), like=n), b), like=n),), like=n)
+    return [_to(_node('/', (g, b), like=n), a, n.shape), _to(grad_b, b, n.shape)]
+
+
+def _g_pow(n, g):
+    a, b = n.parents
+    power = _node('**', (a, _node('-', (b, _const(1)), like=b)), like=n)
+    grad_a = _node('*', (_node('*', (g, b), like=n), power), like=n)
+    grad_b = _node('*', (_node('*', (g, n), like=n), _node('log', (a,), like=a)), like=n)
+    return [_to(grad_a, a, n.shape), _to(grad_b, b, n.shape)]
+
+
+def _g_matmul(n, g):
+    a, b = n.parents
+    if a.shape is None or b.shape is None or len(a.shape) != 2 or len(b.shape) != 2:
+        return None
+    return [_node('@', (g, _node('T', (b,))), like=a), _node('@', (_node('T', (a,)), g), like=b)]
+
+
+def _g_sum(n, g):
+    a = n.parents[0]
+    if a.shape is None:
+        return None
+    attrs = n.attrs or {}
+    return [_node('expand', (g,), {'shape': a.shape, 'axis': attrs.get('axis'),
+                                   'keepdims': attrs.get('keepdims', False)}, a)]
+
+
+def _g_mean(n, g):
+    a = n.parents[0]
+    if a.shape is None or n.shape is None:
+        return None
+    count = math.prod(a.shape) // max(math.prod(n.shape), 1)
+    scaled = _node('/', (g, _const(float(count))), like=n)
+    return [_node('expand', (scaled,), {'shape': a.shape, 'axis': (n.attrs or {}).get('axis'),
+                                        'keepdims': False}, a)]
+
+
+def _g_sin(n, g):
+    if (n.attrs or {}).get('deg'):
+        return None
+    return [_node('*', (g, _node('cos', n.parents, like=n)), like=n)]
+
+
+def _g_cos(n, g):
+    if (n.attrs or {}).get('deg'):
+        return None
+    return [_node('neg', (_node('*', (g, _node('sin', n.parents, like=n)), like=n),), like=n)]
+
+
+def _g_where(n, g):
+    cond, a, b = n.parents
+    zero = _const(0.0)
+    return [None,
+            _to(_node('where', (cond, g, zero), like=n), a, n.shape),
+            _to(_node('where', (cond, zero, g), like=n), b, n.shape)]
+
+
+def _g_reshape(n, g):
+    a = n.parents[0]
+    if a.shape is None:
+        return None
+    return [_node('reshape', (g,), {'shape': a.shape}, a)]
+
+
+def _unary(rule):
+    """Rule for an elementwise op of one operand: `rule(n, g, a)` is the contribution."""
+    return lambda n, g: [rule(n, g, n.parents[0])]
+
+
+def _one_minus(x, like):
+    return _node('-', (_const(1.0), x), like=like)
+
+
+GRAD = {
+    '+': _g_add,
+    '-': _g_sub,
+    '*': _g_mul,
+    '/': _g_div,
+    '**': _g_pow,
+    'root': _g_pow,
+    '@': _g_matmul,
+    'neg': _unary(lambda n, g, a: _node('neg', (g,), like=n)),
+    'T': _unary(lambda n, g, a: _node('T', (g,), like=a)),
+    'sum': _g_sum,
+    'mean': _g_mean,
+    'sin': _g_sin,
+    'cos': _g_cos,
+    'exp': _unary(lambda n, g, a: _node('*', (g, n), like=n)),
+    'log': _unary(lambda n, g, a: _node('/', (g, a), like=n)),
+    'log10': _unary(lambda n, g, a: _node('*', (_node('/', (g, a), like=n), _const(math.log10(math.e))), like=n)),
+    'relu': _unary(lambda n, g, a: _node('*', (g, _node('>', (a, _const(0)), like=a)), like=n)),
+    'tanh': _unary(lambda n, g, a: _node('*', (g, _one_minus(_node('*', (n, n), like=n), n)), like=n)),
+    'sigmoid': _unary(lambda n, g, a: _node('*', (_node('*', (g, n), like=n), _one_minus(n, n)), like=n)),
+    'tan': _unary(lambda n, g, a: _node('*', (g, _node('+', (_const(1.0), _node('*', (n, n), like=n)), like=n)),
+                                        like=n)),
+    'where': _g_where,
+    'reshape': _g_reshape,
+    'broadcast': _unary(lambda n, g, a: _to(g, a, n.shape)),
+}
+
+
+def _generic(n, g):
+    """Backward through the raw `op_table.BACKWARD` rule of `n`, run as one value."""
+    needs = tuple(p.need_grad for p in n.parents)
+    vjp = _node('vjp', (g, n) + n.parents, {'op': n.op, 'attrs': n.attrs or {}, 'needs': needs})
+    return [_to(_node('item', (vjp,), {'index': i}), p, None) if need else None
+            for i, (p, need) in enumerate(zip(n.parents, needs))]
+
+
+def gradients(graph, wrt, seed):
+    """
+    Builds the gradients of the single output of `graph` in the IR.
+
+    Args:
+        graph (Graph): The forward program.
+        wrt (list): Leaves to differentiate with respect to.
+        seed (Tracer): The output gradient, usually a 'seed' leaf.
+
+    Returns:
+        list: One gradient tracer per `wrt` leaf, None where the output does
+        not depend on it.
+    """
+    output = graph.outputs[0]
+    grads = {id(output): seed}
+    for node in reversed(graph.nodes):
+        g = grads.get(id(node))
+        if g is None or not node.parents or not node.need_grad:
+            continue
+        rule = GRAD.get(node.op)
+        contributions = rule(node, g) if rule is not None else None
+        if contributions is None:
+            if node.op not in BACKWARD:
+                raise NotImplementedError(f"Op '{node.op}' has no backward rule")
+            contributions = _generic(node, g)
+        for parent, grad in zip(node.parents, contributions):
+            if grad is None or not parent.need_grad:
+                continue
+            prev = grads.get(id(parent))
+            grads[id(parent)] = grad if prev is None else _node('+', (prev, grad), like=parent)
+    return [grads.get(id(leaf)) for leaf in wrt]
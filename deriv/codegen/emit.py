@@ -0,0 +1,153 @@
+"""
+Python / NumPy source generation from the codegen IR.
+
+Every op value becomes one assignment `vN = <expression>` in a straight-line
+function; temporaries are deleted right after their last use so the
+generated code does not hold on to more memory than the eager graph.
+Scalar constants are inlined as literals. Ops without an expression in
+`EMIT` but with an `op_table.FORWARD` rule (the fused losses) are called
+through that rule with a freshly allocated output.
+
+Helper ops used by generated backward code:
+
+    unbroadcast   sum a gradient down to a static `shape` (or the runtime
+                  shape of its second operand)
+    expand        broadcast a reduction's gradient back to `shape`
+    vjp           call `op_table.BACKWARD[op]`; returns one grad per operand
+    item          pick entry `index` of a 'vjp' result
+"""
+import linecache
+import math
+
+from deriv.Array.array_object import unbroadcast
+from deriv.Array.op_table import FORWARD, BACKWARD
+
+
+def _expand(g, shape, axis=None, keepdims=False):
+    if axis is not None and not keepdims:
+        g = f"xp.expand_dims({g}, {axis!r})"
+    return f"xp.broadcast_to({g}, {shape!r})"
+
+
+def _unbroadcast(g, like=None, shape=None):
+    return f"_unbroadcast({g}, {like}.shape)" if like is not None else f"_unbroadcast({g}, {shape!r})"
+
+
+def _trig(fn):
+    return lambda a, deg=False: f"xp.{fn}(xp.radians({a}))" if deg else f"xp.{fn}({a})"
+
+
+def _vjp(g, out, *inputs, op, attrs, needs):
+    return f"BACKWARD[{op!r}](xp, {g}, {out}, [{', '.join(inputs)}], {needs!r}, **{attrs!r})"
+
+
+EMIT = {
+    '+': lambda a, b: f"{a} + {b}",
+    '-': lambda a, b: f"{a} - {b}",
+    '*': lambda a, b: f"{a} * {b}",
+    '/': lambda a, b: f"{a} / {b}",
+    '**': lambda a, b: f"{a} ** {b}",
+    'root': lambda a, b: f"{a} ** {b}",
+    '@': lambda a, b: f"{a} @ {b}",
+    'neg': lambda a: f"-{a}",
+    '<': lambda a, b: f"{a} < {b}",
+    '<=': lambda a, b: f"{a} <= {b}",
+    '>': lambda a, b: f"{a} > {b}",
+    '>=': lambda a, b: f"{a} >= {b}",
+    '!=': lambda a, b: f"{a} != {b}",
+    'T': lambda a: f"{a}.T",
+    'sum': lambda a, axis=None, keepdims=False: f"xp.sum({a}, axis={axis!r}, keepdims={keepdims!r})",
+    'mean': lambda a, axis=None: f"xp.mean({a}, axis={axis!r})",
+    'max': lambda a, axis=None, keepdims=False: f"xp.amax({a}, axis={axis!r}, keepdims={keepdims!r})",
+    'sin': _trig('sin'),
+    'cos': _trig('cos'),
+    'tan': lambda a: f"xp.tan({a})",
+    'exp': lambda a: f"xp.exp({a})",
+    'log': lambda a: f"xp.log({a})",
+    'log10': lambda a: f"xp.log10({a})",
+    'relu': lambda a: f"xp.maximum({a}, 0)",
+    'tanh': lambda a: f"xp.tanh({a})",
+    'sigmoid': lambda a: f"1.0 / (1.0 + xp.exp(-{a}))",
+    'where': lambda cond, a, b: f"xp.where({cond}, {a}, {b})",
+    'reshape': lambda a, shape: f"{a}.reshape({shape!r})",
+    'broadcast': lambda a, shape: f"xp.broadcast_to({a}, {shape!r})",
+    'unbroadcast': _unbroadcast,
+    'expand': _expand,
+    'vjp': _vjp,
+    'item': lambda t, index: f"{t}[{index}]",
+}
+
+
+# Ops whose attrs hold index arrays, which have no source literal.
+_INDEXING = frozenset(['getitem', 'index_add'])
+
+
+def literal(leaf):
+    """Source literal of a scalar 'const' leaf, or None if it has to be passed in."""
+    value = leaf.value
+    if getattr(value, 'ndim', 0) != 0:
+        return None
+    scalar = value.item() if hasattr(value, 'item') else value
+    if isinstance(scalar, bool) or (isinstance(scalar, (int, float)) and math.isfinite(scalar)):
+        return f"({scalar!r})"
+    return None
+
+
+def expression(node, args):
+    """Source of the expression computing `node` from its operands' names."""
+    attrs = node.attrs or {}
+    if node.op in _INDEXING or (node.op == 'vjp' and attrs['op'] in _INDEXING):
+        raise NotImplementedError(f"Indexing op '{attrs.get('op', node.op)}' cannot be compiled")
+    emit = EMIT.get(node.op)
+    if emit is not None:
+        return emit(*args, **attrs)
+    if node.op in FORWARD and node.shape is not None:
+        out = f"xp.empty({node.shape!r}, {node.dtype.str!r})"
+        return f"FORWARD[{node.op!r}](xp, {out}, {', '.join(args)}, **{attrs!r})"
+    raise NotImplementedError(f"Op '{node.op}' cannot be compiled")
+
+
+def function_source(fname, params, nodes, returns, names):
+    """
+    Source of `def fname(*params): ...; return returns`.
+
+    Args:
+        params (list): Tracers passed as arguments.
+        nodes (list): Op tracers to compute, in order.
+        returns (list): Tracers (or None) returned as a tuple; a nested list
+            is returned as a nested tuple.
+        names (dict): Variable name (or literal) per tracer id.
+    """
+    flat_returns = [r for item in returns for r in (item if isinstance(item, list) else [item])]
+    keep = {id(r) for r in flat_returns if r is not None} | {id(p) for p in params}
+    last_use = {}
+    for i, node in enumerate(nodes):
+        for parent in node.parents:
+            last_use[id(parent)] = i
+
+    lines = [f"def {fname}({', '.join(names[id(p)] for p in params)}):"]
+    dead_after = {}
+    for key, i in last_use.items():
+        if key not in keep and names[key].startswith('v'):
+            dead_after.setdefault(i, []).append(names[key])
+    for i, node in enumerate(nodes):
+        lines.append(f"    {names[id(node)]} = {expression(node, [names[id(p)] for p in node.parents])}")
+        if i in dead_after:
+            lines.append(f"    del {', '.join(sorted(set(dead_after[i])))}")
+
+    def ret(item):
+        if isinstance(item, list):
+            return "(" + "".join(f"{ret(r)}, " for r in item) + ")"
+        return "None" if item is None else names[id(item)]
+
+    lines.append(f"    return {', '.join(ret(r) for r in returns)}")
+    return "\n".join(lines) + "\n"
+
+
+def compile_source(source, fname, xp, tag):
+    """Executes generated `source` and returns the function `fname` it defines."""
+    filename = f"<deriv.codegen {tag}>"
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    namespace = {'xp': xp, '_unbroadcast': unbroadcast, 'FORWARD': FORWARD, 'BACKWARD': BACKWARD}
+    exec(compile(source, filename, 'exec'), namespace)
+    return namespace[fname]
@@ -0,0 +1,178 @@
+from deriv.Array.array_object import array
+from deriv.Array.backend import get_backend
+from deriv.Array.grad_mode import enable_grad, record_constants
+from deriv.Array.reversed_mode_autodiff import _topo_order
+from deriv.codegen.tracer import Tracer, lift
+
+# Ops whose operands can be swapped without changing the result.
+COMMUTATIVE = frozenset(['+', '*'])
+
+
+def _attrs_key(attrs):
+    if not attrs:
+        return ()
+    try:
+        key = tuple(sorted(attrs.items()))
+        hash(key)
+        return key
+    except TypeError:
+        return repr(sorted(attrs.items()))
+
+
+def _leaf_key(leaf):
+    value = leaf.value
+    if leaf.op == 'const' and getattr(value, 'ndim', 0) == 0:
+        dtype = getattr(value, 'dtype', type(value))
+        scalar = value.item() if hasattr(value, 'item') else value
+        if scalar == scalar:  # NaN never equals itself
+            return ('scalar', str(dtype), scalar)
+    return (leaf.op, id(value))
+
+
+class Graph:
+    """
+    A traced program: the values reachable from `outputs`, in topological
+    order.
+
+    Args:
+        inputs (list): The 'input' tracers, in argument order. They stay
+            part of the program even when no output reads them.
+        outputs (list): The tracers the program computes.
+
+    Attributes:
+        nodes (list): All values reachable from the outputs (leaves
+            included), parents before children.
+    """
+
+    def __init__(self, inputs, outputs):
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self._sort()
+
+    def _sort(self):
+        root = Tracer('', 'output', self.outputs)
+        self.nodes = _topo_order(root)[0][:-1]
+
+    @property
+    def leaves(self):
+        return [node for node in self.nodes if not node.parents]
+
+    @property
+    def ops(self):
+        return [node for node in self.nodes if node.parents]
+
+    def dce(self):
+        """
+        Dead-code elimination: drops the values no output depends on.
+
+        Returns:
+            int: Number of values removed.
+        """
+        before = len(self.nodes)
+        self._sort()
+        return before - len(self.nodes)
+
+    def cse(self):
+        """
+        Common-subexpression elimination: values computed by the same op with
+        the same attrs from the same operands (in any order for `+` and `*`)
+        are merged, and so are equal scalar constants and repeated leaves of
+        the same array. Merged values are removed by a final `dce`.
+
+        Returns:
+            int: Number of values merged away.
+        """
+        canonical = {}
+        replace = {}
+        merged = 0
+        for node in self.nodes:
+            if node.parents:
+                node.parents = tuple(replace.get(id(p), p) for p in node.parents)
+                operands = tuple(id(p) for p in node.parents)
+                if node.op in COMMUTATIVE:
+                    operands = tuple(sorted(operands))
+                key = (node.op, _attrs_key(node.attrs), operands)
+            elif node.op in ('param', 'const'):
+                key = _leaf_key(node)
+            else:
+                continue
+            keep = canonical.setdefault(key, node)
+            if keep is not node:
+                replace[id(node)] = keep
+                merged += 1
+        self.outputs = [replace.get(id(out), out) for out in self.outputs]
+        self.dce()
+        return merged
+
+    def optimize(self):
+        """Runs `cse` and `dce`; returns the number of values removed."""
+        return self.cse() + self.dce()
+
+    def __str__(self):
+        names = {}
+        lines = []
+        for node in self.nodes:
+            if not node.parents:
+                names[id(node)] = node.name if node.op != 'const' else f"const {node.name}"
+                if node.op != 'const':
+                    lines.append(f"{node.op} {node.name}: {node.shape} {node.dtype}")
+                continue
+            names[id(node)] = f"%{len(names)}"
+            args = ", ".join(names[id(p)] for p in node.parents)
+            attrs = "".join(f", {k}={v!r}" for k, v in (node.attrs or {}).items())
+            lines.append(f"{names[id(node)]} = {node.op}({args}{attrs}): {node.shape} {node.dtype}")
+        lines.append("return " + ", ".join(names[id(out)] for out in self.outputs))
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"Graph(inputs={len(self.inputs)}, ops={len(self.ops)}, outputs={len(self.outputs)})"
+
+
+def trace(fn, example_inputs):
+    """
+    deriv.codegen.trace(fn, example_inputs)
+
+    Traces `fn` into a `Graph`.
+
+    With `array` (or array_like) example inputs, `fn` runs once on copies
+    of them with every op recorded, as in `deriv.capture`, and the recorded
+    graph becomes the IR with the static shape and dtype of every value.
+    Arrays that need a gradient and are not inputs become 'param' leaves
+    read by reference; every other leaf is frozen as a 'const'. Python
+    control flow is specialized to the example inputs.
+
+    With `Tracer` example inputs, `fn` is called on them directly and builds
+    a symbolic IR without shapes.
+
+    Returns:
+        Graph: A single-output graph.
+    """
+    if any(isinstance(x, Tracer) for x in example_inputs):
+        tracers = [lift(x) for x in example_inputs]
+        return Graph([t for t in tracers if t.op == 'input'], [lift(fn(*tracers))])
+
+    xp = get_backend()
+    inputs = []
+    for value in example_inputs:
+        if isinstance(value, array):
+            inputs.append(array(xp.array(value.data, copy=True), need_grad=value.need_grad))
+        else:
+            inputs.append(array(xp.array(value, copy=True)))
+
+    with enable_grad(), record_constants():
+        output = fn(*inputs)
+    if not isinstance(output, array):
+        raise TypeError(f"Traced function must return an array, got {type(output)}")
+
+    tracer_of = {}
+    for i, x in enumerate(inputs):
+        tracer_of[id(x)] = Tracer(f"x{i}", 'input', shape=x.data.shape, dtype=x.data.dtype, need_grad=x.need_grad)
+    for node in output.topo():
+        if id(node) in tracer_of:
+            continue
+        if node.parents:
+            tracer_of[id(node)] = Tracer(None, node.op, tuple(tracer_of[id(p)] for p in node.parents), node.attrs,
+                                         node.data.shape, node.data.dtype, need_grad=node.need_grad)
+        else:
+            tracer_of[id(node)] = lift(node)
+    return Graph([tracer_of[id(x)] for x in inputs], [tracer_of[id(output)]])
@@ -0,0 +1,229 @@
+import functools
+import itertools
+
+from deriv.Array.array_object import array, _make_node
+from deriv.Array.backend import get_backend
+from deriv.Array.grad_mode import is_grad_enabled
+from deriv.codegen.autodiff import gradients
+from deriv.codegen.emit import function_source, compile_source, literal
+from deriv.codegen.ir import Graph, trace
+from deriv.codegen.tracer import Tracer
+
+_tags = itertools.count()
+
+# Helper ops whose result may be a view of (or the same object as) another value.
+_ALIASING = frozenset(['expand', 'T', 'item', 'unbroadcast'])
+
+
+class Compiled:
+    """
+    Generated forward and backward functions for one traced `Graph`.
+
+    The forward function takes the data of every leaf (inputs, params,
+    non-scalar constants) and returns the output and the values the backward
+    needs. The backward function takes the output gradient, the same leaf
+    data and the saved values, and returns one gradient per `targets` entry.
+    Both are straight-line NumPy code; see `forward_source` and
+    `backward_source`.
+
+    Args:
+        graph (Graph): A single-output program; it is optimized in place.
+        with_grad (bool): Also generate the backward function.
+
+    Attributes:
+        graph (Graph): The forward program after CSE and DCE.
+        params (list): `array` parameters, read by reference on each call.
+        targets (list): Leaves that receive gradients ('input' or 'param').
+        removed (int): Values removed by CSE and DCE over forward + backward.
+        forward_source (str): Source of the generated forward.
+        backward_source (str): Source of the generated backward, or None.
+    """
+
+    def __init__(self, graph, with_grad=True):
+        self.graph = graph
+        self.removed = graph.optimize()
+        output = graph.outputs[0]
+        tag = next(_tags)
+        self.xp = get_backend()
+
+        params = [leaf for leaf in graph.leaves if leaf.op == 'param']
+        self.targets = [leaf for leaf in graph.inputs + params if leaf.need_grad]
+        self.backward = self.backward_source = None
+        joint = graph
+        seed = Tracer('g', 'seed', shape=output.shape, dtype=output.dtype, need_grad=False)
+        if with_grad and self.targets and output.need_grad:
+            grads = gradients(graph, self.targets, seed)
+            joint = Graph(graph.inputs, [output] + grads)
+            self.removed += joint.optimize()
+            grads = joint.outputs[1:]
+
+        names = {}
+        consts = []
+        for i, leaf in enumerate(graph.inputs):
+            names[id(leaf)] = f"x{i}"
+        n_params = 0
+        for node in joint.nodes:
+            if id(node) in names:
+                continue
+            if node.op == 'param':
+                names[id(node)] = f"p{n_params}"
+                n_params += 1
+            elif node.op == 'const':
+                names[id(node)] = literal(node) or f"c{len(consts)}"
+                if names[id(node)][0] == 'c':
+                    consts.append(node)
+            elif node.op == 'seed':
+                names[id(node)] = 'g'
+            elif node.op == 'input':
+                raise ValueError(f"Input {node.name} is not an argument of the traced program")
+            else:
+                names[id(node)] = f"v{len(names)}"
+        self.params = [node.value for node in joint.nodes if node.op == 'param']
+        self._consts = [node.value for node in consts]
+        args = list(graph.inputs) + [node for node in joint.nodes if node.op == 'param'] + consts
+
+        if joint is graph:
+            ops = [node for node in graph.nodes if node.parents]
+            self.forward_source = function_source('forward', args, ops, [output, []], names)
+        else:
+            # Values the forward output does not need are computed in the
+            # backward when they depend on the seed, or are transposes or
+            # functions of leaves only, which are cheaper to recompute than
+            # to keep alive between the two passes.
+            needed = {id(node) for node in graph.nodes}
+            backward = set()
+            for node in joint.nodes:
+                if node.op == 'seed' or any(id(p) in backward for p in node.parents):
+                    backward.add(id(node))
+                elif node.parents and id(node) not in needed and (
+                        node.op == 'T' or all(not p.parents or id(p) in backward for p in node.parents)):
+                    backward.add(id(node))
+            backward_ops = [node for node in joint.nodes if id(node) in backward and node.parents]
+            saved = []
+            seen = set()
+            for node in backward_ops:
+                for parent in node.parents:
+                    if parent.parents and id(parent) not in backward and id(parent) not in seen:
+                        seen.add(id(parent))
+                        saved.append(parent)
+            forward_ops = [node for node in Graph(graph.inputs, [output] + saved).nodes if node.parents]
+            self.forward_source = function_source('forward', args, forward_ops, [output, saved], names)
+            self.backward_source = function_source('backward', [seed] + args + saved, backward_ops, [grads], names)
+            counts = {}
+            for grad in grads:
+                if grad is not None:
+                    counts[id(grad)] = counts.get(id(grad), 0) + 1
+            self.owned = [grad is not None and grad.parents != () and grad.op not in _ALIASING
+                          and counts[id(grad)] == 1 for grad in grads]
+            self.backward = compile_source(self.backward_source, 'backward', self.xp, f"backward {tag}")
+        self.forward = compile_source(self.forward_source, 'forward', self.xp, f"forward {tag}")
+        self._input_index = {id(leaf): i for i, leaf in enumerate(graph.inputs)}
+
+    def _leaf_data(self, inputs):
+        return [x.data for x in inputs] + [p.data for p in self.params] + self._consts
+
+    def __call__(self, *inputs):
+        """
+        Runs the generated forward on `inputs` (`array`s, one per traced
+        input) and returns the output as an `array`. When gradients are
+        generated and needed, the output is a single graph node whose
+        backward runs the generated backward and accumulates into the
+        inputs and parameters.
+        """
+        xp = self.xp
+        leaf_data = self._leaf_data(inputs)
+        out_data, saved = self.forward(*leaf_data)
+        out_data = xp.asarray(out_data)
+        if self.backward is None:
+            return array(out_data)
+        targets = [inputs[self._input_index[id(t)]] if t.op == 'input' else t.value for t in self.targets]
+        out = _make_node(out_data, tuple(targets), 'jit')
+        if not out.parents:
+            return out
+        backward, owned = self.backward, self.owned
+
+        def JITBackward():
+            grads = backward(out.grad, *leaf_data, *saved)
+            for target, grad, own in zip(targets, grads, owned):
+                if grad is not None and target.need_grad:
+                    target._accumulate(xp.asarray(grad), owned=own)
+        out._back = JITBackward
+        return out
+
+
+class JITFunction:
+    """
+    A function compiled by `deriv.jit`.
+
+    Calls are dispatched on the shapes, dtypes and `need_grad` flags of the
+    inputs and on whether grad mode is enabled. The first call with a new
+    signature traces the function (`deriv.codegen.trace`) and generates its
+    forward and backward (`Compiled`); later calls with the same signature
+    only run the generated code.
+
+    Attributes:
+        cache (dict): `Compiled` per call signature.
+    """
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.cache = {}
+        functools.update_wrapper(self, fn)
+
+    def _signature(self, inputs):
+        return tuple((x.data.shape, x.data.dtype.str, x.need_grad) for x in inputs) + (is_grad_enabled(),)
+
+    def lookup(self, *inputs):
+        """Returns the `Compiled` specialization for `inputs`, tracing it on first use."""
+        inputs = [x if isinstance(x, array) else array(x) for x in inputs]
+        key = self._signature(inputs)
+        compiled = self.cache.get(key)
+        if compiled is None:
+            compiled = self.cache[key] = Compiled(trace(self.fn, inputs), with_grad=key[-1])
+        return compiled
+
+    def __call__(self, *inputs):
+        inputs = [x if isinstance(x, array) else array(x) for x in inputs]
+        compiled = self.cache.get(self._signature(inputs))
+        if compiled is None:
+            compiled = self.lookup(*inputs)
+        return compiled(*inputs)
+
+    def clear(self):
+        """Drops every compiled specialization, e.g. after swapping parameters."""
+        self.cache.clear()
+
+
+def jit(fn):
+    """
+    deriv.jit(fn)
+
+    Compiles a function of `array`s into generated NumPy code.
+
+    `fn` is traced once per input signature into the codegen IR, which is
+    differentiated, cleaned up by common-subexpression and dead-code
+    elimination, and emitted as two straight-line Python functions: a
+    forward and its analytic backward. Calling the result runs the
+    generated forward and returns an `array`; its `backward()` runs the
+    generated backward and accumulates into the inputs and parameters,
+    with no graph node or closure per op.
+
+    As with `deriv.capture`, parameters are read by reference (in-place
+    optimizer updates are seen), other values computed outside deriv ops
+    are frozen at trace time, and Python control flow is specialized to
+    the traced inputs.
+
+    Args:
+        fn: Function taking `array`s and returning an `array`. Also usable
+            as a decorator.
+
+    Returns:
+        JITFunction: Callable with the same arguments as `fn`.
+
+    Example:
+        >>> step = deriv.jit(lambda x, y: loss_fn(model(x), y))
+        >>> loss = step(x, y)
+        >>> loss.backward()
+        >>> print(step.lookup(x, y).backward_source)
+    """
+    return JITFunction(fn)
@@ -0,0 +1,143 @@
+import itertools
+
+from deriv.Array.array_object import array
+
+_names = itertools.count()
+
+
+def lift(value):
+    """Wraps a non-`Tracer` operand as a leaf: arrays needing grad become 'param', everything else 'const'."""
+    if isinstance(value, Tracer):
+        return value
+    if isinstance(value, array):
+        if value.need_grad:
+            return Tracer(value.var_name or None, 'param', shape=value.data.shape, dtype=value.data.dtype,
+                          value=value, need_grad=True)
+        value = value.data
+    shape = getattr(value, 'shape', ())
+    return Tracer(repr(value), 'const', shape=shape, dtype=getattr(value, 'dtype', None), value=value,
+                  need_grad=False)
+
+
+class Tracer:
+    """
+    A value of a traced program, i.e. one node of the codegen IR.
+
+    Leaves have no parents and one of the ops
+
+        'input'   an argument of the traced function
+        'param'   an `array` that needs a gradient, read by reference
+                  (`value` is the array, so in-place updates are seen)
+        'const'   a frozen value (`value` is the data or a Python scalar)
+        'seed'    the output gradient fed to a generated backward
+
+    Every other op is an op of `deriv.Array.op_table` or one of the helper
+    ops of `deriv.codegen.emit`, applied to `parents` with static `attrs`.
+
+    Tracers support the arithmetic operators and the reductions of `array`,
+    so functions written against tracers (see `deriv.nn.functional`) build
+    the IR directly. Such symbolic traces carry no shapes; traces of real
+    `array` code (`deriv.codegen.trace`) record the shape and dtype of
+    every value.
+
+    Args:
+        name (str, optional): Display name; a fresh `%n` name by default.
+        op (str): The op producing the value.
+        parents (tuple): Operand tracers.
+        attrs (dict, optional): Static arguments of the op.
+        shape (tuple, optional): Static shape, if known.
+        dtype (optional): Static dtype, if known.
+        value: Payload of 'param' and 'const' leaves.
+        need_grad (bool, optional): Defaults to whether any parent needs it.
+    """
+
+    __slots__ = ('name', 'op', 'parents', 'attrs', 'shape', 'dtype', 'value', 'need_grad')
+
+    def __init__(self, name=None, op='input', parents=(), attrs=None, shape=None, dtype=None, value=None,
+                 need_grad=None):
+        self.name = name if name is not None else f"%{next(_names)}"
+        self.op = op
+        self.parents = tuple(parents)
+        self.attrs = attrs
+        self.shape = tuple(shape) if shape is not None else None
+        self.dtype = dtype
+        self.value = value
+        if need_grad is None:
+            need_grad = any(p.need_grad for p in self.parents)
+        self.need_grad = need_grad
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return f"Tracer({self.name!r}, op={self.op!r}, shape={self.shape})"
+
+    def _apply(self, op, *others, **attrs):
+        return Tracer(None, op, (self,) + tuple(map(lift, others)), attrs or None)
+
+    def _rapply(self, op, other):
+        return Tracer(None, op, (lift(other), self))
+
+    def __add__(self, other):
+        return self._apply('+', other)
+
+    def __radd__(self, other):
+        return self._rapply('+', other)
+
+    def __sub__(self, other):
+        return self._apply('-', other)
+
+    def __rsub__(self, other):
+        return self._rapply('-', other)
+
+    def __mul__(self, other):
+        return self._apply('*', other)
+
+    def __rmul__(self, other):
+        return self._rapply('*', other)
+
+    def __truediv__(self, other):
+        return self._apply('/', other)
+
+    def __rtruediv__(self, other):
+        return self._rapply('/', other)
+
+    def __pow__(self, other):
+        return self._apply('**', other)
+
+    def __rpow__(self, other):
+        return self._rapply('**', other)
+
+    def __matmul__(self, other):
+        return self._apply('@', other)
+
+    def __rmatmul__(self, other):
+        return self._rapply('@', other)
+
+    def __neg__(self):
+        return self._apply('neg')
+
+    def __lt__(self, other):
+        return Tracer(None, '<', (self, lift(other)), need_grad=False)
+
+    def __le__(self, other):
+        return Tracer(None, '<=', (self, lift(other)), need_grad=False)
+
+    def __gt__(self, other):
+        return Tracer(None, '>', (self, lift(other)), need_grad=False)
+
+    def __ge__(self, other):
+        return Tracer(None, '>=', (self, lift(other)), need_grad=False)
+
+    @property
+    def T(self):
+        return self._apply('T')
+
+    def sum(self, axis=None, keepdims=False):
+        return self._apply('sum', axis=axis, keepdims=keepdims)
+
+    def mean(self, axis=None):
+        return self._apply('mean', axis=axis)
+
+    def max(self, axis=None, keepdims=False):
+        return self._apply('max', axis=axis, keepdims=keepdims)
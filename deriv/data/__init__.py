@@ -0,0 +1,3 @@
+from .dataset import Dataset, ArrayDataset, NpyDataset
+from .sampler import SequentialSampler, RandomSampler, BatchSampler
+from .loader import DataLoader
\ No newline at end of file
@@ -0,0 +1,73 @@
+import numpy as np
+
+
+class Dataset:
+    """
+    Base class for datasets of equally shaped samples stored in fields
+    (e.g. inputs and targets). Subclasses set `fields`, a list of host
+    arrays indexed by sample along axis 0.
+
+    Datasets live in host memory (NumPy or `np.memmap`) regardless of the
+    backend; the loader moves batches to the device.
+    """
+
+    fields = ()
+    #: Sort the indices of a batch before reading them, so that reads from
+    #: disk-backed fields go forward through the file.
+    sorted_reads = False
+
+    def __len__(self):
+        return len(self.fields[0])
+
+    def sample_shapes(self):
+        """Shape of one sample, per field."""
+        return [f.shape[1:] for f in self.fields]
+
+    def dtypes(self):
+        return [f.dtype for f in self.fields]
+
+    def fetch(self, indices, out):
+        """
+        Gathers the samples at `indices` into the preallocated `out` buffers
+        (one per field, first dimension `len(indices)`), without allocating.
+        """
+        if self.sorted_reads:
+            indices = np.sort(indices)
+        for field, buf in zip(self.fields, out):
+            np.take(field, indices, axis=0, out=buf)
+
+
+class ArrayDataset(Dataset):
+    """
+    Dataset over in-memory or memory-mapped arrays.
+
+    Args:
+        *arrays: Arrays with the same length along axis 0. `np.memmap`
+            arrays are read lazily, so they can be larger than RAM.
+    """
+
+    def __init__(self, *arrays):
+        if not arrays:
+            raise ValueError("ArrayDataset needs at least one array")
+        n = len(arrays[0])
+        for a in arrays:
+            if len(a) != n:
+                raise ValueError(f"All arrays must have the same length, got {[len(a) for a in arrays]}")
+        self.fields = list(arrays)
+        self.sorted_reads = any(isinstance(a, np.memmap) for a in arrays)
+
+
+class NpyDataset(ArrayDataset):
+    """
+    Dataset over `.npy` files, memory-mapped so that only the batches that
+    are read are paged in. Suited for datasets larger than RAM.
+
+    Args:
+        *paths: One `.npy` file per field (e.g. `"x.npy", "y.npy"`).
+        mmap_mode (str): Passed to `np.load`; 'r' maps the files read-only.
+    """
+
+    def __init__(self, *paths, mmap_mode='r'):
+        self.paths = paths
+        super().__init__(*[np.load(path, mmap_mode=mmap_mode) for path in paths])
+        self.sorted_reads = mmap_mode is not None
@@ -0,0 +1,110 @@
+from collections import deque
+from itertools import cycle
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from deriv.Array.array_object import array
+from deriv.Array.backend import get_backend, is_gpu
+from deriv.data.sampler import SequentialSampler, RandomSampler, BatchSampler
+
+
+def _host_buffer(shape, dtype):
+    """Batch buffer in host memory; page-locked when batches go to the GPU."""
+    if is_gpu():
+        import cupy as cp
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        mem = cp.cuda.alloc_pinned_memory(max(nbytes, 1))
+        return np.frombuffer(mem, dtype, int(np.prod(shape))).reshape(shape)
+    return np.empty(shape, dtype)
+
+
+class DataLoader:
+    """
+    Iterates over a dataset in mini-batches, reading ahead in the background.
+
+    Batches are gathered by a thread pool into a ring of preallocated batch
+    buffers while the training step runs, so reading (including page faults
+    on memory-mapped files, which release the GIL) overlaps with compute.
+    On the CPU backend the yielded arrays are views of the ring buffers, not
+    copies: a batch stays valid until the next one is requested. On the GPU
+    backend the ring is page-locked and each batch is copied to the device.
+
+    Args:
+        dataset (Dataset): Source of samples, e.g. `NpyDataset`.
+        batch_size (int): Samples per batch.
+        shuffle (bool): Draw a new random order every epoch.
+        drop_last (bool): Skip the last, smaller batch.
+        num_workers (int): Reader threads; 0 reads on the calling thread.
+        prefetch (int): Batches read ahead of the one in use.
+        seed (int, optional): Seed for shuffling.
+
+    Yields:
+        One `array` per dataset field (a tuple if there are several).
+
+    Example:
+        >>> loader = DataLoader(NpyDataset("x.npy", "y.npy"), batch_size=256, shuffle=True, num_workers=4)
+        >>> for x, y in loader:
+        ...     loss = loss_fn(model(x), y)
+    """
+
+    def __init__(self, dataset, batch_size=1, shuffle=False, drop_last=False, num_workers=1, prefetch=2,
+                 seed=None):
+        self.dataset = dataset
+        sampler = RandomSampler(len(dataset), seed) if shuffle else SequentialSampler(len(dataset))
+        self.batch_sampler = BatchSampler(sampler, batch_size, drop_last)
+        self.num_workers = num_workers
+        self.prefetch = max(prefetch, 1) if num_workers else 0
+        self.batch_size = batch_size
+        self._ring = None
+
+    def __len__(self):
+        return len(self.batch_sampler)
+
+    def _buffers(self):
+        """Allocates the ring once: `prefetch + 1` slots, one buffer per field each."""
+        if self._ring is None:
+            shapes, dtypes = self.dataset.sample_shapes(), self.dataset.dtypes()
+            self._ring = [[_host_buffer((self.batch_size,) + shape, dtype) for shape, dtype in zip(shapes, dtypes)]
+                          for _ in range(self.prefetch + 1)]
+        return self._ring
+
+    def _fill(self, slot, indices):
+        out = [buf[:len(indices)] for buf in slot]
+        self.dataset.fetch(indices, out)
+        return out
+
+    def _wrap(self, batch):
+        xp = get_backend()
+        arrays = tuple(array(xp.asarray(b) if is_gpu() else b) for b in batch)
+        return arrays if len(arrays) > 1 else arrays[0]
+
+    def __iter__(self):
+        ring = self._buffers()
+        batches = iter(self.batch_sampler)
+        if not self.num_workers:
+            for indices in batches:
+                yield self._wrap(self._fill(ring[0], indices))
+            return
+
+        pending = deque()
+        slots = cycle(ring)
+        pool = ThreadPoolExecutor(self.num_workers)
+
+        def submit():
+            indices = next(batches, None)
+            if indices is not None:
+                pending.append(pool.submit(self._fill, next(slots), indices))
+
+        try:
+            # `prefetch` batches in flight while the consumer holds one slot.
+            for _ in range(self.prefetch):
+                submit()
+            while pending:
+                batch = pending.popleft().result()
+                submit()
+                yield self._wrap(batch)
+        finally:
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=True)
@@ -0,0 +1,68 @@
+import numpy as np
+
+
+class SequentialSampler:
+    """Yields the sample indices `0 .. n-1` in order."""
+
+    def __init__(self, n):
+        self.n = n
+
+    def __len__(self):
+        return self.n
+
+    def __iter__(self):
+        return iter(np.arange(self.n))
+
+    def indices(self):
+        """All indices of one epoch as an array."""
+        return np.arange(self.n)
+
+
+class RandomSampler:
+    """
+    Yields a new random permutation of `0 .. n-1` every epoch.
+
+    Args:
+        n (int): Number of samples.
+        seed (int, optional): Seed of the permutation stream.
+    """
+
+    def __init__(self, n, seed=None):
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.n
+
+    def __iter__(self):
+        return iter(self.indices())
+
+    def indices(self):
+        return self.rng.permutation(self.n)
+
+
+class BatchSampler:
+    """
+    Groups the indices of a sampler into mini-batches of index arrays.
+
+    Args:
+        sampler: `SequentialSampler` or `RandomSampler`.
+        batch_size (int): Samples per batch.
+        drop_last (bool): Drop the last batch if it is smaller than `batch_size`.
+    """
+
+    def __init__(self, sampler, batch_size, drop_last=False):
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        self.sampler = sampler
+        self.batch_size = batch_size
+        self.drop_last = drop_last
+
+    def __len__(self):
+        n = len(self.sampler)
+        return n // self.batch_size if self.drop_last else -(-n // self.batch_size)
+
+    def __iter__(self):
+        indices = self.sampler.indices()
+        for start in range(0, len(self) * self.batch_size, self.batch_size):
+            yield indices[start:start + self.batch_size]
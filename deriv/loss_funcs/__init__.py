@@ -1 +1,4 @@
-from .cce import SoftmaxCrossEntropy
\ No newline at end of file
+from .cce import SoftmaxCrossEntropy
+from .mse import MSE
+from .bce import BCEWithLogits
+from .huber import Huber
\ No newline at end of file
@@ -0,0 +1,49 @@
+from deriv.Array.array_object import unbroadcast
+from deriv.Array.higher_order import VJP
+from deriv.Array.op_table import FORWARD, BACKWARD, SAVES, JVP
+
+REDUCTIONS = ('mean', 'sum')
+
+
+def check_reduction(reduction):
+    if reduction not in REDUCTIONS:
+        raise ValueError(f"reduction must be one of {REDUCTIONS}, got {reduction!r}")
+    return reduction
+
+
+def divisor(xp, pred, target, reduction):
+    """Number of loss terms averaged over by `reduction`."""
+    return xp.broadcast(pred, target).size if reduction == 'mean' else 1
+
+
+def _scalar_jvp(backward):
+    """
+    JVP of a scalar loss from its backward rule: the loss changes by the dot
+    product of its gradient with the tangent of each input.
+    """
+    def rule(xp, out, inputs, tangents, batched, **attrs):
+        needs = tuple(t is not None for t in tangents)
+        grads = backward(xp, xp.ones_like(out), out, inputs, needs, **attrs)
+        total = 0.0
+        for x, t, grad in zip(inputs, tangents, grads):
+            if t is None or grad is None:
+                continue
+            term = unbroadcast(grad, x.shape) * t
+            total = total + (term.reshape(term.shape[0], -1).sum(axis=1) if batched else term.sum())
+        return total
+    return rule
+
+
+def register(op, forward, backward, saves, vjp=None):
+    """
+    Adds a fused loss to the op tables, so graphs that contain it can be
+    captured (`deriv.capture`), recorded (`deriv.compact_tape`) and run in
+    forward mode (`deriv.jvp`). `vjp` is its backward written with array
+    ops, for `deriv.grad` and `deriv.hvp`.
+    """
+    FORWARD[op] = forward
+    BACKWARD[op] = backward
+    SAVES[op] = saves
+    JVP[op] = _scalar_jvp(backward)
+    if vjp is not None:
+        VJP[op] = vjp
@@ -0,0 +1,86 @@
+from deriv import array, unbroadcast
+from deriv.Array.array_object import _make_node
+from deriv.Array.backend import get_backend
+from deriv.Array.higher_order import sum_to
+from deriv.loss_funcs._reduction import check_reduction, divisor, register
+from deriv.nn.non_linear import Tanh
+
+
+def _forward(xp, out, logits, target, reduction='mean'):
+    # max(x, 0) - x * y + log(1 + exp(-|x|)), stable for large |x|
+    loss = xp.abs(logits)
+    xp.negative(loss, out=loss)
+    xp.exp(loss, out=loss)
+    xp.log1p(loss, out=loss)
+    loss = loss + xp.maximum(logits, 0)
+    loss -= logits * target
+    out[...] = loss.sum() / divisor(xp, logits, target, reduction)
+    return out
+
+
+def _backward(xp, g, out, inputs, needs, reduction='mean'):
+    logits, target = inputs
+    scale = g / divisor(xp, logits, target, reduction)
+    grad = grad_target = None
+    if needs[0]:
+        # sigmoid(x) = (1 + tanh(x / 2)) / 2
+        grad = xp.multiply(logits, 0.5)
+        xp.tanh(grad, out=grad)
+        grad += 1
+        grad *= 0.5
+        grad = grad - target
+        grad *= scale
+    if needs[1]:
+        grad_target = xp.multiply(logits, -scale)
+    return [grad, grad_target]
+
+
+def _vjp(out, g, inputs, needs, reduction='mean'):
+    logits, target = inputs
+    scale = g / divisor(get_backend(), logits.data, target.data, reduction)
+    grad = grad_target = None
+    if needs[0]:
+        grad = sum_to(((Tanh()(logits * 0.5) + 1.0) * 0.5 - target) * scale, logits.data.shape)
+    if needs[1]:
+        grad_target = sum_to(-(logits * scale), target.data.shape)
+    return [grad, grad_target]
+
+
+register('bce_logits', _forward, _backward, ((0, 1), False), _vjp)
+
+
+class BCEWithLogits:
+    """
+    Fused binary cross-entropy on raw logits.
+
+    Computes `max(x, 0) - x * y + log(1 + exp(-|x|))` as a single graph node,
+    which is stable for large logits and needs no separate sigmoid. Backward
+    is `sigmoid(x) - y`, recomputed from the logits.
+
+    Args:
+        reduction (str): 'mean' or 'sum'.
+    """
+
+    def __init__(self, reduction='mean'):
+        self.reduction = check_reduction(reduction)
+
+    def __call__(self, logits: 'array', target: 'array') -> 'array':
+        xp = get_backend()
+        if not isinstance(target, array):
+            target = array(target)
+        reduction = self.reduction
+
+        out = _make_node(_forward(xp, xp.empty(()), logits.data, target.data, reduction),
+                         (logits, target), 'bce_logits', {'reduction': reduction})
+        if not out.parents:
+            return out
+
+        def BCEBackward():
+            grads = _backward(xp, out.grad, out.data, (logits.data, target.data),
+                              (logits.need_grad, target.need_grad), reduction)
+            for x, grad in zip((logits, target), grads):
+                if grad is not None:
+                    x._accumulate(unbroadcast(grad, x.data.shape))
+        out._back = BCEBackward
+
+        return out
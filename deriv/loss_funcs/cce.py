@@ -1,29 +1,124 @@
-from deriv import array, exp, log, sum as dsum, mean
+from deriv import array
+from deriv.Array.array_object import _make_node
 from deriv.Array.backend import get_backend
+from deriv.Array.AMath import exp
+from deriv.loss_funcs._reduction import check_reduction, register
+
+
+def _log_softmax(xp, logits, axis):
+    """Numerically stable log-softmax in a single new buffer."""
+    logp = logits - logits.max(axis=axis, keepdims=True)
+    lse = xp.exp(logp).sum(axis=axis, keepdims=True)
+    xp.log(lse, out=lse)
+    logp -= lse
+    return logp
+
+
+def _class_rows(xp, values, targets, axis):
+    """(rows, cols) that pick the target class of every sample from `values`."""
+    if axis not in (-1, values.ndim - 1):
+        raise ValueError("Integer class targets need the class axis to be the last one")
+    flat = values.reshape(-1, values.shape[-1])
+    return flat, (xp.arange(flat.shape[0]), targets.reshape(-1))
+
+
+def _nll(xp, logp, targets, axis, reduction):
+    """Negative log-likelihood of the targets under `logp`."""
+    if xp.issubdtype(targets.dtype, xp.integer):
+        flat, index = _class_rows(xp, logp, targets, axis)
+        total = -flat[index].sum()
+    else:
+        total = -(logp * targets).sum()
+    n = logp.size // logp.shape[axis] if reduction == 'mean' else 1
+    return total / n
+
+
+def _forward(xp, out, logits, targets, axis=-1, reduction='mean'):
+    out[...] = _nll(xp, _log_softmax(xp, logits, axis), targets, axis, reduction)
+    return out
+
+
+def _grad_from_probs(xp, probs, targets, g, axis, reduction):
+    """(softmax - targets) * g / n, written into a copy of `probs`."""
+    if xp.issubdtype(targets.dtype, xp.integer):
+        grad = probs.copy()
+        flat, index = _class_rows(xp, grad, targets, axis)
+        flat[index] -= 1
+    else:
+        grad = xp.subtract(probs, targets)
+    n = probs.size // probs.shape[axis] if reduction == 'mean' else 1
+    grad *= g / n
+    return grad
+
+
+def _backward(xp, g, out, inputs, needs, axis=-1, reduction='mean'):
+    logits, targets = inputs
+    if not needs[0]:
+        return [None, None]
+    probs = xp.exp(_log_softmax(xp, logits, axis))
+    return [_grad_from_probs(xp, probs, targets, g, axis, reduction), None]
+
+
+def _vjp(out, g, inputs, needs, axis=-1, reduction='mean'):
+    logits, targets = inputs
+    if not needs[0]:
+        return [None, None]
+    xp = get_backend()
+    shifted = exp(logits - array(logits.data.max(axis=axis, keepdims=True)))
+    probs = shifted / shifted.sum(axis=axis, keepdims=True)
+    if xp.issubdtype(targets.data.dtype, xp.integer):
+        one_hot = xp.zeros_like(logits.data)
+        flat, index = _class_rows(xp, one_hot, targets.data, axis)
+        flat[index] = 1
+        targets = array(one_hot)
+    n = logits.data.size // logits.data.shape[axis] if reduction == 'mean' else 1
+    return [(probs - targets) * (g / n), None]
+
+
+register('cce', _forward, _backward, ((0, 1), False), _vjp)
+
 
 class SoftmaxCrossEntropy:
-    def __init__(self, axis=-1):
+    """
+    Fused softmax cross-entropy on raw logits.
+
+    The loss is a single graph node: the forward pass computes a stable
+    log-softmax, and backward recomputes the softmax from the logits and
+    computes `(softmax - targets) / n` directly. Nothing besides the logits
+    is kept, and captured replays see the current logits.
+
+    Args:
+        axis (int): Class axis of the logits.
+        reduction (str): 'mean' over samples or 'sum'.
+
+    Targets are either integer class indices of shape `logits.shape[:-1]`
+    (class axis last) or a probability / one-hot array shaped like the
+    logits. Targets do not receive a gradient.
+    """
+
+    def __init__(self, axis=-1, reduction='mean'):
         self.axis = axis
+        self.reduction = check_reduction(reduction)
 
     def __call__(self, logits: 'array', targets: 'array') -> 'array':
         xp = get_backend()
-        axis = self.axis
-        batch_size = logits.shape[0]
-
-        shift = logits.max(axis=axis, keepdims=True)
-        stable_logits = logits - shift
-        exps = exp(stable_logits)
-        sum_exps = dsum(exps, axis=axis, keepdims=True)
-        softmax = exps / sum_exps
-
-        log_softmax = log(softmax + 1e-9)
-        ce_loss = -(targets * log_softmax).sum(axis=axis)
-        loss = mean(ce_loss)
-        loss.parents = (logits,)
-        
+        if not isinstance(targets, array):
+            targets = array(targets)
+        axis, reduction = self.axis, self.reduction
+
+        logp = _log_softmax(xp, logits.data, axis)
+        loss_data = xp.asarray(_nll(xp, logp, targets.data, axis, reduction))
+        del logp
+        loss = _make_node(loss_data, (logits, targets), 'cce', {'axis': axis, 'reduction': reduction})
+        if not loss.parents:
+            return loss
+
         def CCEBackward():
-            grad_logits = (softmax.data - targets.data) / batch_size
-            logits.grad += grad_logits * loss.grad
+            if logits.need_grad:
+                # Recomputed from the current logits, so `deriv.capture` replays stay correct.
+                grad = _backward(xp, loss.grad, loss.data, (logits.data, targets.data), (True, False),
+                                 axis, reduction)[0]
+                logits._accumulate(grad)
         loss._back = CCEBackward
 
         return loss
@@ -0,0 +1,83 @@
+from deriv import array, unbroadcast
+from deriv.Array.array_object import _make_node
+from deriv.Array.backend import get_backend
+from deriv.Array._condition import where
+from deriv.Array.higher_order import sum_to
+from deriv.loss_funcs._reduction import check_reduction, divisor, register
+
+
+def _forward(xp, out, pred, target, delta=1.0, reduction='mean'):
+    # With r = |pred - target| and q = min(r, delta):
+    # 0.5 * q ** 2 + delta * (r - q) is 0.5 * r ** 2 inside delta, linear outside.
+    r = xp.subtract(pred, target)
+    xp.abs(r, out=r)
+    q = xp.minimum(r, delta)
+    r -= q
+    r *= delta
+    q *= q
+    q *= 0.5
+    out[...] = (q.sum() + r.sum()) / divisor(xp, pred, target, reduction)
+    return out
+
+
+def _backward(xp, g, out, inputs, needs, delta=1.0, reduction='mean'):
+    pred, target = inputs
+    grad = xp.subtract(pred, target)
+    xp.clip(grad, -delta, delta, out=grad)
+    grad *= g / divisor(xp, pred, target, reduction)
+    grad_target = None
+    if needs[1]:
+        grad_target = xp.negative(grad) if needs[0] else xp.negative(grad, out=grad)
+    return [grad if needs[0] else None, grad_target]
+
+
+def _vjp(out, g, inputs, needs, delta=1.0, reduction='mean'):
+    pred, target = inputs
+    xp = get_backend()
+    r = pred - target
+    # The clipped error is r inside delta and a constant +-delta outside.
+    grad = where(array(xp.abs(r.data) <= delta), r, array(delta * xp.sign(r.data)))
+    grad = grad * (g / divisor(xp, pred.data, target.data, reduction))
+    return [sum_to(grad, pred.data.shape) if needs[0] else None,
+            sum_to(-grad, target.data.shape) if needs[1] else None]
+
+
+register('huber', _forward, _backward, ((0, 1), False), _vjp)
+
+
+class Huber:
+    """
+    Fused Huber loss: quadratic for errors within `delta`, linear beyond.
+
+    A single graph node; backward is the clipped error
+    `clip(pred - target, -delta, delta)`, recomputed from the inputs.
+
+    Args:
+        delta (float): Error size where the loss turns linear.
+        reduction (str): 'mean' or 'sum'.
+    """
+
+    def __init__(self, delta=1.0, reduction='mean'):
+        self.delta = delta
+        self.reduction = check_reduction(reduction)
+
+    def __call__(self, pred: 'array', target: 'array') -> 'array':
+        xp = get_backend()
+        if not isinstance(target, array):
+            target = array(target)
+        delta, reduction = self.delta, self.reduction
+
+        out = _make_node(_forward(xp, xp.empty(()), pred.data, target.data, delta, reduction),
+                         (pred, target), 'huber', {'delta': delta, 'reduction': reduction})
+        if not out.parents:
+            return out
+
+        def HuberBackward():
+            grads = _backward(xp, out.grad, out.data, (pred.data, target.data),
+                              (pred.need_grad, target.need_grad), delta, reduction)
+            for x, grad in zip((pred, target), grads):
+                if grad is not None:
+                    x._accumulate(unbroadcast(grad, x.data.shape))
+        out._back = HuberBackward
+
+        return out
@@ -0,0 +1,68 @@
+from deriv import array, unbroadcast
+from deriv.Array.array_object import _make_node
+from deriv.Array.backend import get_backend
+from deriv.Array.higher_order import sum_to
+from deriv.loss_funcs._reduction import check_reduction, divisor, register
+
+
+def _forward(xp, out, pred, target, reduction='mean'):
+    sq = xp.subtract(pred, target)
+    sq *= sq
+    out[...] = sq.sum() / divisor(xp, pred, target, reduction)
+    return out
+
+
+def _backward(xp, g, out, inputs, needs, reduction='mean'):
+    pred, target = inputs
+    grad = xp.subtract(pred, target)
+    grad *= 2 * g / divisor(xp, pred, target, reduction)
+    grad_target = None
+    if needs[1]:
+        grad_target = xp.negative(grad) if needs[0] else xp.negative(grad, out=grad)
+    return [grad if needs[0] else None, grad_target]
+
+
+def _vjp(out, g, inputs, needs, reduction='mean'):
+    pred, target = inputs
+    grad = (pred - target) * (g * (2 / divisor(get_backend(), pred.data, target.data, reduction)))
+    return [sum_to(grad, pred.data.shape) if needs[0] else None,
+            sum_to(-grad, target.data.shape) if needs[1] else None]
+
+
+register('mse', _forward, _backward, ((0, 1), False), _vjp)
+
+
+class MSE:
+    """
+    Fused mean squared error, `mean((pred - target) ** 2)`.
+
+    A single graph node in place of the subtract / square / reduce chain;
+    backward recomputes `pred - target` instead of saving it.
+
+    Args:
+        reduction (str): 'mean' or 'sum' (`((pred - target) ** 2).sum()`).
+    """
+
+    def __init__(self, reduction='mean'):
+        self.reduction = check_reduction(reduction)
+
+    def __call__(self, pred: 'array', target: 'array') -> 'array':
+        xp = get_backend()
+        if not isinstance(target, array):
+            target = array(target)
+        reduction = self.reduction
+
+        out = _make_node(_forward(xp, xp.empty(()), pred.data, target.data, reduction),
+                         (pred, target), 'mse', {'reduction': reduction})
+        if not out.parents:
+            return out
+
+        def MSEBackward():
+            grads = _backward(xp, out.grad, out.data, (pred.data, target.data),
+                              (pred.need_grad, target.need_grad), reduction)
+            for x, grad in zip((pred, target), grads):
+                if grad is not None:
+                    x._accumulate(unbroadcast(grad, x.data.shape))
+        out._back = MSEBackward
+
+        return out
@@ -1,4 +1,7 @@
 from .non_linear import *
 from .module import Module
+from .flat_params import FlatParameters
 from .layers.linear import *
-from .adaptive_non_linear_unit import Nami
\ No newline at end of file
+from .layers.embedding import Embedding
+from .adaptive_non_linear_unit import Nami
+from .ensemble import Ensemble
\ No newline at end of file
@@ -0,0 +1,127 @@
+from deriv.Array.array_object import array
+from deriv.Array.backend import get_backend
+from deriv.Array.grad_mode import no_grad
+from deriv.nn.module import Module
+
+
+def _stacked_shape(n, shape):
+    """
+    Shape of `n` stacked copies of a parameter. Matrices get a leading model
+    axis, so `x @ w` becomes one batched matmul; vectors and scalars also get
+    a batch axis of size 1, so they broadcast against activations of shape
+    `(n, batch, features)`.
+    """
+    if len(shape) >= 2:
+        return (n,) + shape
+    return (n,) + (1,) * (2 - len(shape)) + shape
+
+
+def _owner(module, name):
+    """The submodule and attribute name a dotted `parameters()` key refers to."""
+    *path, attr = name.split(".")
+    for part in path:
+        module = module._modules[part]
+    return module, attr
+
+
+class Ensemble(Module):
+    """
+    N replicas of a model trained as one batched computation.
+
+    The replicas' parameters are stacked along a leading model axis and
+    swapped into a single copy of the model, so each layer runs once for all
+    replicas: `x @ w` becomes a batched matmul over `(n, in, out)` weights,
+    and biases broadcast as `(n, 1, out)`. Forward, backward and optimizer
+    steps then cost a few large ops instead of `n` interpreter-bound loops.
+
+    Inputs are either shared by all replicas, `(batch, features)`, or given
+    per replica, `(n, batch, features)`; outputs are `(n, batch, ...)`. The
+    model must work sample-wise on 2-D inputs (`dense` layers and
+    activations), not reshape its input or reduce over the batch.
+
+    `SGD`, `Adam`, `AdamW`, `RMSProp` and `Adagrad` accept a learning rate
+    per replica (see `per_replica`); `LBFGS` and `NewtonCG` do not.
+
+    Args:
+        factory: `factory(i)` builds the i-th replica as a `Module`, e.g.
+            with its own seed. All replicas must have the same structure.
+        n (int): Number of replicas.
+
+    Example:
+        >>> ens = Ensemble(lambda i: MLP(seed=i), 64)
+        >>> opt = SGD(ens.parameters(), lr=ens.per_replica(lrs))
+        >>> loss = ens.loss(MSE(), ens(x), y)
+        >>> loss.backward(); opt.step(); opt.zero_grad()
+    """
+
+    def __init__(self, factory, n):
+        super().__init__()
+        xp = get_backend()
+        self.factory = factory
+        self.n = n
+        replicas = [factory(i) for i in range(n)]
+        self.model = replicas[0]
+        self.shapes = {}
+        for name, param in self.model.parameters().items():
+            shape = param.data.shape
+            values = [replica.parameters()[name].data for replica in replicas]
+            stacked = array(xp.stack(values).reshape(_stacked_shape(n, shape)), need_grad=True,
+                            var_name=param.var_name)
+            owner, attr = _owner(self.model, name)
+            owner.__dict__[attr].data = stacked
+            owner._parameters[attr] = stacked
+            self.shapes[name] = shape
+
+    def forward(self, x):
+        return self.model(x)
+
+    def parameters(self, prefix=""):
+        """The stacked parameters, under the names of a single replica's."""
+        return self.model.parameters(prefix)
+
+    def per_replica(self, values):
+        """
+        A per-replica hyperparameter (e.g. learning rates, one per replica)
+        as a backend array of shape `(n,)`, for optimizers that accept one.
+        """
+        xp = get_backend()
+        values = xp.asarray(values, dtype=float)
+        if values.shape != (self.n,):
+            raise ValueError(f"Expected {self.n} values, one per replica, got shape {values.shape}")
+        return values
+
+    def loss(self, loss_fn, pred, target):
+        """
+        The sum over replicas of each replica's loss, so every replica gets
+        the gradient it would get if trained alone.
+
+        A loss with 'mean' reduction averages over the model axis too; the
+        result is scaled back by `n`. Integer class targets shared by all
+        replicas are broadcast over the model axis.
+        """
+        if not isinstance(target, array):
+            target = array(target)
+        xp = get_backend()
+        if target.data.dtype.kind in "iu" and target.data.ndim == pred.data.ndim - 2:
+            target = array(xp.broadcast_to(target.data, pred.data.shape[:-1]))
+        out = loss_fn(pred, target)
+        return out * self.n if getattr(loss_fn, "reduction", "mean") == "mean" else out
+
+    def replica_losses(self, loss_fn, pred, target):
+        """Each replica's own loss value, as a backend array of shape `(n,)`."""
+        xp = get_backend()
+        if not isinstance(target, array):
+            target = array(target)
+        classes = target.data.dtype.kind in "iu"
+        shared = target.data.ndim == pred.data.ndim - (2 if classes else 1)
+        with no_grad():
+            return xp.asarray([float(loss_fn(array(pred.data[i]), target if shared else array(target.data[i])).data)
+                               for i in range(self.n)])
+
+    def replica(self, i):
+        """A standalone copy of the i-th replica, built by `factory(i)`, with the current weights."""
+        module = self.factory(i)
+        for name, param in module.parameters().items():
+            stacked = self.model.parameters()[name]
+            param.data[...] = stacked.data[i].reshape(self.shapes[name])
+        return module
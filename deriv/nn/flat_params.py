@@ -0,0 +1,128 @@
+from deriv.Array.array_object import array
+from deriv.Array.backend import get_backend
+
+
+class FlatParameters:
+    """
+    Contiguous storage for the parameters of a module tree.
+
+    All parameters become views into one flat `data` buffer and their grads
+    views into one flat `grad` buffer, laid out in `Module.parameters()`
+    order. The `array` objects are kept and only their `data` / `grad` are
+    rebound, so existing references (layers, optimizers created afterwards)
+    see the shared storage. Whole-model operations are single vectorized
+    calls on the flat buffers, and checkpointing or gradient exchange is a
+    single copy of `data` or `grad`.
+
+    Grads are zeroed in place and must not be reassigned (e.g. set to None),
+    or the parameter is detached from the flat grad buffer.
+
+    Args:
+        parameters (dict): A `Module.parameters()` dict.
+        dtype (optional): Buffer dtype. Defaults to the common dtype of the
+            parameters.
+        data, grad (optional): Flat buffers to use as storage (e.g. in
+            shared memory) instead of allocating new ones. `data` is
+            filled from the parameters and `grad` is zeroed.
+
+    Attributes:
+        flat (array): The flat parameter, with `flat.data` / `flat.grad` the
+            two buffers. Optimizers built on `parameters()` update it with one
+            kernel call.
+        names (list): Parameter names, in storage order.
+        shapes (list): Original parameter shapes.
+        sizes (list): Number of elements of each parameter.
+        offsets (list): Start of each parameter in the buffers.
+    """
+
+    def __init__(self, parameters, dtype=None, data=None, grad=None):
+        xp = get_backend()
+        params = list(parameters.values())
+        self.names = list(parameters.keys())
+        self.params = params
+        self.shapes = [p.data.shape for p in params]
+        self.sizes = [p.data.size for p in params]
+        self.offsets = []
+        size = 0
+        for n in self.sizes:
+            self.offsets.append(size)
+            size += n
+        if data is not None:
+            dtype = data.dtype
+        elif dtype is None:
+            dtype = xp.result_type(*[p.data.dtype for p in params]) if params else xp.float64
+
+        self.flat = array(data if data is not None else xp.empty(size, dtype=dtype), need_grad=True, var_name='flat')
+        if grad is None:
+            grad = xp.zeros(size, dtype=dtype)
+        else:
+            grad.fill(0)
+        self.flat.grad = grad
+        for p, view, grad in zip(params, self.views(self.flat.data), self.views(self.flat.grad)):
+            view[...] = p.data
+            if p.grad is not None:
+                grad[...] = p.grad
+            p.data = view
+            p.grad = grad
+
+    def move_to(self, data, grad):
+        """
+        Moves the storage into other flat buffers (e.g. out of shared
+        memory), copying the current values and rebinding every parameter.
+        """
+        data[...] = self.flat.data
+        grad[...] = self.flat.grad
+        self.flat.data, self.flat.grad = data, grad
+        for p, view, g in zip(self.params, self.views(data), self.views(grad)):
+            p.data = view
+            p.grad = g
+
+    @property
+    def data(self):
+        """Flat parameter buffer."""
+        return self.flat.data
+
+    @property
+    def grad(self):
+        """Flat gradient buffer."""
+        return self.flat.grad
+
+    def __len__(self):
+        return self.flat.data.size
+
+    def views(self, buffer):
+        """Splits a flat `buffer` into per-parameter views, in storage order."""
+        return [buffer[off:off + size].reshape(shape)
+                for off, size, shape in zip(self.offsets, self.sizes, self.shapes)]
+
+    def parameters(self):
+        """The flat parameter as a one-element list, for optimizers."""
+        return [self.flat]
+
+    def zero_grad(self):
+        self.flat.grad.fill(0)
+
+    def grad_norm(self):
+        """Global L2 norm of all gradients."""
+        g = self.flat.grad
+        return float(self.flat.xp.sqrt(self.flat.xp.dot(g, g)))
+
+    def clip_grad_norm(self, max_norm, eps=1e-6):
+        """
+        Scales all gradients so that their global L2 norm is at most `max_norm`.
+
+        Returns:
+            float: The norm before clipping.
+        """
+        norm = self.grad_norm()
+        if norm > max_norm:
+            self.flat.grad *= max_norm / (norm + eps)
+        return norm
+
+    def clip_grad_value(self, value):
+        """Clamps every gradient entry to `[-value, value]`."""
+        self.flat.xp.clip(self.flat.grad, -value, value, out=self.flat.grad)
+
+    def load(self, data):
+        """Copies a flat parameter vector (e.g. a checkpoint) into the buffer."""
+        self.flat.xp.copyto(self.flat.data, data.data if isinstance(data, array) else data)
@@ -1,6 +1,6 @@
 from deriv.Array.backend import get_backend
 from deriv import array
-from codegen.backend.core.symbolic.tracer_object import Tracer
+from deriv.codegen.tracer import Tracer
 
 def relu(x:array):
     xp = get_backend()
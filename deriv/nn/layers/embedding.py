@@ -0,0 +1,51 @@
+from deriv.Array.backend import get_backend
+from deriv.Array.array_object import array
+from deriv.Array.indexing import take
+from deriv.nn.module import Parameter, Module
+
+
+class Embedding(Module):
+    """
+    Lookup table mapping integer ids to dense vectors.
+
+    `Embedding(n, d)(ids)` returns the rows of the `(n, d)` weight selected
+    by `ids`, of shape `ids.shape + (d,)`. With `sparse=True` the weight's
+    gradient is a `SparseGrad` holding one row per looked-up id instead of a
+    dense `(n, d)` array, and the optimizers only update those rows, so a
+    training step costs O(ids) however large the table is.
+
+    Attributes:
+        weight (Parameter): The table, of shape (num_embeddings, embedding_dim), trainable.
+
+    Methods:
+        __call__(ids): Looks up the rows of `ids`.
+    """
+
+    def __init__(self, num_embeddings, embedding_dim, sparse=True, var_name=''):
+        """
+        Initialize the table with small random values.
+
+        Args:
+            num_embeddings (int): Number of rows (distinct ids).
+            embedding_dim (int): Size of each row.
+            sparse (bool): Keep the weight's gradient sparse.
+            var_name (str): Optional, use to see the graph put the name of the variable you used.
+        """
+        xp = get_backend()
+        super().__init__()
+        weight = array(xp.random.randn(num_embeddings, embedding_dim) * 0.1, need_grad=True,
+                       var_name=f"{var_name}weight")
+        self.weight = Parameter(weight)
+        self.sparse = sparse
+
+    def __call__(self, ids):
+        """
+        Look up the rows of `ids`.
+
+        Args:
+            ids (array or np.ndarray): Integer ids in `[0, num_embeddings)`, of any shape.
+
+        Returns:
+            array: Output tensor of shape `ids.shape + (embedding_dim,)`.
+        """
+        return take(self.weight.data, ids, axis=0, sparse=self.sparse)
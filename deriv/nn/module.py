@@ -1,3 +1,6 @@
+from deriv.nn.flat_params import FlatParameters
+
+
 class Parameter:
     """
     A wrapper for tensors that should be considered trainable parameters.
@@ -73,6 +76,24 @@ class Module:
             params.update(module.parameters(prefix=subprefix))
         return params
 
+    def flatten_parameters(self, dtype=None):
+        """
+        Move all parameters of the module tree into contiguous storage.
+
+        Every parameter's `data` and `grad` become views into one flat data
+        buffer and one flat grad buffer (see `FlatParameters`). Build
+        optimizers on the returned object's `parameters()` to step the whole
+        model with one vectorized update.
+
+        Args:
+            dtype (optional): Buffer dtype. Defaults to the common dtype of
+                the parameters.
+
+        Returns:
+            FlatParameters: The flat storage.
+        """
+        return FlatParameters(self.parameters(), dtype=dtype)
+
     def __call__(self, *args, **kwargs):
         """
         Call the module on inputs by delegating to `forward`.
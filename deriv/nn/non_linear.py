@@ -1,4 +1,6 @@
 from deriv import array, unbroadcast
+from deriv.Array.array_object import _make_node
+from deriv.Array.reversed_mode_autodiff import locked_grads
 from deriv.Array.backend import get_backend
 
 
@@ -34,12 +36,17 @@ class ReLU:
         if not isinstance(_obj, array):
             raise ValueError(f"Object of type {type(_obj)} is not supported")
         
-        out = array(xp.maximum(_obj.data, 0), (_obj,), need_grad=True, op="relu")
+        out = _make_node(xp.maximum(_obj.data, 0), (_obj,), "relu")
+        if not out.parents:
+            return out
 
         def reluBackward():
             if _obj.need_grad:
-                obj_grad = xp.where(_obj.data > 0, 1.0, 0.0)
-                _obj.grad += unbroadcast(obj_grad * out.grad, _obj.data.shape)
+                with locked_grads(_obj):
+                    if _obj.grad is None:
+                        _obj.grad = xp.asarray(xp.multiply(out.grad, _obj.data > 0))
+                    else:
+                        xp.add(_obj.grad, out.grad, out=_obj.grad, where=_obj.data > 0)
 
         out._back = reluBackward
         return out
@@ -77,12 +84,17 @@ class Tanh:
         if not isinstance(_obj, array):
             raise ValueError(f"Object of type {type(_obj)} is not supported")
 
-        out = array(xp.tanh(_obj.data), (_obj,), need_grad=True, op="tanh")
+        out = _make_node(xp.tanh(_obj.data), (_obj,), "tanh")
+        if not out.parents:
+            return out
 
         def tanhBackward():
             if _obj.need_grad:
-                grad_val = 1.0 - xp.tanh(_obj.data) ** 2
-                _obj.grad += unbroadcast(grad_val * out.grad, _obj.data.shape)
+                # 1 - tanh(x) ** 2, from the saved output
+                grad = xp.multiply(out.data, out.data)
+                xp.subtract(1.0, grad, out=grad)
+                grad *= out.grad
+                _obj._accumulate(grad)
 
         out._back = tanhBackward
         return out
@@ -1 +1,7 @@
-from .sgd import SGD
\ No newline at end of file
+from .optimizer import Optimizer
+from .sgd import SGD
+from .adam import Adam, AdamW
+from .rmsprop import RMSProp
+from .adagrad import Adagrad
+from .lbfgs import LBFGS
+from .newton_cg import NewtonCG
@@ -0,0 +1,66 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, nonecheck=False, cdivision=True
+from libc.math cimport sqrt
+cimport numpy as cnp
+from deriv.optim._internals._kernel cimport kernel_itemsize, data_ptr, size_of
+
+cnp.import_array()
+
+ctypedef fused real:
+    float
+    double
+
+
+cdef void _adagrad(Py_ssize_t n, real* p, real* g, real* s, double lr, double eps,
+                   double weight_decay) noexcept nogil:
+    cdef Py_ssize_t i
+    cdef double gi, si
+    for i in range(n):
+        gi = g[i] + weight_decay * p[i]
+        si = s[i] + gi * gi
+        s[i] = si
+        p[i] = p[i] - lr * gi / (sqrt(si) + eps)
+
+
+def _adagrad_xp(p, g, s, lr, eps, weight_decay, xp):
+    if weight_decay:
+        g = g + weight_decay * p
+    s += g * g
+    denom = xp.sqrt(s)
+    denom += eps
+    xp.divide(g, denom, out=denom)
+    denom *= lr
+    p -= denom
+
+
+cpdef void adagrad_step(list params, list grads, list sums, double lr, double eps, double weight_decay,
+                        object xp):
+    """
+    Adagrad, in place, for all parameters in one call:
+
+        g = grad + weight_decay * param
+        s += g ** 2
+        param -= lr * g / (sqrt(s) + eps)
+
+    Lists are aligned; parameters whose grad is None are skipped.
+    """
+    cdef Py_ssize_t i, n
+    cdef int itemsize
+    cdef void* p_ptr
+    cdef void* g_ptr
+    cdef void* s_ptr
+    cdef object p, g, s
+    for i in range(len(params)):
+        p, g, s = params[i], grads[i], sums[i]
+        if g is None:
+            continue
+        itemsize = kernel_itemsize(p, g, s, None)
+        if itemsize == 0:
+            _adagrad_xp(p, g, s, lr, eps, weight_decay, xp)
+        else:
+            n = size_of(p)
+            p_ptr, g_ptr, s_ptr = data_ptr(p), data_ptr(g), data_ptr(s)
+            with nogil:
+                if itemsize == 8:
+                    _adagrad[double](n, <double*> p_ptr, <double*> g_ptr, <double*> s_ptr, lr, eps, weight_decay)
+                else:
+                    _adagrad[float](n, <float*> p_ptr, <float*> g_ptr, <float*> s_ptr, lr, eps, weight_decay)
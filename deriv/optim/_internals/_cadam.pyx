@@ -0,0 +1,83 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, nonecheck=False, cdivision=True
+from libc.math cimport sqrt
+cimport numpy as cnp
+from deriv.optim._internals._kernel cimport kernel_itemsize, data_ptr, size_of
+
+cnp.import_array()
+
+ctypedef fused real:
+    float
+    double
+
+
+cdef void _adam(Py_ssize_t n, real* p, real* g, real* m, real* v, double step_size, double beta1,
+                double beta2, double eps, double root_bc2, double coupled_wd, double decay) noexcept nogil:
+    cdef Py_ssize_t i
+    cdef double gi, mi, vi
+    for i in range(n):
+        gi = g[i] + coupled_wd * p[i]
+        mi = beta1 * m[i] + (1 - beta1) * gi
+        vi = beta2 * v[i] + (1 - beta2) * gi * gi
+        m[i] = mi
+        v[i] = vi
+        p[i] = p[i] * decay - step_size * mi / (sqrt(vi) / root_bc2 + eps)
+
+
+def _adam_xp(p, g, m, v, step_size, beta1, beta2, eps, root_bc2, coupled_wd, decay, xp):
+    if coupled_wd:
+        g = g + coupled_wd * p
+    m *= beta1
+    m += (1 - beta1) * g
+    v *= beta2
+    v += (1 - beta2) * (g * g)
+    if decay != 1:
+        p *= decay
+    denom = xp.sqrt(v)
+    denom /= root_bc2
+    denom += eps
+    xp.divide(m, denom, out=denom)
+    denom *= step_size
+    p -= denom
+
+
+cpdef void adam_step(list params, list grads, list exp_avgs, list exp_avg_sqs, double lr, double beta1,
+                     double beta2, double eps, double weight_decay, bint decoupled, long step, object xp):
+    """
+    Adam / AdamW, in place, for all parameters in one call:
+
+        g = grad (+ weight_decay * param, unless decoupled)
+        m = beta1 * m + (1 - beta1) * g
+        v = beta2 * v + (1 - beta2) * g ** 2
+        param *= 1 - lr * weight_decay          (decoupled only)
+        param -= lr / (1 - beta1 ** step) * m / (sqrt(v / (1 - beta2 ** step)) + eps)
+
+    Lists are aligned; parameters whose grad is None are skipped.
+    """
+    cdef double step_size = lr / (1 - beta1 ** step)
+    cdef double root_bc2 = sqrt(1 - beta2 ** step)
+    cdef double coupled_wd = 0.0 if decoupled else weight_decay
+    cdef double decay = 1 - lr * weight_decay if decoupled else 1.0
+    cdef Py_ssize_t i, n
+    cdef int itemsize
+    cdef void* p_ptr
+    cdef void* g_ptr
+    cdef void* m_ptr
+    cdef void* v_ptr
+    cdef object p, g, m, v
+    for i in range(len(params)):
+        p, g, m, v = params[i], grads[i], exp_avgs[i], exp_avg_sqs[i]
+        if g is None:
+            continue
+        itemsize = kernel_itemsize(p, g, m, v)
+        if itemsize == 0:
+            _adam_xp(p, g, m, v, step_size, beta1, beta2, eps, root_bc2, coupled_wd, decay, xp)
+        else:
+            n = size_of(p)
+            p_ptr, g_ptr, m_ptr, v_ptr = data_ptr(p), data_ptr(g), data_ptr(m), data_ptr(v)
+            with nogil:
+                if itemsize == 8:
+                    _adam[double](n, <double*> p_ptr, <double*> g_ptr, <double*> m_ptr, <double*> v_ptr,
+                                  step_size, beta1, beta2, eps, root_bc2, coupled_wd, decay)
+                else:
+                    _adam[float](n, <float*> p_ptr, <float*> g_ptr, <float*> m_ptr, <float*> v_ptr,
+                                 step_size, beta1, beta2, eps, root_bc2, coupled_wd, decay)
@@ -0,0 +1,69 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, nonecheck=False, cdivision=True
+from libc.math cimport sqrt
+cimport numpy as cnp
+from deriv.optim._internals._kernel cimport kernel_itemsize, data_ptr, size_of
+
+cnp.import_array()
+
+ctypedef fused real:
+    float
+    double
+
+
+cdef void _rmsprop(Py_ssize_t n, real* p, real* g, real* v, double lr, double alpha, double eps,
+                   double weight_decay) noexcept nogil:
+    cdef Py_ssize_t i
+    cdef double gi, vi
+    for i in range(n):
+        gi = g[i] + weight_decay * p[i]
+        vi = alpha * v[i] + (1 - alpha) * gi * gi
+        v[i] = vi
+        p[i] = p[i] - lr * gi / (sqrt(vi) + eps)
+
+
+def _rmsprop_xp(p, g, v, lr, alpha, eps, weight_decay, xp):
+    if weight_decay:
+        g = g + weight_decay * p
+    v *= alpha
+    v += (1 - alpha) * (g * g)
+    denom = xp.sqrt(v)
+    denom += eps
+    xp.divide(g, denom, out=denom)
+    denom *= lr
+    p -= denom
+
+
+cpdef void rmsprop_step(list params, list grads, list square_avgs, double lr, double alpha, double eps,
+                        double weight_decay, object xp):
+    """
+    RMSProp, in place, for all parameters in one call:
+
+        g = grad + weight_decay * param
+        v = alpha * v + (1 - alpha) * g ** 2
+        param -= lr * g / (sqrt(v) + eps)
+
+    Lists are aligned; parameters whose grad is None are skipped.
+    """
+    cdef Py_ssize_t i, n
+    cdef int itemsize
+    cdef void* p_ptr
+    cdef void* g_ptr
+    cdef void* v_ptr
+    cdef object p, g, v
+    for i in range(len(params)):
+        p, g, v = params[i], grads[i], square_avgs[i]
+        if g is None:
+            continue
+        itemsize = kernel_itemsize(p, g, v, None)
+        if itemsize == 0:
+            _rmsprop_xp(p, g, v, lr, alpha, eps, weight_decay, xp)
+        else:
+            n = size_of(p)
+            p_ptr, g_ptr, v_ptr = data_ptr(p), data_ptr(g), data_ptr(v)
+            with nogil:
+                if itemsize == 8:
+                    _rmsprop[double](n, <double*> p_ptr, <double*> g_ptr, <double*> v_ptr, lr, alpha, eps,
+                                     weight_decay)
+                else:
+                    _rmsprop[float](n, <float*> p_ptr, <float*> g_ptr, <float*> v_ptr, lr, alpha, eps,
+                                    weight_decay)
@@ -1,17 +1,58 @@
-# cython: language_level=3, boundscheck=False, wraparound=False, nonecheck=False
+# cython: language_level=3, boundscheck=False, wraparound=False, nonecheck=False, cdivision=True
+cimport numpy as cnp
+from deriv.optim._internals._kernel cimport kernel_itemsize, data_ptr, size_of
 
-cpdef void sgd_step(dict parameters, dict velocities, double lr, double beta, object xp):
-    cdef object param, grad, v, data
-    cdef str name
+cnp.import_array()
 
-    for name in parameters:
-        param = parameters[name]
-        grad = param.grad
-        if grad is None:
-            continue
+ctypedef fused real:
+    float
+    double
+
+
+cdef void _sgd(Py_ssize_t n, real* p, real* g, real* v, double lr, double beta) noexcept nogil:
+    cdef Py_ssize_t i
+    cdef double vi
+    for i in range(n):
+        vi = beta * v[i] + (1 - beta) * g[i]
+        v[i] = vi
+        p[i] = p[i] - lr * vi
+
+
+def _sgd_xp(p, g, v, lr, beta, xp):
+    v *= beta
+    v += (1 - beta) * g
+    p -= lr * v
 
-        v = velocities[name]
-        v[...] = beta * v + (1 - beta) * grad
 
-        data = param.data
-        data[...] = data - lr * v
+cpdef void sgd_step(list params, list grads, list velocities, double lr, double beta, object xp):
+    """
+    Momentum SGD, in place, for all parameters in one call:
+
+        v = beta * v + (1 - beta) * grad
+        param -= lr * v
+
+    `params`, `grads` and `velocities` are aligned lists of raw arrays;
+    parameters whose grad is None are skipped.
+    """
+    cdef Py_ssize_t i, n
+    cdef int itemsize
+    cdef void* p_ptr
+    cdef void* g_ptr
+    cdef void* v_ptr
+    cdef object p, g, v
+    for i in range(len(params)):
+        p, g, v = params[i], grads[i], velocities[i]
+        if g is None:
+            continue
+        itemsize = kernel_itemsize(p, g, v, None)
+        if itemsize == 0:
+            _sgd_xp(p, g, v, lr, beta, xp)
+        else:
+            n = size_of(p)
+            p_ptr, g_ptr, v_ptr = data_ptr(p), data_ptr(g), data_ptr(v)
+            with nogil:
+                if itemsize == 8:
+                    _sgd[double](n, <double*> p_ptr, <double*> g_ptr, <double*> v_ptr, lr, beta)
+                else:
+                    _sgd[float](n, <float*> p_ptr, <float*> g_ptr, <float*> v_ptr, lr, beta)
+
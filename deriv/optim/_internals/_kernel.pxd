@@ -0,0 +1,31 @@
+# cython: language_level=3
+cimport numpy as cnp
+
+
+cdef inline int kernel_itemsize(object param, object a, object b, object c) noexcept:
+    """
+    Returns the itemsize (8 or 4) the compiled step loops can run with, or 0
+    when they cannot: they need C-contiguous NumPy float64 or float32 arrays
+    that all share the parameter's dtype and size. Other arrays (CuPy, strided views,
+    mixed dtypes) take the backend (`xp`) path. Unused buffers are None.
+    """
+    if not cnp.PyArray_Check(param) or not cnp.PyArray_IS_C_CONTIGUOUS(param):
+        return 0
+    cdef int typenum = cnp.PyArray_TYPE(param)
+    if typenum != cnp.NPY_DOUBLE and typenum != cnp.NPY_FLOAT:
+        return 0
+    for buf in (a, b, c):
+        if buf is None:
+            continue
+        if (not cnp.PyArray_Check(buf) or not cnp.PyArray_IS_C_CONTIGUOUS(buf)
+                or cnp.PyArray_TYPE(buf) != typenum or cnp.PyArray_SIZE(buf) != cnp.PyArray_SIZE(param)):
+            return 0
+    return 8 if typenum == cnp.NPY_DOUBLE else 4
+
+
+cdef inline void* data_ptr(object arr) noexcept:
+    return cnp.PyArray_DATA(arr)
+
+
+cdef inline Py_ssize_t size_of(object arr) noexcept:
+    return cnp.PyArray_SIZE(arr)
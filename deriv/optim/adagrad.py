@@ -0,0 +1,25 @@
+from deriv.optim.optimizer import Optimizer
+from deriv.optim._internals._cadagrad import adagrad_step
+
+
+class Adagrad(Optimizer):
+    """
+    Adagrad optimizer: scales each step by the root of the summed squared
+    gradients seen so far.
+
+    Args:
+        parameters (dict, list or array): Parameters to optimize.
+        lr (float or array): Learning rate, or one per replica (shape
+            `(n,)`) for the stacked parameters of an `nn.Ensemble`.
+        eps (float): Added to the denominator for numerical stability.
+        weight_decay (float): L2 penalty added to the gradient.
+    """
+
+    def __init__(self, parameters, lr=1e-2, eps=1e-10, weight_decay=0.0):
+        super().__init__(parameters, lr)
+        self.eps = eps
+        self.weight_decay = weight_decay
+        self.sums = self._zeros()
+
+    def step(self):
+        self._apply(adagrad_step, [self.sums], self.lr, self.eps, self.weight_decay, self.xp)
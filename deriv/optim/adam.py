@@ -0,0 +1,53 @@
+from deriv.optim.optimizer import Optimizer
+from deriv.optim._internals._cadam import adam_step
+
+
+class Adam(Optimizer):
+    """
+    Adam optimizer with bias-corrected first and second moments.
+
+    Args:
+        parameters (dict, list or array): Parameters to optimize.
+        lr (float or array): Learning rate, or one per replica (shape
+            `(n,)`) for the stacked parameters of an `nn.Ensemble`.
+        betas (tuple): Decay rates of the first and second moment estimates.
+        eps (float): Added to the denominator for numerical stability.
+        weight_decay (float): L2 penalty added to the gradient.
+    """
+
+    decoupled = False
+
+    def __init__(self, parameters, lr=1e-3, betas=(0.9, 0.999), eps=1e-8, weight_decay=0.0):
+        super().__init__(parameters, lr)
+        self.betas = betas
+        self.eps = eps
+        self.weight_decay = weight_decay
+        self.t = 0
+        self.exp_avgs = self._zeros()
+        self.exp_avg_sqs = self._zeros()
+
+    def step(self):
+        self.t += 1
+        beta1, beta2 = self.betas
+        self._apply(adam_step, [self.exp_avgs, self.exp_avg_sqs], self.lr, beta1, beta2, self.eps,
+                    self.weight_decay, self.decoupled, self.t, self.xp)
+
+
+class AdamW(Adam):
+    """
+    Adam with decoupled weight decay: parameters are shrunk by
+    `lr * weight_decay` directly instead of through the gradient.
+
+    Args:
+        parameters (dict, list or array): Parameters to optimize.
+        lr (float or array): Learning rate, or one per replica (shape
+            `(n,)`) for the stacked parameters of an `nn.Ensemble`.
+        betas (tuple): Decay rates of the first and second moment estimates.
+        eps (float): Added to the denominator for numerical stability.
+        weight_decay (float): Decoupled weight decay.
+    """
+
+    decoupled = True
+
+    def __init__(self, parameters, lr=1e-3, betas=(0.9, 0.999), eps=1e-8, weight_decay=1e-2):
+        super().__init__(parameters, lr, betas, eps, weight_decay)
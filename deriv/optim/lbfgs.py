@@ -0,0 +1,122 @@
+from deriv.optim.optimizer import Optimizer
+
+LINE_SEARCHES = (None, 'backtracking')
+
+
+class LBFGS(Optimizer):
+    """
+    Limited-memory BFGS.
+
+    Builds a quasi-Newton direction from the last `history_size` parameter
+    and gradient differences with the two-loop recursion, so it never forms
+    the (inverse) Hessian: memory and time per iteration are
+    O(history_size * n_params). Each `step` runs up to `max_iter` iterations
+    and needs a closure that re-evaluates the loss.
+
+    Args:
+        parameters (dict, list or array): Parameters to optimize.
+        lr (float): Step size along the quasi-Newton direction.
+        history_size (int): Number of curvature pairs kept.
+        max_iter (int): Iterations per `step`.
+        tolerance_grad (float): Stop when the largest gradient entry is
+            below this.
+        tolerance_change (float): Stop when the loss or the parameters
+            change by less than this.
+        line_search (str): None for a fixed step, or 'backtracking' to
+            halve the step until the loss decreases enough (Armijo rule).
+
+    Example:
+        >>> opt = LBFGS(model.parameters())
+        >>> opt.step(lambda: loss_fn(model(x), y))
+    """
+
+    per_replica_lr = False
+
+    def __init__(self, parameters, lr=1.0, history_size=10, max_iter=20, tolerance_grad=1e-7,
+                 tolerance_change=1e-9, line_search=None):
+        super().__init__(parameters, lr)
+        if line_search not in LINE_SEARCHES:
+            raise ValueError(f"line_search must be one of {LINE_SEARCHES}, got {line_search!r}")
+        self.history_size = history_size
+        self.max_iter = max_iter
+        self.tolerance_grad = tolerance_grad
+        self.tolerance_change = tolerance_change
+        self.line_search = line_search
+        self.old_steps = []
+        self.old_diffs = []
+        self.iterations = 0
+
+    def _direction(self, flat_grad):
+        """Two-loop recursion: the inverse-Hessian estimate applied to `-flat_grad`."""
+        xp = self.xp
+        q = -flat_grad
+        rhos = [1.0 / float(xp.dot(y, s)) for s, y in zip(self.old_steps, self.old_diffs)]
+        alphas = []
+        for s, y, rho in reversed(list(zip(self.old_steps, self.old_diffs, rhos))):
+            alpha = rho * float(xp.dot(s, q))
+            q -= alpha * y
+            alphas.append(alpha)
+        if self.old_steps:
+            s, y = self.old_steps[-1], self.old_diffs[-1]
+            q *= float(xp.dot(s, y)) / float(xp.dot(y, y))
+        for (s, y, rho), alpha in zip(zip(self.old_steps, self.old_diffs, rhos), reversed(alphas)):
+            beta = rho * float(xp.dot(y, q))
+            q += (alpha - beta) * s
+        return q
+
+    def step(self, closure):
+        """
+        Runs up to `max_iter` L-BFGS iterations.
+
+        Args:
+            closure: Function that recomputes and returns the loss array; it
+                must not call `backward`.
+
+        Returns:
+            float: The loss before the step.
+        """
+        xp = self.xp
+        loss, flat_grad = self._loss_and_grad(closure)
+        first_loss = loss
+        if float(xp.abs(flat_grad).max()) <= self.tolerance_grad:
+            return first_loss
+        x = self._flatten(self._data())
+
+        for _ in range(self.max_iter):
+            d = self._direction(flat_grad)
+            gtd = float(xp.dot(flat_grad, d))
+            if gtd > -self.tolerance_change:
+                break
+            if self.iterations == 0:
+                t = min(1.0, 1.0 / float(xp.abs(flat_grad).sum())) * self.lr
+            else:
+                t = self.lr
+            self.iterations += 1
+
+            self._assign(x + t * d)
+            new_loss, new_grad = self._loss_and_grad(closure)
+            if self.line_search == 'backtracking':
+                for _ in range(20):
+                    if new_loss <= loss + 1e-4 * t * gtd:
+                        break
+                    t *= 0.5
+                    self._assign(x + t * d)
+                    new_loss, new_grad = self._loss_and_grad(closure)
+
+            s = t * d
+            y = new_grad - flat_grad
+            if float(xp.dot(y, s)) > 1e-10:
+                if len(self.old_steps) == self.history_size:
+                    self.old_steps.pop(0)
+                    self.old_diffs.pop(0)
+                self.old_steps.append(s)
+                self.old_diffs.append(y)
+
+            x += s
+            change = abs(new_loss - loss)
+            loss, flat_grad = new_loss, new_grad
+            if float(xp.abs(flat_grad).max()) <= self.tolerance_grad:
+                break
+            if float(xp.abs(s).max()) <= self.tolerance_change or change < self.tolerance_change:
+                break
+        return first_loss
@@ -0,0 +1,147 @@
+from deriv.Array.forward_mode import forward_ad, tangent_of
+from deriv.Array.grad_mode import enable_grad, no_grad
+from deriv.Array.higher_order import grad
+from deriv.optim.lbfgs import LINE_SEARCHES
+from deriv.optim.optimizer import Optimizer
+
+
+class NewtonCG(Optimizer):
+    """
+    Truncated Newton method (Newton-CG).
+
+    Each `step` solves `(H + damping * I) p = -g` approximately with
+    conjugate gradients and moves the parameters along `p`. CG only needs
+    Hessian-vector products, which are computed by forward mode over
+    reverse mode (see `deriv.hvp`) at the cost of about two gradient
+    evaluations each; the Hessian is never formed.
+
+    The step is globalized like a Levenberg-Marquardt method: a backtracking
+    line search accepts only a sufficient decrease (Armijo rule) and
+    otherwise leaves the parameters unchanged, and `damping` grows when the
+    loss decreases much less than the quadratic model predicts and shrinks
+    when the model is accurate. Where CG meets negative curvature on its
+    first iteration, the direction falls back to a scaled steepest descent.
+
+    Args:
+        parameters (dict, list or array): Parameters to optimize.
+        lr (float): Initial step size along the Newton direction.
+        cg_iters (int): Maximum CG iterations (Hessian-vector products)
+            per step.
+        damping (float): Initial value added to the Hessian's diagonal;
+            keeps the system positive definite away from a minimum.
+        tol (float): Stop CG once the residual is below `tol` times the
+            gradient norm.
+        line_search (str): 'backtracking' to halve the step until the loss
+            decreases enough, or None for a fixed step of `lr`.
+        adaptive_damping (bool): Adjust `damping` after each step from the
+            ratio of actual to predicted decrease.
+
+    Example:
+        >>> opt = NewtonCG(model.parameters(), damping=1e-3)
+        >>> opt.step(lambda: loss_fn(model(x), y))
+    """
+
+    per_replica_lr = False
+
+    def __init__(self, parameters, lr=1.0, cg_iters=10, damping=1e-4, tol=1e-5, line_search='backtracking',
+                 adaptive_damping=True):
+        super().__init__(parameters, lr)
+        if line_search not in LINE_SEARCHES:
+            raise ValueError(f"line_search must be one of {LINE_SEARCHES}, got {line_search!r}")
+        self.cg_iters = cg_iters
+        self.damping = damping
+        self.tol = tol
+        self.line_search = line_search
+        self.adaptive_damping = adaptive_damping
+
+    def _hvp(self, closure, v):
+        """(H + damping * I) @ v for a flat vector `v`."""
+        for param, piece in zip(self.params, self._split(v)):
+            param.tangent = piece
+        try:
+            with forward_ad(), enable_grad():
+                grads = grad(closure(), self.params)
+        finally:
+            for param in self.params:
+                param.tangent = None
+        return self._flatten([tangent_of(g) for g in grads]) + self.damping * v
+
+    def _direction(self, closure, flat_grad):
+        """
+        CG on `(H + damping * I) p = -flat_grad`. Returns `p` and its
+        curvature `p @ (H + damping * I) @ p`.
+        """
+        xp = self.xp
+        p = xp.zeros_like(flat_grad)
+        r = -flat_grad
+        d = r.copy()
+        rr = float(xp.dot(r, r))
+        threshold = self.tol * rr ** 0.5
+        for i in range(self.cg_iters):
+            if rr ** 0.5 <= threshold:
+                break
+            hd = self._hvp(closure, d)
+            curvature = float(xp.dot(d, hd))
+            if curvature <= 0:
+                # Negative curvature: keep what CG has so far, or fall back to
+                # steepest descent on the first iteration, scaled like the
+                # first step of `LBFGS`.
+                if i == 0:
+                    scale = min(1.0, 1.0 / float(xp.abs(flat_grad).sum()))
+                    return scale * d, scale * scale * curvature
+                break
+            alpha = rr / curvature
+            p += alpha * d
+            r -= alpha * hd
+            rr_new = float(xp.dot(r, r))
+            d = r + (rr_new / rr) * d
+            rr = rr_new
+        # r = -g - A p, so p A p = -(g + r) . p
+        return p, -float(xp.dot(flat_grad + r, p))
+
+    def _loss(self, closure):
+        with no_grad():
+            return float(closure().data)
+
+    def step(self, closure):
+        """
+        Takes one Newton-CG step.
+
+        Args:
+            closure: Function that recomputes and returns the loss array; it
+                must not call `backward`.
+
+        Returns:
+            float: The loss before the step.
+        """
+        xp = self.xp
+        loss, flat_grad = self._loss_and_grad(closure)
+        p, curvature = self._direction(closure, flat_grad)
+        gtp = float(xp.dot(flat_grad, p))
+        if gtp >= 0:
+            return loss
+        x = self._flatten(self._data())
+
+        t = self.lr
+        self._assign(x + t * p)
+        new_loss = self._loss(closure)
+        if self.line_search == 'backtracking':
+            for _ in range(20):
+                if new_loss <= loss + 1e-4 * t * gtp:
+                    break
+                t *= 0.5
+                self._assign(x + t * p)
+                new_loss = self._loss(closure)
+            else:
+                # No sufficient decrease: reject the step.
+                self._assign(x)
+                new_loss = loss
+
+        if self.adaptive_damping:
+            predicted = -(t * gtp + 0.5 * t * t * curvature)
+            rho = (loss - new_loss) / predicted if predicted > 0 else -1.0
+            if rho < 0.25:
+                self.damping *= 1.5
+            elif rho > 0.75:
+                self.damping *= 2 / 3
+        return loss
@@ -0,0 +1,158 @@
+from deriv.Array.array_object import array
+from deriv.Array.backend import get_backend
+from deriv.Array.grad_mode import enable_grad
+from deriv.Array.sparse import SparseGrad
+
+
+class Optimizer:
+    """
+    Base class for optimizers.
+
+    Holds the parameters as a flat list so that a step can hand every
+    parameter, gradient and state buffer to a compiled kernel in one call.
+    Parameters whose gradient is a `SparseGrad` (e.g. `nn.Embedding`
+    tables) are updated lazily: only the rows the gradient lists, and only
+    those rows of their state buffers, are touched (see `_apply`).
+
+    A learning rate may also be given per replica, as an array of shape
+    `(n,)` for the stacked parameters of an `nn.Ensemble` (see
+    `_apply_per_replica`); optimizers that cannot take one set
+    `per_replica_lr = False`.
+
+    Args:
+        parameters (dict, list or array): A `Module.parameters()` dict, a list
+            of arrays, or a single array.
+        lr (float or array): Learning rate, or one per replica.
+    """
+
+    per_replica_lr = True
+
+    def __init__(self, parameters, lr):
+        self.xp = get_backend()
+        if self.xp.ndim(lr) != 0 and not self.per_replica_lr:
+            raise ValueError(f"{type(self).__name__} does not support a per-replica lr; "
+                             "use SGD, Adam, AdamW, RMSProp or Adagrad")
+        self.parameters = parameters
+        if isinstance(parameters, dict):
+            self.params = list(parameters.values())
+        elif isinstance(parameters, array):
+            self.params = [parameters]
+        else:
+            self.params = list(parameters)
+        self.lr = lr
+
+    def _zeros(self):
+        """One zero state buffer per parameter."""
+        return [self.xp.zeros_like(param.data) for param in self.params]
+
+    def _data(self):
+        return [param.data for param in self.params]
+
+    def _grads(self):
+        return [param.grad for param in self.params]
+
+    def _apply(self, kernel, states, lr, *hyper):
+        """
+        Runs a step kernel, `kernel(params, grads, *states, lr, *hyper)`, over
+        all parameters. Dense gradients go to the kernel in one call. For a
+        sparse gradient the listed rows of the parameter and of its state
+        buffers are gathered, stepped by the same kernel and written back,
+        so a step costs O(rows) rather than O(table).
+
+        Args:
+            kernel: A step function over aligned lists of raw arrays that
+                skips parameters whose grad is None.
+            states (list): Lists of state buffers, one buffer per parameter.
+            lr: The learning rate, a float or one per replica.
+            *hyper: The kernel's remaining arguments.
+        """
+        if self.xp.ndim(lr) != 0:
+            self._apply_per_replica(kernel, states, lr, *hyper)
+            return
+        hyper = (lr,) + hyper
+        grads = self._grads()
+        sparse = [i for i, grad in enumerate(grads) if isinstance(grad, SparseGrad)]
+        if not sparse:
+            kernel(self._data(), grads, *states, *hyper)
+            return
+        kernel(self._data(), [None if i in sparse else grad for i, grad in enumerate(grads)], *states, *hyper)
+        for i in sparse:
+            grad = grads[i].coalesce()
+            rows, param = grad.indices, self.params[i].data
+            data = param[rows]
+            buffers = [state[i][rows] for state in states]
+            kernel([data], [grad.values.astype(data.dtype, copy=False)], *[[b] for b in buffers], *hyper)
+            param[rows] = data
+            for state, buffer in zip(states, buffers):
+                state[i][rows] = buffer
+
+    def _apply_per_replica(self, kernel, states, lr, *hyper):
+        """
+        Runs a step kernel once per replica of the stacked parameters of an
+        `nn.Ensemble`, on the replica's slice (along axis 0) of every
+        parameter, gradient and state buffer, with that replica's learning
+        rate. The slices are views, so the compiled kernels update them in
+        place. The rows of a sparse gradient are replicas.
+        """
+        lr = self.xp.asarray(lr)
+        for param in self.params:
+            if param.data.ndim == 0 or param.data.shape[0] != lr.shape[0]:
+                raise ValueError(f"Per-replica lr of shape {lr.shape} does not match a parameter "
+                                 f"of shape {param.data.shape}")
+        grads = [grad.coalesce() if isinstance(grad, SparseGrad) else grad for grad in self._grads()]
+        rows = [{row: k for k, row in enumerate(grad.indices.tolist())} if isinstance(grad, SparseGrad) else None
+                for grad in grads]
+        data = self._data()
+        for r in range(lr.shape[0]):
+            replica_grads = []
+            for param, grad, row in zip(data, grads, rows):
+                if row is None:
+                    replica_grads.append(None if grad is None else grad[r])
+                else:
+                    k = row.get(r)
+                    replica_grads.append(None if k is None else grad.values[k].astype(param.dtype, copy=False))
+            kernel([param[r] for param in data], replica_grads, *[[buffer[r] for buffer in state] for state in states],
+                   float(lr[r]), *hyper)
+
+    def _flatten(self, values):
+        """Concatenates one buffer per parameter (None for zeros) into a flat vector."""
+        xp = self.xp
+        values = [value.to_dense() if isinstance(value, SparseGrad) else value for value in values]
+        return xp.concatenate([xp.ravel(value) if value is not None else xp.zeros(param.data.size)
+                               for param, value in zip(self.params, values)])
+
+    def _split(self, flat):
+        """Splits a flat vector back into views shaped like each parameter."""
+        pieces, offset = [], 0
+        for param in self.params:
+            size = param.data.size
+            pieces.append(flat[offset:offset + size].reshape(param.data.shape))
+            offset += size
+        return pieces
+
+    def _assign(self, flat):
+        """Writes a flat vector into the parameters' data, in place."""
+        for param, piece in zip(self.params, self._split(flat)):
+            param.data[...] = piece
+
+    def _loss_and_grad(self, closure):
+        """
+        Runs `closure` (which returns the loss without calling `backward`)
+        and backpropagates it. Returns the loss as a float and the flat
+        gradient.
+        """
+        self.zero_grad()
+        with enable_grad():
+            loss = closure()
+        loss.backward()
+        return float(loss.data), self._flatten(self._grads())
+
+    def step(self):
+        raise NotImplementedError
+
+    def zero_grad(self):
+        for param in self.params:
+            if isinstance(param.grad, SparseGrad):
+                param.grad = None
+            elif param.grad is not None:
+                param.grad.fill(0)
@@ -0,0 +1,26 @@
+from deriv.optim.optimizer import Optimizer
+from deriv.optim._internals._crmsprop import rmsprop_step
+
+
+class RMSProp(Optimizer):
+    """
+    RMSProp optimizer: scales each step by a running RMS of the gradient.
+
+    Args:
+        parameters (dict, list or array): Parameters to optimize.
+        lr (float or array): Learning rate, or one per replica (shape
+            `(n,)`) for the stacked parameters of an `nn.Ensemble`.
+        alpha (float): Decay rate of the squared-gradient average.
+        eps (float): Added to the denominator for numerical stability.
+        weight_decay (float): L2 penalty added to the gradient.
+    """
+
+    def __init__(self, parameters, lr=1e-2, alpha=0.99, eps=1e-8, weight_decay=0.0):
+        super().__init__(parameters, lr)
+        self.alpha = alpha
+        self.eps = eps
+        self.weight_decay = weight_decay
+        self.square_avgs = self._zeros()
+
+    def step(self):
+        self._apply(rmsprop_step, [self.square_avgs], self.lr, self.alpha, self.eps, self.weight_decay, self.xp)
@@ -1,21 +1,29 @@
-from deriv.Array.backend import get_backend
+from deriv.optim.optimizer import Optimizer
 from deriv.optim._internals._csgd import sgd_step
 
-class SGD:
+class SGD(Optimizer):
+    """
+    SGD with momentum.
+
+    Args:
+        parameters (dict, list or array): Parameters to optimize.
+        lr (float or array): Learning rate, or one per replica (shape
+            `(n,)`) for the stacked parameters of an `nn.Ensemble`.
+        beta (float): Momentum.
+
+    Attributes:
+        velocities (dict or list): Momentum buffers, keyed by parameter name
+            when `parameters` is a dict, otherwise one per parameter in order.
+    """
+
     def __init__(self, parameters, lr=1e-3, beta=0.9):
-        self.xp = get_backend()
-        self.parameters = parameters
-        self.lr = lr
+        super().__init__(parameters, lr)
         self.beta = beta
-        self.velocities = {
-            name: self.xp.zeros_like(param.data.data)
-            for name, param in parameters.items()
-        }
+        velocities = self._zeros()
+        self.velocities = dict(zip(parameters, velocities)) if isinstance(parameters, dict) else velocities
 
     def step(self):
-        sgd_step(self.parameters, self.velocities, self.lr, self.beta, self.xp)
-
-    def zero_grad(self):
-        for param in self.parameters.values():
-            if param.grad is not None:
-                param.grad.fill(0)
+        velocities = self.velocities
+        if isinstance(velocities, dict):
+            velocities = [velocities[name] for name in self.parameters]
+        self._apply(sgd_step, [velocities], self.lr, self.beta, self.xp)
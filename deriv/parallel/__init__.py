@@ -0,0 +1,2 @@
+from .shared import SharedArray
+from .data_parallel import DataParallel
@@ -0,0 +1,194 @@
+import multiprocessing as mp
+import os
+import threading
+import traceback
+
+import numpy as np
+
+from deriv.Array.array_object import array
+from deriv.Array.backend import is_gpu, set_backend
+from deriv.nn.flat_params import FlatParameters
+from deriv.parallel.shared import SharedArray
+
+
+def _bounds(n, parts):
+    return [n * i // parts for i in range(parts + 1)]
+
+
+def _worker(rank, num_workers, model, loss_fn, param_spec, grad_spec, barrier, conn):
+    """
+    Worker loop: gradients of one shard per step into its own row of the
+    shared gradient buffer, then its slice of the all-reduce.
+    """
+    set_backend('cpu')
+    params = SharedArray.attach(param_spec)
+    grads = SharedArray.attach(grad_spec)
+    flat = FlatParameters(model.parameters(), data=params.array, grad=grads.array[rank])
+    rows, reduced = grads.array[:num_workers], grads.array[num_workers]
+    bounds = _bounds(reduced.size, num_workers)
+    lo, hi = bounds[rank], bounds[rank + 1]
+    conn.send(('ready', None))
+    try:
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            x, y, weight = message
+            try:
+                flat.zero_grad()
+                loss = 0.0
+                if weight:
+                    out = loss_fn(model(array(x)), array(y))
+                    loss = float(out.data)
+                    # Shards are weighted by their share of the batch, so the
+                    # all-reduce is a plain sum.
+                    (out * weight).backward()
+                barrier.wait()
+                np.sum(rows[:, lo:hi], axis=0, out=reduced[lo:hi])
+                conn.send(('ok', loss))
+            except threading.BrokenBarrierError:
+                conn.send(('error', f"worker {rank}: another worker failed"))
+            except Exception:
+                barrier.abort()
+                conn.send(('error', f"worker {rank}:\n{traceback.format_exc()}"))
+    finally:
+        flat.move_to(np.empty_like(params.array), np.empty_like(params.array))
+        params.close()
+        grads.close()
+
+
+class DataParallel:
+    """
+    Data-parallel training on one machine with worker processes.
+
+    The model's parameters are moved into one flat buffer in shared memory
+    that the trainer and every worker's replica read directly, so updates
+    made by the optimizer are seen by all workers without any copy. Each
+    `backward` call splits the batch into one shard per worker; every
+    worker runs forward and backward on its shard (in its own process, so
+    in parallel and outside the GIL) into its own row of a shared gradient
+    buffer. The rows are then all-reduced in shared memory, each worker
+    summing one slice of the vector, into the flat gradient that the
+    optimizer reads.
+
+    Shard losses are weighted by shard size, so the gradient equals that of
+    the loss ('mean' reduction) over the whole batch. CPU backend only.
+    Best throughput usually needs one BLAS thread per worker (e.g.
+    `OMP_NUM_THREADS=1`).
+
+    Args:
+        model (Module): The model; its parameters are moved to shared
+            memory (see `FlatParameters`).
+        loss_fn: Called as `loss_fn(model(x), y)` in the workers.
+        num_workers (int): Worker processes; defaults to the CPU count.
+        start_method (str): Multiprocessing start method ('fork', 'spawn',
+            'forkserver'); the platform default if None. The model and
+            loss are pickled for 'spawn' and 'forkserver'.
+
+    Example:
+        >>> with DataParallel(model, MSE(), num_workers=8) as trainer:
+        ...     opt = SGD(trainer.parameters(), lr=1e-2)
+        ...     for x, y in loader:
+        ...         loss = trainer.backward(x, y)
+        ...         opt.step()
+    """
+
+    def __init__(self, model, loss_fn, num_workers=None, start_method=None):
+        if is_gpu():
+            raise RuntimeError("DataParallel needs the CPU backend")
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.model = model
+        parameters = model.parameters()
+        size = sum(p.data.size for p in parameters.values())
+        dtype = np.result_type(*[p.data.dtype for p in parameters.values()]) if parameters else np.float64
+        self._params = SharedArray((size,), dtype)
+        self._grads = SharedArray((self.num_workers + 1, size), dtype)
+        self.flat = FlatParameters(parameters, data=self._params.array, grad=self._grads.array[self.num_workers])
+
+        ctx = mp.get_context(start_method)
+        barrier = ctx.Barrier(self.num_workers)
+        self._conns = []
+        self._procs = []
+        for rank in range(self.num_workers):
+            conn, child = ctx.Pipe()
+            proc = ctx.Process(target=_worker, args=(rank, self.num_workers, model, loss_fn, self._params.spec,
+                                                     self._grads.spec, barrier, child), daemon=True)
+            proc.start()
+            child.close()
+            self._conns.append(conn)
+            self._procs.append(proc)
+        self._collect()
+
+    def _collect(self):
+        results, errors = [], []
+        for rank, conn in enumerate(self._conns):
+            try:
+                status, value = conn.recv()
+            except EOFError:
+                status, value = 'error', f"worker {rank} exited"
+            (errors if status == 'error' else results).append(value)
+        if errors:
+            self.close()
+            raise RuntimeError("DataParallel worker failed: " + "\n".join(errors))
+        return results
+
+    def parameters(self):
+        """The flat shared parameter as a one-element list, for optimizers."""
+        return self.flat.parameters()
+
+    @property
+    def grad(self):
+        """The all-reduced flat gradient of the last `backward`."""
+        return self.flat.grad
+
+    def backward(self, x, y):
+        """
+        Computes the gradient of `loss_fn(model(x), y)` over the batch in
+        the workers and leaves it in the flat gradient.
+
+        Args:
+            x, y: The batch (arrays or array_like), split along axis 0.
+
+        Returns:
+            float: The loss over the whole batch.
+        """
+        if self._conns is None:
+            raise RuntimeError("DataParallel is closed")
+        x = np.asarray(x.data if isinstance(x, array) else x)
+        y = np.asarray(y.data if isinstance(y, array) else y)
+        n = len(x)
+        bounds = _bounds(n, self.num_workers)
+        weights = []
+        for rank, conn in enumerate(self._conns):
+            lo, hi = bounds[rank], bounds[rank + 1]
+            weights.append((hi - lo) / n)
+            conn.send((x[lo:hi], y[lo:hi], weights[-1]))
+        losses = self._collect()
+        return float(sum(w * loss for w, loss in zip(weights, losses)))
+
+    def close(self):
+        """Stops the workers and moves the parameters back to private memory."""
+        if self._conns is None:
+            return
+        for conn, proc in zip(self._conns, self._procs):
+            if proc.is_alive():
+                try:
+                    conn.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+        for conn, proc in zip(self._conns, self._procs):
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+            conn.close()
+        self._conns = self._procs = None
+        self.flat.move_to(np.empty_like(self._params.array), np.empty_like(self._params.array))
+        self._params.close()
+        self._grads.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,43 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedArray:
+    """
+    A NumPy array in `multiprocessing.shared_memory`.
+
+    The creating process owns the block and unlinks it on `close`; other
+    processes attach to it by `spec` and only unmap it. Every view of
+    `array` must be dropped (or its storage moved elsewhere) before
+    `close`.
+
+    Args:
+        shape (tuple): Array shape.
+        dtype: Array dtype.
+        name (str, optional): Attach to this existing block instead of
+            creating one.
+    """
+
+    def __init__(self, shape, dtype, name=None):
+        dtype = np.dtype(dtype)
+        nbytes = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=nbytes)
+        self.array = np.ndarray(shape, dtype, buffer=self.shm.buf)
+
+    @property
+    def spec(self):
+        """`(shape, dtype, name)`: what another process needs to attach."""
+        return self.array.shape, self.array.dtype.str, self.shm.name
+
+    @classmethod
+    def attach(cls, spec):
+        shape, dtype, name = spec
+        return cls(shape, dtype, name=name)
+
+    def close(self):
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -1,13 +1,16 @@
 from setuptools import setup, find_packages, Extension
 from Cython.Build import cythonize
+import numpy
 import os
 
 ext_modules = cythonize([
     Extension(
-        name="deriv.optim._internals._csgd",
-        sources=["deriv/optim/_internals/_csgd.pyx"],
+        name=f"deriv.optim._internals.{name}",
+        sources=[f"deriv/optim/_internals/{name}.pyx"],
+        include_dirs=[numpy.get_include()],
         language="c++"
     )
+    for name in ("_csgd", "_cadam", "_crmsprop", "_cadagrad")
 ])
 
 setup(